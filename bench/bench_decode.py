@@ -0,0 +1,134 @@
+"""
+Decode + resize cost of the frame pipeline per source megapixel, and its peak memory.
+
+Compares ImageProcessor (draft decode, crop before resample) with the previous path (full
+decode, RGB convert, BICUBIC resize of the whole image, then crop) on synthetic JPEGs and
+PNGs of several sizes. Each case runs in its own subprocess, which processes `--count` images;
+its peak RSS above the idle process shows whether memory grows with image size or count. Run
+from the directory that contains Ross_git:
+
+    python -m Ross_git.bench.bench_decode --sizes 1600x900,3000x2000,6000x4000 --count 200
+"""
+import argparse
+import gc
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+from PIL import Image
+
+from Ross_git.bench import fixtures
+
+
+def make_body(width: int, height: int, image_format: str, seed: int = 0) -> bytes:
+    rng = np.random.default_rng(seed)
+    layout = Image.fromarray(rng.integers(0, 256, (6, 8, 3), dtype=np.uint8)).resize(
+        (width, height), Image.Resampling.BICUBIC
+    )
+    buffer = io.BytesIO()
+    layout.save(buffer, format=image_format, **({"quality": 85} if image_format == "JPEG" else {}))
+    return buffer.getvalue()
+
+
+def previous_path(content: bytes, target=(1280, 720)) -> Image.Image:
+    image = Image.open(io.BytesIO(content)).convert("RGB")
+    target_width, target_height = target
+    if image.width / image.height > target_width / target_height:
+        scale = target_height / image.height
+    else:
+        scale = target_width / image.width
+    resized = image.resize((int(image.width * scale), int(image.height * scale)), Image.BICUBIC)
+    left = (resized.width - target_width) // 2
+    top = (resized.height - target_height) // 2
+    return resized.crop((left, top, left + target_width, top + target_height))
+
+
+def current_path(content: bytes) -> Image.Image:
+    from Ross_git.src.app.utils.images.downloader import ImageProcessor
+
+    processor = ImageProcessor("bench")
+    processor.load_bytes(content)
+    processor.resize_and_crop()
+    return processor.final_image
+
+
+PATHS = {"previous": previous_path, "draft": current_path}
+
+
+def run_child(body_path: str, path_name: str, count: int):
+    with open(body_path, "rb") as f:
+        body = f.read()
+    path = PATHS[path_name]
+    # Import everything the path needs before taking the idle baseline
+    if path_name == "draft":
+        from Ross_git.src.app.utils.images.downloader import ImageProcessor  # noqa: F401
+    gc.collect()
+    baseline = fixtures.rss_bytes()
+    seconds = []
+    with fixtures.RssSampler(interval=0.002) as sampler:
+        sampler.take_peak()
+        for _ in range(count):
+            start = time.perf_counter()
+            frame = path(body)
+            seconds.append(time.perf_counter() - start)
+            frame.close()
+            del frame
+        peak = sampler.take_peak()
+    print(json.dumps({"seconds": seconds, "peak_rss_delta_bytes": max(0, peak - baseline)}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1600x900,3000x2000,6000x4000")
+    parser.add_argument("--formats", default="JPEG,PNG")
+    parser.add_argument("--count", type=int, default=50, help="Images processed per size, format and path")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--child", nargs=2, metavar=("BODY", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child[0], args.child[1], args.count)
+        return
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="ross_bench_decode_") as root:
+        for size in args.sizes.split(","):
+            width, height = (int(v) for v in size.split("x"))
+            for image_format in args.formats.split(","):
+                body_path = os.path.join(root, f"{size}.{image_format.lower()}")
+                with open(body_path, "wb") as f:
+                    f.write(make_body(width, height, image_format))
+                megapixels = width * height / 1e6
+                for name in PATHS:
+                    completed = subprocess.run(
+                        [sys.executable, "-m", "Ross_git.bench.bench_decode", "--count", str(args.count),
+                         "--child", body_path, name],
+                        capture_output=True, text=True, check=True,
+                    )
+                    child = json.loads(completed.stdout.strip().splitlines()[-1])
+                    median = float(np.median(child["seconds"]))
+                    results.append({
+                        "size": size, "format": image_format, "path": name, "count": args.count,
+                        "body_kb": round(os.path.getsize(body_path) / 1024),
+                        "median_ms": round(median * 1000, 2),
+                        "ms_per_megapixel": round(median * 1000 / megapixels, 2),
+                        "peak_rss_delta_mb": round(child["peak_rss_delta_bytes"] / (1024 * 1024), 1),
+                    })
+
+    print(f"{'size':>10} {'format':>6} {'path':>9} {'body KB':>8} {'median ms':>10} {'ms/MP':>8} {'peak +MB':>9}")
+    for r in results:
+        print(f"{r['size']:>10} {r['format']:>6} {r['path']:>9} {r['body_kb']:>8} {r['median_ms']:>10} "
+              f"{r['ms_per_megapixel']:>8} {r['peak_rss_delta_mb']:>9}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"count": args.count, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Compare slideshow render profiles: encode wall time and output size per profile.
+
+Renders the same synthetic slideshow (noise images plus a silent stub speech) with every
+profile through the single-pass ffmpeg path. Needs ffmpeg on PATH. Run from the
+directory that contains Ross_git:
+
+    python -m Ross_git.bench.bench_encode --profiles draft,standard,high --images 30
+"""
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+from PIL import Image
+
+
+def make_inputs(root, images, seconds_per_image, width, height):
+    from Ross_git.src.app.utils.audio.tts import TextToSpeechSaver
+    from Ross_git.src.app.utils.audio.tts_engines import StubEngine
+
+    img_dir = os.path.join(root, "images")
+    os.makedirs(img_dir)
+    rng = np.random.default_rng(0)
+    for i in range(images):
+        # Smooth gradient plus noise: closer to photos than flat colour, which x264 makes free
+        gradient = np.linspace(0, 255, width, dtype=np.float32)[None, :, None]
+        noise = rng.normal(0, 40, (height, width, 3)).astype(np.float32)
+        pixels = np.clip(gradient * (i % 3 + 1) / 3 + noise + rng.integers(0, 128), 0, 255).astype(np.uint8)
+        Image.fromarray(pixels).save(os.path.join(img_dir, f"{i:03d}.png"))
+
+    engine = StubEngine()
+    words = int(images * seconds_per_image * engine.words_per_second)
+    saver = TextToSpeechSaver(tmp_dir=os.path.join(root, "audio"), engine=engine)
+    file_name, duration_ns = saver.synthesize(" ".join(["word"] * words))
+    schedule = [(f"{i:03d}.png", seconds_per_image) for i in range(images)]
+    return img_dir, os.path.join(saver.tmp_dir, file_name), duration_ns, schedule
+
+
+def main():
+    from Ross_git.src.app.utils.video.combiner import VideoCombiner
+    from Ross_git.src.app.utils.video.profiles import BUILTIN_PROFILES, get_render_profile
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profiles", default=",".join(BUILTIN_PROFILES))
+    parser.add_argument("--images", type=int, default=30)
+    parser.add_argument("--seconds-per-image", type=float, default=4.0)
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="ross_bench_encode_")
+    results = []
+    try:
+        img_dir, speech_path, duration_ns, schedule = make_inputs(
+            root, args.images, args.seconds_per_image, 1280, 720
+        )
+        for name in args.profiles.split(","):
+            profile = get_render_profile(name.strip())
+            output_path = os.path.join(root, "out", f"{profile.name}.mp4")
+            combiner = VideoCombiner(img_dir=img_dir, output_path=output_path, schedule=schedule, profile=profile)
+            start = time.perf_counter()
+            combiner.generate_video_single_pass(speech_path, duration_ns)
+            seconds = time.perf_counter() - start
+            video_seconds = duration_ns / 1e9
+            results.append({
+                "profile": profile.to_dict(),
+                "encode_seconds": round(seconds, 3),
+                "video_seconds": round(video_seconds, 2),
+                "realtime_factor": round(video_seconds / seconds, 1),
+                "output_mb": round(os.path.getsize(output_path) / (1024 * 1024), 3),
+            })
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    print(f"{args.images} images, {args.seconds_per_image}s each")
+    print(f"{'profile':<10} {'size':>10} {'fps':>5} {'preset':>10} {'encode s':>9} {'x realtime':>11} {'MB':>8}")
+    for r in results:
+        p = r["profile"]
+        size = f"{p['width']}x{p['height']}"
+        print(f"{p['name']:<10} {size:>10} {p['fps']:>5g} {p['preset']:>10} "
+              f"{r['encode_seconds']:>9} {r['realtime_factor']:>11} {r['output_mb']:>8}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"images": args.images, "seconds_per_image": args.seconds_per_image, "results": results},
+                      f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
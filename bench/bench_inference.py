@@ -0,0 +1,108 @@
+"""
+Compare LLM inference backends (fp32, bf16, int8, fp16) for the configured model.
+
+Each backend runs in its own subprocess so peak RSS is measured per mode. Run from the
+directory that contains Ross_git:
+
+    python -m Ross_git.bench.bench_inference --backends fp32,int8 --new-tokens 64
+"""
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+
+PROMPT = "You are a professional public speaker. Write a clear and compelling speech on the following topic:\n\nTopic: The importance of digital literacy\n\nSTART OF SPEECH:\n"
+
+
+def run_child(model_name, backend, new_tokens, repeats, threads, compile_model):
+    import torch
+    from Ross_git.src.app.utils.NLP.inference_backend import configure_threads, load_model
+
+    configure_threads(threads, 0)
+    start = time.perf_counter()
+    tokenizer, model, backend = load_model(model_name, backend, compile_model)
+    load_seconds = time.perf_counter() - start
+
+    inputs = tokenizer(PROMPT, return_tensors="pt").to(model.device)
+    generate_kwargs = dict(
+        max_new_tokens=new_tokens,
+        min_new_tokens=new_tokens,
+        do_sample=False,
+        pad_token_id=tokenizer.pad_token_id or tokenizer.eos_token_id,
+    )
+
+    with torch.no_grad():
+        # Warm-up run pays for lazy init and compilation
+        model.generate(**inputs, **generate_kwargs)
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            model.generate(**inputs, **generate_kwargs)
+            timings.append(time.perf_counter() - start)
+
+    best = min(timings)
+    return {
+        "backend": backend,
+        "compile": compile_model,
+        "threads": torch.get_num_threads(),
+        "load_seconds": round(load_seconds, 3),
+        "prompt_tokens": inputs["input_ids"].shape[1],
+        "new_tokens": new_tokens,
+        "best_seconds": round(best, 4),
+        "tokens_per_second": round(new_tokens / best, 2),
+        # ru_maxrss is in kilobytes on Linux
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def main():
+    from Ross_git.src.app.config.app_config import get_section
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=get_section("model").get("name", "TinyLlama/TinyLlama-1.1B-Chat-v0.3"))
+    parser.add_argument("--backends", default="fp32,bf16,int8")
+    parser.add_argument("--new-tokens", type=int, default=64)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--threads", type=int, default=0)
+    parser.add_argument("--compile", action="store_true")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        result = run_child(args.model, args.child, args.new_tokens, args.repeats, args.threads, args.compile)
+        print(json.dumps(result))
+        return
+
+    results = []
+    for backend in args.backends.split(","):
+        cmd = [
+            sys.executable, "-m", "Ross_git.bench.bench_inference",
+            "--child", backend.strip(),
+            "--model", args.model,
+            "--new-tokens", str(args.new_tokens),
+            "--repeats", str(args.repeats),
+            "--threads", str(args.threads),
+        ]
+        if args.compile:
+            cmd.append("--compile")
+        proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        if proc.returncode != 0:
+            print(f"[WARN] Backend {backend} failed:\n{proc.stderr.strip()[-2000:]}")
+            continue
+        results.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+    print(f"Model: {args.model}")
+    print(f"{'backend':<8} {'threads':>7} {'load s':>8} {'tok/s':>8} {'peak RSS MB':>12}")
+    for r in results:
+        print(f"{r['backend']:<8} {r['threads']:>7} {r['load_seconds']:>8} {r['tokens_per_second']:>8} {r['peak_rss_mb']:>12}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"model": args.model, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,364 @@
+"""
+Offline, reproducible benchmark of the text-to-video pipeline.
+
+Everything runs against local fixtures: images served from 127.0.0.1, canned search
+results, the stub TTS engine and a tiny random-weight language model, so numbers only
+move when the code does. Each component is timed per scenario (speech length x image
+count) and reported as latency percentiles, throughput and peak resident memory; the
+`pipeline` component runs VideoGenerator end to end and also breaks its time down per
+traced stage.
+
+Needs ffmpeg on PATH (mix, render, pipeline) and spaCy's en_core_web_sm (parse, pipeline);
+components whose dependencies are missing are reported as skipped. Run from the directory
+that contains Ross_git:
+
+    python -m Ross_git.bench.bench_pipeline --words 150,450,900 --images 10,30 --output before.json
+    python -m Ross_git.bench.bench_pipeline --output after.json --compare before.json
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from Ross_git.bench import fixtures
+
+COMPONENTS = ["parse", "order", "mix", "render", "speech", "pipeline"]
+TOPIC = "modern city library"
+
+
+class SpanCollector(logging.Handler):
+    """
+    Collects the span JSON lines the pipeline tracer logs, taking the RSS peak of the
+    sampler at each span boundary so every stage gets its own peak.
+    """
+
+    def __init__(self, sampler: fixtures.RssSampler):
+        super().__init__()
+        self.sampler = sampler
+        self.spans = []
+
+    def emit(self, record):
+        try:
+            event = json.loads(record.getMessage())
+        except ValueError:
+            return
+        if event.get("event") == "span":
+            event["peak_rss_bytes"] = self.sampler.take_peak()
+            self.spans.append(event)
+
+
+def summarize(seconds: list[float], work: float | None = None, unit: str | None = None,
+              peaks: list[int] | None = None) -> dict:
+    values = np.asarray(seconds, dtype=np.float64)
+    summary = {
+        "runs": len(values),
+        "p50": float(np.percentile(values, 50)),
+        "p90": float(np.percentile(values, 90)),
+        "p99": float(np.percentile(values, 99)),
+        "mean": float(values.mean()),
+        "min": float(values.min()),
+        "max": float(values.max()),
+    }
+    if work is not None and summary["p50"] > 0:
+        summary["throughput"] = work / summary["p50"]
+        summary["throughput_unit"] = unit
+    if peaks:
+        summary["peak_rss_mb"] = max(peaks) / (1024 * 1024)
+    return summary
+
+
+def timed(fn, repeats: int, sampler: fixtures.RssSampler):
+    """
+    Run `fn` once to warm up, then `repeats` times. Returns (seconds, peak RSS per run,
+    last result).
+    """
+    result = fn()
+    seconds, peaks = [], []
+    for _ in range(repeats):
+        sampler.take_peak()
+        start = time.perf_counter()
+        result = fn()
+        seconds.append(time.perf_counter() - start)
+        peaks.append(sampler.take_peak())
+    return seconds, peaks, result
+
+
+class Scenario:
+    """
+    Inputs for one speech length and image count, built once and shared by the components.
+    """
+
+    def __init__(self, root: str, server: fixtures.ImageServer, image_names: list[str], words: int, images: int):
+        self.words = words
+        self.images = images
+        self.speech = fixtures.make_speech(words)
+        self.results = fixtures.canned_results(server.base_url, image_names[:images])
+        self.root = os.path.join(root, f"w{words}_i{images}")
+        os.makedirs(self.root, exist_ok=True)
+
+        fixture_path = os.path.join(self.root, "search.json")
+        with open(fixture_path, "w") as f:
+            json.dump({"*": self.results}, f)
+        self.config_path = fixtures.write_config(
+            os.path.join(self.root, "bench.config"), fixture_path, os.path.join(self.root, "workspaces")
+        )
+        self._sentences = None
+        self._speech_audio = None
+
+    @property
+    def name(self) -> str:
+        return f"{self.words} words, {self.images} images"
+
+    def parsed_sentences(self) -> list[dict]:
+        if self._sentences is None:
+            from Ross_git.src.app.utils.core.text2video import TextParser
+            self._sentences = TextParser().parse(self.speech)
+        return self._sentences
+
+    def speech_audio(self) -> tuple[str, int, list[dict]]:
+        if self._speech_audio is None:
+            from Ross_git.src.app.utils.audio.tts import TextToSpeechSaver
+            saver = TextToSpeechSaver.from_config(tmp_dir=os.path.join(self.root, "audio"))
+            file_name, duration_ns, timings = saver.synthesize_timed(self.speech)
+            self._speech_audio = os.path.join(saver.tmp_dir, file_name), duration_ns, timings
+        return self._speech_audio
+
+
+def bench_parse(scenario: Scenario, repeats: int, sampler) -> dict:
+    from Ross_git.src.app.utils.NLP.parser import get_nlp_parser
+
+    parser = get_nlp_parser()
+    seconds, peaks, _ = timed(lambda: parser.process(scenario.speech), repeats, sampler)
+    return summarize(seconds, scenario.words, "words/s", peaks)
+
+
+def bench_order(scenario: Scenario, repeats: int, sampler) -> dict:
+    from Ross_git.src.app.utils.core.text2video import ImageOrderer
+
+    orderer = ImageOrderer()
+    sentences = scenario.parsed_sentences()
+    seconds, peaks, _ = timed(lambda: orderer.order(sentences, scenario.results), repeats, sampler)
+    return summarize(seconds, len(scenario.results), "images/s", peaks)
+
+
+def bench_mix(scenario: Scenario, repeats: int, sampler) -> dict:
+    from Ross_git.src.app.utils.audio.remixer import SpeechMusicMixer
+
+    speech_path, duration_ns, _ = scenario.speech_audio()
+    output_path = os.path.join(scenario.root, "mix", "mixed_output.wav")
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    mixer = SpeechMusicMixer(speech_path, SpeechMusicMixer.default_music_path(), output_path,
+                             speech_length_ms=duration_ns / 1e6)
+    seconds, peaks, _ = timed(mixer.run, repeats, sampler)
+    return summarize(seconds, mixer.total_frames() / mixer.sample_rate, "audio s/s", peaks)
+
+
+def bench_render(scenario: Scenario, repeats: int, sampler) -> dict:
+    from Ross_git.src.app.utils.core.timeline import image_schedule, sentence_timings
+    from Ross_git.src.app.utils.audio.remixer import SpeechMusicMixer
+    from Ross_git.src.app.utils.video.combiner import VideoCombiner
+    from Ross_git.src.app.utils.video.profiles import get_render_profile
+
+    speech_path, duration_ns, chunk_timings = scenario.speech_audio()
+    img_dir = os.path.join(scenario.root, "frames")
+    os.makedirs(img_dir, exist_ok=True)
+    images = []
+    for i, result in enumerate(scenario.results):
+        name = os.path.basename(result["image"])
+        shutil.copyfile(os.path.join(FRAMES_DIR, name), os.path.join(img_dir, name))
+        images.append({"output_filename": name, "sentence_index": i})
+
+    sentences = [s.strip() + "." for s in scenario.speech.replace("\n", " ").split(".") if s.strip()]
+    timings = sentence_timings(sentences, chunk_timings, duration_ns,
+                               offset_ns=SpeechMusicMixer.LEAD_IN_MS * 1_000_000)
+    combiner = VideoCombiner(img_dir=img_dir, output_path=os.path.join(scenario.root, "render", "out.mp4"),
+                             schedule=image_schedule(timings, images), profile=get_render_profile())
+    seconds, peaks, _ = timed(lambda: combiner.generate_video_single_pass(speech_path, duration_ns),
+                              repeats, sampler)
+    summary = summarize(seconds, duration_ns / 1e9, "video s/s", peaks)
+    # The encoder runs as a child process; its peak is not part of this process's RSS
+    summary["ffmpeg_peak_rss_mb"] = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+    return summary
+
+
+def bench_speech(scenario: Scenario, repeats: int, sampler) -> dict:
+    import torch
+    from transformers import AutoModelForCausalLM, AutoTokenizer, StoppingCriteriaList
+    from Ross_git.src.app.utils.NLP.continuation import CachedSpeechSession
+
+    tokenizer = AutoTokenizer.from_pretrained(TINY_LM_DIR)
+    model = AutoModelForCausalLM.from_pretrained(TINY_LM_DIR).eval()
+    # The random model never writes the stop phrase, so every round runs max_new_tokens
+    max_new_tokens = max(16, scenario.words // 4)
+
+    def run():
+        torch.manual_seed(0)
+        session = CachedSpeechSession(tokenizer, model, f"Topic: {TOPIC}\nSTART SPEECH:", "END OF SPEECH",
+                                      StoppingCriteriaList(), max_new_tokens=max_new_tokens)
+        tokens = 0
+        for _ in range(4):
+            tokens += session.extend().get("generated_tokens", 0)
+        return tokens
+
+    seconds, peaks, tokens = timed(run, repeats, sampler)
+    return summarize(seconds, tokens, "tokens/s", peaks)
+
+
+def bench_pipeline(scenario: Scenario, repeats: int, sampler) -> dict:
+    from Ross_git.src.app.utils.core.text2video import VideoGenerator
+
+    collector = SpanCollector(sampler)
+    trace_logger = logging.getLogger("ross.trace")
+    trace_logger.addHandler(collector)
+    trace_logger.setLevel(logging.INFO)
+    try:
+        def run():
+            collector.spans.clear()
+            sampler.take_peak()
+            VideoGenerator().generate_video(TOPIC, scenario.speech)
+            return list(collector.spans)
+
+        run()
+        seconds, peaks, stages = [], [], {}
+        for _ in range(repeats):
+            start = time.perf_counter()
+            spans = run()
+            seconds.append(time.perf_counter() - start)
+            peaks.append(max(span["peak_rss_bytes"] for span in spans))
+            for span in spans:
+                stage = stages.setdefault(span["stage"], {"seconds": [], "peaks": []})
+                stage["seconds"].append(span["wall_seconds"])
+                stage["peaks"].append(span["peak_rss_bytes"])
+    finally:
+        trace_logger.removeHandler(collector)
+
+    summary = summarize(seconds, scenario.words, "words/s", peaks)
+    summary["stages"] = {name: summarize(s["seconds"], peaks=s["peaks"]) for name, s in stages.items()}
+    return summary
+
+
+BENCHMARKS = {
+    "parse": bench_parse,
+    "order": bench_order,
+    "mix": bench_mix,
+    "render": bench_render,
+    "speech": bench_speech,
+    "pipeline": bench_pipeline,
+}
+
+# Set up once in main() and shared by every scenario
+FRAMES_DIR = None
+TINY_LM_DIR = None
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(report: dict, baseline: dict | None):
+    base = {}
+    for entry in (baseline or {}).get("results", []):
+        base[(entry["scenario"], entry["component"])] = entry
+    print(f"\ncommit {report['commit']}, python {report['python']}, {report['repeats']} runs each")
+    header = f"{'scenario':<22} {'component':<16} {'p50 s':>9} {'p90 s':>9} {'p99 s':>9} {'throughput':>22} {'peak MB':>9}"
+    if baseline:
+        header += f" {'p50 vs base':>12}"
+    print(header)
+    for entry in report["results"]:
+        rows = [(entry["component"], entry)]
+        rows += [(f"  {name}", stage) for name, stage in entry.get("stages", {}).items()]
+        for label, row in rows:
+            if "skipped" in row:
+                print(f"{entry['scenario']:<22} {label:<16} skipped: {row['skipped']}")
+                continue
+            throughput = f"{row['throughput']:.1f} {row['throughput_unit']}" if "throughput" in row else ""
+            line = (f"{entry['scenario']:<22} {label:<16} {row['p50']:>9.3f} {row['p90']:>9.3f} {row['p99']:>9.3f} "
+                    f"{throughput:>22} {row.get('peak_rss_mb', 0):>9.1f}")
+            old = base.get((entry["scenario"], entry["component"]))
+            if old is not None and label == entry["component"] and "p50" in old:
+                line += f" {row['p50'] / old['p50']:>11.2f}x"
+            print(line)
+
+
+def main():
+    global FRAMES_DIR, TINY_LM_DIR
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--words", default="150,450,900", help="Comma-separated speech lengths")
+    parser.add_argument("--images", default="10,30", help="Comma-separated image counts")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--components", default=",".join(COMPONENTS))
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--compare", help="JSON from an earlier run to compare p50 latencies against")
+    args = parser.parse_args()
+
+    components = [c.strip() for c in args.components.split(",")]
+    unknown = set(components) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"Unknown components: {', '.join(sorted(unknown))}")
+    word_counts = [int(w) for w in args.words.split(",")]
+    image_counts = [int(i) for i in args.images.split(",")]
+
+    root = tempfile.mkdtemp(prefix="ross_bench_pipeline_")
+    FRAMES_DIR = os.path.join(root, "served")
+    TINY_LM_DIR = os.path.join(root, "tiny_lm")
+    results = []
+    previous_config = os.environ.get("ROSS_CONFIG")
+    try:
+        image_names = fixtures.make_images(FRAMES_DIR, max(image_counts))
+        if "speech" in components:
+            fixtures.build_tiny_lm(TINY_LM_DIR)
+        with fixtures.ImageServer(FRAMES_DIR) as server, fixtures.RssSampler() as sampler:
+            for words in word_counts:
+                for images in image_counts:
+                    scenario = Scenario(root, server, image_names, words, images)
+                    os.environ["ROSS_CONFIG"] = scenario.config_path
+                    for component in components:
+                        print(f"[bench] {scenario.name}: {component}")
+                        try:
+                            summary = BENCHMARKS[component](scenario, args.repeats, sampler)
+                        except (ImportError, OSError) as e:
+                            summary = {"skipped": f"{type(e).__name__}: {e}"}
+                        results.append({"scenario": scenario.name, "words": words, "images": images,
+                                        "component": component, **summary})
+    finally:
+        if previous_config is None:
+            os.environ.pop("ROSS_CONFIG", None)
+        else:
+            os.environ["ROSS_CONFIG"] = previous_config
+        shutil.rmtree(root, ignore_errors=True)
+
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "repeats": args.repeats,
+        "results": results,
+    }
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,240 @@
+"""
+Offline fixtures for the benchmarks: a local image server, canned search results, a
+synthetic speech, a tiny random-weight causal LM and a config file wiring them together.
+Nothing here touches the network.
+"""
+import functools
+import os
+import resource
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+from PIL import Image
+
+NOUNS = [
+    "library", "teacher", "computer", "garden", "river", "city", "museum", "market", "school", "bridge",
+    "forest", "mountain", "village", "hospital", "factory", "harbor", "station", "kitchen", "stadium", "farm",
+]
+ADJECTIVES = ["modern", "quiet", "busy", "ancient", "bright", "small", "large", "green", "open", "digital"]
+TEMPLATES = [
+    "The {adj} {noun} changed how people in the {other} think about their future.",
+    "Every {noun} needs a {adj} {other} to grow.",
+    "We visited the {adj} {noun} near the {other} last spring.",
+    "A {noun} is more than a {other}, it is a {adj} promise.",
+]
+
+
+def make_speech(words: int, seed: int = 0) -> str:
+    """
+    English-like speech of about `words` words, four sentences per paragraph line, built
+    from NOUNS so the canned image titles have something to match.
+    """
+    rng = np.random.default_rng(seed)
+    sentences = []
+    count = 0
+    while count < words:
+        template = TEMPLATES[int(rng.integers(len(TEMPLATES)))]
+        sentence = template.format(
+            adj=ADJECTIVES[int(rng.integers(len(ADJECTIVES)))],
+            noun=NOUNS[int(rng.integers(len(NOUNS)))],
+            other=NOUNS[int(rng.integers(len(NOUNS)))],
+        )
+        sentences.append(sentence)
+        count += len(sentence.split())
+    return "\n".join(" ".join(sentences[i:i + 4]) for i in range(0, len(sentences), 4))
+
+
+def make_images(directory: str, count: int, small_every: int = 7, seed: int = 0) -> list[str]:
+    """
+    Write `count` JPEGs (a random coarse layout plus noise, 1600x900). Every `small_every`-th
+    one is 300x200, below the minimum size, so the pipeline also exercises rejections. The
+    coarse layout differs per image, so they are not perceptual-hash duplicates of each other.
+    """
+    os.makedirs(directory, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    names = []
+    for i in range(count):
+        width, height = (300, 200) if small_every and i % small_every == small_every - 1 else (1600, 900)
+        layout = Image.fromarray(rng.integers(0, 256, (6, 8, 3), dtype=np.uint8)).resize(
+            (width, height), Image.Resampling.BICUBIC
+        )
+        noise = rng.normal(0, 30, (height, width, 3)).astype(np.float32)
+        pixels = np.clip(np.asarray(layout, dtype=np.float32) + noise, 0, 255).astype(np.uint8)
+        name = f"{i:04d}.jpg"
+        Image.fromarray(pixels).save(os.path.join(directory, name), quality=85)
+        names.append(name)
+    return names
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def handle(self):
+        try:
+            super().handle()
+        except (BrokenPipeError, ConnectionResetError):
+            # The client stopped reading, e.g. the image probe rejected the body from its header
+            pass
+
+
+class ImageServer:
+    """
+    Serves a directory over HTTP on 127.0.0.1 on a free port, from a background thread.
+    """
+
+    def __init__(self, directory: str):
+        handler = functools.partial(_QuietHandler, directory=directory)
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name="bench-image-server", daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.thread.join()
+        return False
+
+
+def canned_results(base_url: str, names: list[str], seed: int = 0) -> list[dict]:
+    """
+    DuckDuckGo-shaped results for the served images, titled with words from NOUNS.
+    """
+    rng = np.random.default_rng(seed)
+    results = []
+    for name in names:
+        title = " ".join(
+            [ADJECTIVES[int(rng.integers(len(ADJECTIVES)))]] + [NOUNS[int(i)] for i in rng.integers(len(NOUNS), size=2)]
+        )
+        url = f"{base_url}/{name}"
+        results.append({"title": title, "image": url, "thumbnail": url, "url": url, "source": "fixture"})
+    return results
+
+
+def build_tiny_lm(directory: str, seed: int = 0) -> str:
+    """
+    Save a tiny random-weight Llama model and a word-level tokenizer to `directory`, so
+    speech generation can be timed without downloading a model. Returns the directory.
+    """
+    import torch
+    from tokenizers import Tokenizer, decoders, models, pre_tokenizers
+    from transformers import LlamaConfig, LlamaForCausalLM, PreTrainedTokenizerFast
+
+    words = ["<unk>", "<s>", "</s>", "\n", "END", "OF", "SPEECH", "START", "SPEECH:", "Topic:"]
+    words += sorted(set(NOUNS + ADJECTIVES + [w.strip(".,") for t in TEMPLATES for w in t.split() if "{" not in w]))
+    vocab = {word: i for i, word in enumerate(dict.fromkeys(words))}
+
+    tokenizer = Tokenizer(models.WordLevel(vocab=vocab, unk_token="<unk>"))
+    tokenizer.pre_tokenizer = pre_tokenizers.Sequence([
+        pre_tokenizers.Split("\n", "isolated"),
+        pre_tokenizers.WhitespaceSplit(),
+    ])
+    tokenizer.decoder = decoders.WordPiece(prefix="##")
+    fast_tokenizer = PreTrainedTokenizerFast(
+        tokenizer_object=tokenizer, unk_token="<unk>", bos_token="<s>", eos_token="</s>"
+    )
+
+    torch.manual_seed(seed)
+    config = LlamaConfig(
+        vocab_size=len(vocab), hidden_size=64, intermediate_size=128, num_hidden_layers=2,
+        num_attention_heads=4, num_key_value_heads=4, max_position_embeddings=4096,
+    )
+    model = LlamaForCausalLM(config).eval()
+
+    os.makedirs(directory, exist_ok=True)
+    fast_tokenizer.save_pretrained(directory)
+    model.save_pretrained(directory)
+    return directory
+
+
+def write_config(path: str, fixture_path: str, workspace_dir: str, profile: str = "draft") -> str:
+    """
+    Config for an offline run: canned search results, stub TTS, caches off so every
+    repeat measures the cold path, and the given render profile.
+    """
+    with open(path, "w") as f:
+        f.write(f"""[search]
+provider = fixture
+fixture_path = {fixture_path}
+
+[search_cache]
+enabled = false
+
+[image_cache]
+enabled = false
+
+[tts]
+engine = stub
+cache_enabled = false
+
+[workspace]
+base_dir = {workspace_dir}
+retention_seconds = 0
+
+[render]
+mode = single_pass
+profile = {profile}
+
+[tracing]
+metrics_endpoint = false
+""")
+    return path
+
+
+def rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        # Not Linux: fall back to the lifetime peak (kilobytes on Linux, bytes on macOS)
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class RssSampler:
+    """
+    Samples this process's resident memory every `interval` seconds on a background thread.
+    `take_peak()` returns the highest RSS since the previous call, so a caller can split one
+    run into per-stage peaks.
+    """
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self._peak = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name="bench-rss", daemon=True)
+
+    def _loop(self):
+        while not self._stop.is_set():
+            self._sample()
+            time.sleep(self.interval)
+
+    def _sample(self):
+        rss = rss_bytes()
+        with self._lock:
+            self._peak = max(self._peak, rss)
+
+    def take_peak(self) -> int:
+        self._sample()
+        with self._lock:
+            peak, self._peak = self._peak, 0
+        return peak
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        return False
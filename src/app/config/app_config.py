@@ -2,10 +2,14 @@ import configparser
 import os
 
 def load_config(config_path=None):
-    config = configparser.ConfigParser()
+    # Values are taken literally: log_format holds logging's own %(name)s placeholders
+    config = configparser.ConfigParser(interpolation=None)
+    if config_path is None:
+        # ROSS_CONFIG points at an alternative config file, e.g. the offline benchmark fixtures
+        config_path = os.environ.get("ROSS_CONFIG")
     if config_path is None:
         current_dir = os.path.dirname(__file__)
-        config_path = os.path.join(current_dir, "app.config")
+        config_path = os.path.join(current_dir, ".config")
     config.read(config_path)
     return config
 
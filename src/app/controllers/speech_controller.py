@@ -1,6 +1,10 @@
-from Ross_git.src.app.utils.NLP.speech_generator import generate_full_speech
-
 class SpeechController:
-    def generate_speech(self, topic: str) -> str:
-        speech = generate_full_speech(topic)
+    # speech_generator imports torch, transformers and langchain; load it on first use, not with the app
+    def generate_speech(self, topic: str, use_cache: bool = True) -> str:
+        from Ross_git.src.app.utils.NLP.speech_generator import generate_full_speech
+        speech = generate_full_speech(topic, use_cache=use_cache)
         return speech
+
+    def stream_speech(self, topic: str, use_cache: bool = True):
+        from Ross_git.src.app.utils.NLP.speech_generator import stream_full_speech
+        return stream_full_speech(topic, use_cache=use_cache)
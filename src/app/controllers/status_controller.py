@@ -1,3 +1,8 @@
+from Ross_git.src.app.utils.core.startup import get_readiness
+
 class StatusController:
     def check_status(self) -> str:
         return "Controller for GET working fine"
+
+    def check_readiness(self) -> dict:
+        return get_readiness().snapshot()
@@ -1,7 +1,42 @@
-from Ross_git.src.app.utils.core.text2video import VideoGenerator
+from Ross_git.src.app.utils.core.job_queue import VIDEO_STAGES, get_job_manager
+from Ross_git.src.app.utils.core.tracing import get_metrics_registry
+from Ross_git.src.app.utils.video.profiles import get_render_profile
 
 class Text2VideoController:
-    def generate_video(self, topic: str, speech: str) -> None:
+    def generate_video(self, topic: str, speech: str, progress=None, profile: str | None = None,
+                       job_id: str | None = None, profiling: bool = False) -> str:
+        # The pipeline pulls in spaCy, PIL and NumPy; import it on first use, not with the app
+        from Ross_git.src.app.utils.core.text2video import VideoGenerator
+
         # Use topic as short_text, speech as long_text
-        generator = VideoGenerator()
-        generator.generate_video(topic, speech)
+        generator = VideoGenerator(render_profile=get_render_profile(profile), profiling=profiling)
+        return generator.generate_video(topic, speech, progress=progress, job_id=job_id)
+
+    def submit_video(self, topic: str, speech: str, profile: str | None = None, profiling: bool = False) -> dict:
+        # Resolve now so an unknown profile is rejected before the job is queued
+        render_profile = get_render_profile(profile)
+        job = get_job_manager().submit(
+            lambda job: self.generate_video(
+                topic, speech, progress=job.enter_stage, profile=render_profile.name,
+                job_id=job.id, profiling=profiling,
+            ),
+            stages=VIDEO_STAGES,
+            params={"topic": topic, "profile": render_profile.name, "profiling": profiling},
+        )
+        return job.to_dict()
+
+    def get_job(self, job_id: str) -> dict:
+        return get_job_manager().get(job_id).to_dict()
+
+    def cancel_job(self, job_id: str) -> dict:
+        return get_job_manager().cancel(job_id).to_dict()
+
+    def get_metrics(self) -> str:
+        job_gauges = {f"jobs_{key}": value for key, value in get_job_manager().stats().items()}
+        return get_metrics_registry().render(extra_gauges=job_gauges)
+
+    def get_video_path(self, job_id: str) -> str | None:
+        job = get_job_manager().get(job_id)
+        if job.status != job.DONE:
+            return None
+        return job.result_path
@@ -1,5 +1,11 @@
+import json
+import os
+
 from fastapi import APIRouter, Depends, Request, status, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, StreamingResponse
 
+from Ross_git.src.app.config.app_config import get_section
 from Ross_git.src.app.controllers.echo_controller import EchoController
 from Ross_git.src.app.controllers.speech_controller import SpeechController
 from Ross_git.src.app.controllers.status_controller import StatusController
@@ -8,6 +14,7 @@ from Ross_git.src.app.services.echo_service import EchoService
 from Ross_git.src.app.services.speech_service import SpeechService
 from Ross_git.src.app.services.status_service import StatusService
 from Ross_git.src.app.services.test2video_service import Text2VideoService
+from Ross_git.src.app.utils.core.job_queue import JobNotFoundError, JobQueueFullError
 
 
 # Dependency Injection Setup
@@ -92,10 +99,46 @@ async def post_speech(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid JSON"
         )
-    speech_text = speech_service.create_speech(topic)
+    # "no_cache": true regenerates instead of returning a cached speech for the same topic
+    use_cache = not body.get("no_cache", False)
+    # Generation blocks for seconds; off the event loop, concurrent requests can meet in the batcher
+    speech_text = await run_in_threadpool(speech_service.create_speech, topic, use_cache=use_cache)
     return {"speech": speech_text}
 
 
+async def post_speech_stream(
+        request: Request,
+        _: None = Depends(https_required),
+        speech_service: SpeechService = Depends(get_speech_service),
+):
+    try:
+        body = await request.json()
+        topic = body.get("topic")
+        if not topic or not isinstance(topic, str):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Missing or invalid 'topic' field"
+            )
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid JSON"
+        )
+    use_cache = not body.get("no_cache", False)
+
+    def event_stream():
+        # Sync generator: Starlette iterates it in a worker thread, off the event loop
+        for item in speech_service.stream_speech(topic, use_cache=use_cache):
+            event = item.pop("event")
+            yield f"event: {event}\ndata: {json.dumps(item)}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 async def post_text2video(
     request: Request,
     _: None = Depends(https_required),
@@ -109,12 +152,32 @@ async def post_text2video(
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Missing or invalid 'topic' field")
         if not speech or not isinstance(speech, str):
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Missing or invalid 'speech' field")
+        # Optional render profile name, e.g. "draft" for a fast preview
+        profile = body.get("profile")
+        # Opt-in cProfile/pyinstrument dump of this job
+        profiling = bool(body.get("profiling", False))
     except Exception:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid JSON")
 
-    text2video_service.create_video(topic, speech)
+    try:
+        job = text2video_service.submit_video(topic, speech, profile=profile, profiling=profiling)
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    return job
 
-    return {"message": "done"}
+
+async def post_text2video_cancel(
+    job_id: str,
+    _: None = Depends(https_required),
+    text2video_service: Text2VideoService = Depends(get_text2video_service),
+):
+    try:
+        return text2video_service.cancel_job(job_id)
+    except JobNotFoundError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Unknown job")
 
 #==============GET=================================================
 
@@ -125,6 +188,48 @@ async def get_status(
     message = status_service.get_status()
     return {"message": message}
 
+async def get_ready(
+    _: None = Depends(https_required),
+    status_service: StatusService = Depends(get_status_service),
+):
+    # Liveness is /status; this answers 503 until the warm-up has loaded the heavy subsystems
+    readiness = status_service.get_readiness()
+    status_code = status.HTTP_200_OK if readiness["ready"] else status.HTTP_503_SERVICE_UNAVAILABLE
+    return JSONResponse(readiness, status_code=status_code)
+
+async def get_metrics(
+    _: None = Depends(https_required),
+    text2video_service: Text2VideoService = Depends(get_text2video_service),
+):
+    # Prometheus text exposition format
+    return PlainTextResponse(text2video_service.get_metrics(), media_type="text/plain; version=0.0.4")
+
+async def get_text2video_job(
+    job_id: str,
+    _: None = Depends(https_required),
+    text2video_service: Text2VideoService = Depends(get_text2video_service),
+):
+    try:
+        return text2video_service.get_job(job_id)
+    except JobNotFoundError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Unknown job")
+
+
+async def get_text2video_video(
+    job_id: str,
+    _: None = Depends(https_required),
+    text2video_service: Text2VideoService = Depends(get_text2video_service),
+):
+    try:
+        video_path = text2video_service.get_video_path(job_id)
+    except JobNotFoundError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Unknown job")
+    if video_path is None:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Video is not ready")
+    if not os.path.exists(video_path):
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail="Video is no longer available")
+    return FileResponse(video_path, media_type="video/mp4", filename=f"{job_id}.mp4")
+
 # Router Class
 class ApiRouter:
     def __init__(self):
@@ -133,6 +238,13 @@ class ApiRouter:
 
     def add_routes(self):
         self.router.add_api_route("/status", get_status, methods=["GET"])
+        self.router.add_api_route("/ready", get_ready, methods=["GET"])
         self.router.add_api_route("/echo", post_echo, methods=["POST"])
         self.router.add_api_route("/speech", post_speech, methods=["POST"])
-        self.router.add_api_route("/text2video", post_text2video, methods=["POST"])  # New route
+        self.router.add_api_route("/speech/stream", post_speech_stream, methods=["POST"])
+        self.router.add_api_route("/text2video", post_text2video, methods=["POST"], status_code=status.HTTP_202_ACCEPTED)
+        self.router.add_api_route("/text2video/{job_id}", get_text2video_job, methods=["GET"])
+        self.router.add_api_route("/text2video/{job_id}/cancel", post_text2video_cancel, methods=["POST"])
+        self.router.add_api_route("/text2video/{job_id}/video", get_text2video_video, methods=["GET"])
+        if get_section("tracing").get("metrics_endpoint", "true").lower() == "true":
+            self.router.add_api_route("/metrics", get_metrics, methods=["GET"], response_class=PlainTextResponse)
@@ -4,5 +4,8 @@ class SpeechService:
     def __init__(self, controller: SpeechController):
         self.controller = controller
 
-    def create_speech(self, topic: str) -> str:
-        return self.controller.generate_speech(topic)
+    def create_speech(self, topic: str, use_cache: bool = True) -> str:
+        return self.controller.generate_speech(topic, use_cache=use_cache)
+
+    def stream_speech(self, topic: str, use_cache: bool = True):
+        return self.controller.stream_speech(topic, use_cache=use_cache)
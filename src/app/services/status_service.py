@@ -6,3 +6,6 @@ class StatusService:
 
     def get_status(self) -> str:
         return self.controller.check_status()
+
+    def get_readiness(self) -> dict:
+        return self.controller.check_readiness()
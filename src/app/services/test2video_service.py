@@ -4,5 +4,20 @@ class Text2VideoService:
     def __init__(self, controller: Text2VideoController):
         self.controller = controller
 
-    def create_video(self, topic: str, speech: str) -> None:
-        self.controller.generate_video(topic, speech)
+    def create_video(self, topic: str, speech: str) -> str:
+        return self.controller.generate_video(topic, speech)
+
+    def submit_video(self, topic: str, speech: str, profile: str | None = None, profiling: bool = False) -> dict:
+        return self.controller.submit_video(topic, speech, profile=profile, profiling=profiling)
+
+    def get_metrics(self) -> str:
+        return self.controller.get_metrics()
+
+    def get_job(self, job_id: str) -> dict:
+        return self.controller.get_job(job_id)
+
+    def cancel_job(self, job_id: str) -> dict:
+        return self.controller.cancel_job(job_id)
+
+    def get_video_path(self, job_id: str) -> str | None:
+        return self.controller.get_video_path(job_id)
@@ -0,0 +1,164 @@
+import copy
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import torch
+
+
+class BatcherClosedError(RuntimeError):
+    pass
+
+
+class SpeechBatcher:
+    """
+    Collects prompts submitted concurrently and generates them as one padded batch.
+
+    A background thread takes the first waiting prompt, then keeps collecting for up to
+    `max_wait_ms` or until `max_batch_size` prompts are in hand, runs a single generate()
+    over all of them and hands every caller its own result.
+    """
+
+    def __init__(self, tokenizer, model, stopping_criteria_factory, max_batch_size: int = 4,
+                 max_wait_ms: int = 50, max_new_tokens: int = 1024, temperature: float = 0.7, logger=None):
+        # A private copy: the registry shares the tokenizer with the pipeline, the KV-cache
+        # sessions and the streaming path, which must not pick up our pad token or left
+        # padding. Deep, because a fast tokenizer keeps its padding setup on the Rust backend
+        self.tokenizer = copy.deepcopy(tokenizer)
+        self.model = model
+        # Called per batch so stateful criteria never leak between batches
+        self.stopping_criteria_factory = stopping_criteria_factory
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_seconds = max(0, max_wait_ms) / 1000.0
+        self.max_new_tokens = max_new_tokens
+        self.temperature = temperature
+        self.logger = logger
+
+        if self.tokenizer.pad_token is None:
+            self.tokenizer.pad_token = self.tokenizer.eos_token
+        # Decoder-only models must be padded on the left so generation continues the prompt
+        self.tokenizer.padding_side = "left"
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._metrics = {
+            "batches": 0,
+            "requests": 0,
+            "utilization_total": 0.0,
+            "padding_ratio_total": 0.0,
+            "last_batch_size": 0,
+            "last_batch_seconds": None,
+        }
+        self._closed = False
+        # Orders submit() against close(), so nothing is queued behind the shutdown marker
+        self._submit_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._loop, name="speech-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, prompt: str) -> Future:
+        future = Future()
+        with self._submit_lock:
+            if self._closed:
+                raise BatcherClosedError("SpeechBatcher is closed")
+            self._queue.put((prompt, future))
+        return future
+
+    def generate(self, prompt: str) -> str:
+        """
+        Blocking helper: returns the prompt followed by the generated text, like the
+        text-generation pipeline does with return_full_text.
+        """
+        return self.submit(prompt).result()
+
+    def close(self):
+        with self._submit_lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+        # Prompts queued before the marker are still generated
+        self._thread.join()
+
+    def _collect(self) -> list:
+        first = self._queue.get()
+        if first is None:
+            return []
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait_seconds
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                self._queue.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _loop(self):
+        while True:
+            batch = self._collect()
+            if not batch:
+                return
+            live = [(prompt, future) for prompt, future in batch if future.set_running_or_notify_cancel()]
+            if not live:
+                continue
+            try:
+                results = self._run_batch([prompt for prompt, _ in live])
+            except Exception as e:
+                for _, future in live:
+                    future.set_exception(e)
+                continue
+            for (_, future), result in zip(live, results):
+                future.set_result(result)
+
+    def _run_batch(self, prompts: list[str]) -> list[str]:
+        inputs = self.tokenizer(prompts, return_tensors="pt", padding=True).to(self.model.device)
+        start = time.perf_counter()
+        with torch.no_grad():
+            output = self.model.generate(
+                **inputs,
+                max_new_tokens=self.max_new_tokens,
+                stopping_criteria=self.stopping_criteria_factory(),
+                temperature=self.temperature,
+                do_sample=True,
+                pad_token_id=self.tokenizer.pad_token_id,
+            )
+        elapsed = time.perf_counter() - start
+
+        prompt_length = inputs["input_ids"].shape[1]
+        generated = self.tokenizer.batch_decode(output[:, prompt_length:], skip_special_tokens=True)
+        padding_ratio = 1.0 - inputs["attention_mask"].float().mean().item()
+        self._record(len(prompts), elapsed, padding_ratio)
+        return [prompt + text for prompt, text in zip(prompts, generated)]
+
+    def _record(self, size: int, seconds: float, padding_ratio: float):
+        utilization = size / self.max_batch_size
+        with self._lock:
+            self._metrics["batches"] += 1
+            self._metrics["requests"] += size
+            self._metrics["utilization_total"] += utilization
+            self._metrics["padding_ratio_total"] += padding_ratio
+            self._metrics["last_batch_size"] = size
+            self._metrics["last_batch_seconds"] = seconds
+        if self.logger is not None:
+            self.logger.info(
+                f"Generated batch of {size}/{self.max_batch_size} in {seconds:.2f}s "
+                f"(utilization {utilization:.0%}, padding {padding_ratio:.0%})"
+            )
+
+    def metrics(self) -> dict:
+        with self._lock:
+            metrics = dict(self._metrics)
+        batches = metrics["batches"] or 1
+        metrics["mean_batch_size"] = metrics["requests"] / batches
+        metrics["mean_utilization"] = metrics.pop("utilization_total") / batches
+        metrics["mean_padding_ratio"] = metrics.pop("padding_ratio_total") / batches
+        metrics["max_batch_size"] = self.max_batch_size
+        metrics["queued"] = self._queue.qsize()
+        return metrics
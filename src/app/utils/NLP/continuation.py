@@ -0,0 +1,102 @@
+import time
+
+import torch
+from transformers import DynamicCache
+
+
+class CachedSpeechSession:
+    """
+    Generates a speech in rounds on one growing token sequence, keeping the model's key/value
+    cache between rounds. Each extension only runs the model over tokens it has not seen yet,
+    instead of re-encoding a rebuilt prompt.
+
+    When a round ends on the stop phrase, the phrase is cut from both the sequence and the
+    cache, a newline is appended and the next round carries on from there.
+    """
+
+    # The stop phrase spans only a few tokens; no need to search further back than this
+    STOP_SEARCH_TOKENS = 16
+
+    def __init__(self, tokenizer, model, prompt: str, stop_phrase: str, stopping_criteria,
+                 max_new_tokens: int = 1024, temperature: float = 0.7):
+        self.tokenizer = tokenizer
+        self.model = model
+        self.stop_phrase = stop_phrase.lower()
+        self.stopping_criteria = stopping_criteria
+        self.max_new_tokens = max_new_tokens
+        self.temperature = temperature
+
+        self.input_ids = tokenizer(prompt, return_tensors="pt").input_ids.to(model.device)
+        self.prompt_length = self.input_ids.shape[1]
+        self.cache = DynamicCache()
+        self.max_positions = getattr(model.config, "max_position_embeddings", None)
+        self.rounds = []
+
+    def _cached_length(self) -> int:
+        return self.cache.get_seq_length()
+
+    def _strip_stop_phrase(self, new_ids: torch.Tensor) -> tuple[torch.Tensor, bool]:
+        tokens = new_ids.tolist()
+        for k in range(1, min(len(tokens), self.STOP_SEARCH_TOKENS) + 1):
+            if self.stop_phrase in self.tokenizer.decode(tokens[-k:], skip_special_tokens=True).lower():
+                return new_ids[:-k], True
+        return new_ids, False
+
+    def extend(self) -> dict:
+        """
+        Run one generation round. Returns the round's text and token/timing stats.
+        """
+        max_new = self.max_new_tokens
+        if self.max_positions is not None:
+            max_new = min(max_new, self.max_positions - self.input_ids.shape[1])
+        if max_new <= 0:
+            return {"text": "", "stopped": False, "exhausted": True}
+
+        cached = self._cached_length()
+        prompt_tokens = self.input_ids.shape[1] - cached
+
+        start = time.perf_counter()
+        output = self.model.generate(
+            input_ids=self.input_ids,
+            attention_mask=torch.ones_like(self.input_ids),
+            past_key_values=self.cache,
+            max_new_tokens=max_new,
+            stopping_criteria=self.stopping_criteria,
+            temperature=self.temperature,
+            do_sample=True,
+            pad_token_id=self.tokenizer.pad_token_id or self.tokenizer.eos_token_id,
+            return_dict_in_generate=True,
+        )
+        elapsed = time.perf_counter() - start
+
+        new_ids = output.sequences[0, self.input_ids.shape[1]:]
+        generated_tokens = new_ids.shape[0]
+        eos_id = self.tokenizer.eos_token_id
+        if generated_tokens and eos_id is not None and new_ids[-1].item() == eos_id:
+            new_ids = new_ids[:-1]
+        kept_ids, stopped = self._strip_stop_phrase(new_ids)
+
+        self.cache = output.past_key_values
+        kept_length = self.input_ids.shape[1] + kept_ids.shape[0]
+        # Drop cache entries of the removed stop phrase / EOS so the next round sees a clean prefix
+        if self._cached_length() > kept_length:
+            self.cache.crop(kept_length)
+
+        separator = self.tokenizer("\n", add_special_tokens=False, return_tensors="pt").input_ids.to(self.model.device)
+        self.input_ids = torch.cat([self.input_ids, kept_ids[None, :], separator], dim=1)
+
+        stats = {
+            "text": self.tokenizer.decode(kept_ids, skip_special_tokens=True),
+            "stopped": stopped,
+            "exhausted": False,
+            "prompt_tokens": prompt_tokens,
+            "cached_tokens": cached,
+            "generated_tokens": generated_tokens,
+            "seconds": elapsed,
+            "tokens_per_second": generated_tokens / elapsed if elapsed > 0 else 0.0,
+        }
+        self.rounds.append({k: v for k, v in stats.items() if k != "text"})
+        return stats
+
+    def speech_text(self) -> str:
+        return self.tokenizer.decode(self.input_ids[0, self.prompt_length:], skip_special_tokens=True).strip()
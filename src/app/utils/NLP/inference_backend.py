@@ -0,0 +1,55 @@
+import torch
+from transformers import AutoTokenizer, AutoModelForCausalLM
+
+BACKENDS = ("auto", "fp16", "fp32", "bf16", "int8")
+
+
+def resolve_backend(backend: str) -> str:
+    backend = (backend or "auto").lower()
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown inference backend '{backend}', expected one of {BACKENDS}")
+    if backend == "auto":
+        # Half precision is slow or unsupported on most CPUs
+        return "fp16" if torch.cuda.is_available() else "fp32"
+    return backend
+
+
+def configure_threads(intra_op_threads: int = 0, inter_op_threads: int = 0):
+    """
+    Set torch's thread pools; 0 keeps torch's default. The inter-op pool can only be sized
+    before the first parallel op runs, so a late call is ignored with a warning.
+    """
+    if intra_op_threads > 0:
+        torch.set_num_threads(intra_op_threads)
+    if inter_op_threads > 0:
+        try:
+            torch.set_num_interop_threads(inter_op_threads)
+        except RuntimeError as e:
+            print(f"[WARN] Could not set inter-op threads: {e}")
+
+
+def load_model(name: str, backend: str = "auto", compile_model: bool = False):
+    """
+    Load tokenizer and causal LM for the given backend:
+
+    - fp16: GPU placement via device_map="auto" (the original behaviour)
+    - fp32 / bf16: CPU in that dtype
+    - int8: CPU fp32 weights with Linear layers dynamically quantized to int8
+    """
+    backend = resolve_backend(backend)
+    tokenizer = AutoTokenizer.from_pretrained(name)
+
+    if backend == "fp16":
+        model = AutoModelForCausalLM.from_pretrained(name, device_map="auto", torch_dtype=torch.float16)
+    else:
+        dtype = torch.bfloat16 if backend == "bf16" else torch.float32
+        model = AutoModelForCausalLM.from_pretrained(name, torch_dtype=dtype)
+        if backend == "int8":
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    model.eval()
+
+    if compile_model:
+        # Compile only the forward pass so generate() and the HF pipeline keep working unchanged
+        model.forward = torch.compile(model.forward, dynamic=True)
+
+    return tokenizer, model, backend
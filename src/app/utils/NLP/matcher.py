@@ -0,0 +1,201 @@
+import re
+import threading
+
+import numpy as np
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]{2,}")
+SCORERS = ("tfidf", "embedding")
+
+_embedding_models = {}
+_embedding_models_lock = threading.Lock()
+
+
+def tokenize(text: str) -> list[str]:
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class TfidfScorer:
+    """
+    Cosine similarity between TF-IDF vectors of queries and image titles.
+
+    The title matrix is built once per image set; all queries are scored with a single
+    matrix product.
+    """
+
+    name = "tfidf"
+
+    def __init__(self):
+        self.vocabulary = {}
+        self.idf = None
+        self.title_matrix = None
+
+    def _vectorize(self, docs: list[list[str]]) -> np.ndarray:
+        matrix = np.zeros((len(docs), len(self.vocabulary)), dtype=np.float32)
+        for row, tokens in enumerate(docs):
+            for token in tokens:
+                col = self.vocabulary.get(token)
+                if col is not None:
+                    matrix[row, col] += 1.0
+        matrix *= self.idf
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    def fit(self, titles: list[str]):
+        docs = [tokenize(title) for title in titles]
+        for tokens in docs:
+            for token in tokens:
+                self.vocabulary.setdefault(token, len(self.vocabulary))
+
+        doc_freq = np.zeros(len(self.vocabulary), dtype=np.float32)
+        for tokens in docs:
+            for token in set(tokens):
+                doc_freq[self.vocabulary[token]] += 1.0
+        # Smoothed idf, as in scikit-learn
+        self.idf = np.log((1.0 + len(docs)) / (1.0 + doc_freq)) + 1.0
+        self.title_matrix = self._vectorize(docs)
+        return self
+
+    def score(self, queries: list[str]) -> np.ndarray:
+        query_matrix = self._vectorize([tokenize(query) for query in queries])
+        return query_matrix @ self.title_matrix.T
+
+
+def load_embedding_model(model_name: str = "all-MiniLM-L6-v2"):
+    """
+    One SentenceTransformer per model name, shared by the whole process.
+    """
+    with _embedding_models_lock:
+        if model_name not in _embedding_models:
+            from sentence_transformers import SentenceTransformer
+
+            _embedding_models[model_name] = SentenceTransformer(model_name)
+        return _embedding_models[model_name]
+
+
+class EmbeddingScorer:
+    """
+    Cosine similarity of sentence-transformers embeddings. Captures meaning rather than
+    shared words, at the cost of loading an embedding model.
+
+    The model is shared process-wide (see load_embedding_model); each scorer only holds the
+    title matrix of its own image set.
+    """
+
+    name = "embedding"
+
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
+        self.model = load_embedding_model(model_name)
+        self.title_matrix = None
+
+    def fit(self, titles: list[str]):
+        self.title_matrix = self.model.encode(titles, normalize_embeddings=True, convert_to_numpy=True)
+        return self
+
+    def score(self, queries: list[str]) -> np.ndarray:
+        query_matrix = self.model.encode(queries, normalize_embeddings=True, convert_to_numpy=True)
+        return query_matrix @ self.title_matrix.T
+
+
+def _hungarian(cost: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Minimum-cost assignment for a rectangular cost matrix with rows <= columns
+    (O(n^2 m) potentials method, inner loops vectorized).
+    """
+    n, m = cost.shape
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    p = np.zeros(m + 1, dtype=int)    # p[j]: row (1-based) assigned to column j
+    way = np.zeros(m + 1, dtype=int)
+
+    for i in range(1, n + 1):
+        p[0] = i
+        j0 = 0
+        minv = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+        while True:
+            used[j0] = True
+            i0 = p[j0]
+            free = ~used
+            free[0] = False
+            cur = cost[i0 - 1] - u[i0] - v[1:]
+            cur_full = np.concatenate(([np.inf], cur))
+            improve = free & (cur_full < minv)
+            minv[improve] = cur_full[improve]
+            way[improve] = j0
+
+            candidates = np.where(free, minv, np.inf)
+            j1 = int(np.argmin(candidates))
+            delta = candidates[j1]
+
+            u[p[used]] += delta
+            v[used] -= delta
+            minv[free] -= delta
+            j0 = j1
+            if p[j0] == 0:
+                break
+        while True:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+            if j0 == 0:
+                break
+
+    cols = np.nonzero(p[1:])[0]
+    rows = p[1:][cols] - 1
+    order = np.argsort(rows)
+    return rows[order], cols[order]
+
+
+def linear_sum_assignment(cost: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    try:
+        from scipy.optimize import linear_sum_assignment as scipy_assignment
+        return scipy_assignment(cost)
+    except ImportError:
+        pass
+    if cost.shape[0] <= cost.shape[1]:
+        return _hungarian(cost)
+    cols, rows = _hungarian(cost.T)
+    order = np.argsort(rows)
+    return rows[order], cols[order]
+
+
+def get_scorer(name: str = "tfidf", **kwargs):
+    name = (name or "tfidf").lower()
+    if name not in SCORERS:
+        raise ValueError(f"Unknown matching scorer '{name}', expected one of {SCORERS}")
+    if name == "embedding":
+        return EmbeddingScorer(**kwargs)
+    return TfidfScorer()
+
+
+class SentenceImageMatcher:
+    """
+    Assigns at most one image to each parsed sentence, maximizing the total similarity
+    between sentence keywords and image titles.
+    """
+
+    # Proper nouns name the specific subject, so they count double in the query
+    PROPER_NOUN_WEIGHT = 2
+
+    def __init__(self, scorer=None):
+        self.scorer = scorer or TfidfScorer()
+
+    def query_for(self, sentence_obj: dict) -> str:
+        terms = list(sentence_obj.get("common_nouns", []))
+        terms += list(sentence_obj.get("proper_nouns", [])) * self.PROPER_NOUN_WEIGHT
+        if not terms:
+            # Nothing was extracted (e.g. very short sentences); fall back to the full text
+            return sentence_obj.get("sentence", "")
+        return " ".join(terms)
+
+    def match(self, parsed_sentences: list[dict], images: list[dict]) -> list[tuple[int, int]]:
+        """
+        Returns (sentence index, image index) pairs sorted by sentence index.
+        """
+        if not parsed_sentences or not images:
+            return []
+        self.scorer.fit([img.get("title", "") for img in images])
+        scores = self.scorer.score([self.query_for(obj) for obj in parsed_sentences])
+        rows, cols = linear_sum_assignment(-scores)
+        return sorted(zip(rows.tolist(), cols.tolist()))
@@ -0,0 +1,152 @@
+import gc
+import threading
+import time
+from collections import OrderedDict
+
+
+class LoadedModel:
+    """
+    A tokenizer, model and LangChain pipeline that were loaded together for one model name.
+    """
+
+    def __init__(self, name: str, tokenizer, model, llm, load_seconds: float):
+        self.name = name
+        self.tokenizer = tokenizer
+        self.model = model
+        self.llm = llm
+        self.load_seconds = load_seconds
+        self.loaded_at = time.time()
+
+
+class ModelRegistry:
+    """
+    Process-wide cache of loaded models.
+
+    Each model name is loaded at most once per worker and shared by every caller. When more
+    than `max_loaded` models are requested, the least recently used one is evicted.
+
+    Evicting or unloading only drops the registry's reference: callers still holding the
+    LoadedModel keep a working model, which is freed once the last of them lets go.
+    `on_release(name)` is called for every evicted or unloaded name, so owners of derived
+    objects (e.g. batchers) can drop their references too.
+    """
+
+    def __init__(self, loader, max_loaded: int = 1, on_release=None):
+        # loader(name) -> (tokenizer, model, llm)
+        self.loader = loader
+        self.max_loaded = max(1, max_loaded)
+        self.on_release = on_release
+        self._models = OrderedDict()
+        self._lock = threading.Lock()
+        self._name_locks = {}
+        self._metrics = {}
+
+    def _name_lock(self, name):
+        with self._lock:
+            return self._name_locks.setdefault(name, threading.Lock())
+
+    def _stats(self, name):
+        return self._metrics.setdefault(name, {
+            "loads": 0,
+            "load_seconds_total": 0.0,
+            "last_load_seconds": None,
+            "generations": 0,
+            "generate_seconds_total": 0.0,
+            "last_generate_seconds": None,
+            "evictions": 0,
+        })
+
+    def get(self, name: str) -> LoadedModel:
+        with self._lock:
+            entry = self._models.get(name)
+            if entry is not None:
+                self._models.move_to_end(name)
+                return entry
+
+        # Serialize loads per name so concurrent first requests load the weights only once
+        with self._name_lock(name):
+            with self._lock:
+                entry = self._models.get(name)
+                if entry is not None:
+                    self._models.move_to_end(name)
+                    return entry
+
+            start = time.perf_counter()
+            tokenizer, model, llm = self.loader(name)
+            elapsed = time.perf_counter() - start
+            entry = LoadedModel(name, tokenizer, model, llm, elapsed)
+
+            with self._lock:
+                self._models[name] = entry
+                self._models.move_to_end(name)
+                stats = self._stats(name)
+                stats["loads"] += 1
+                stats["load_seconds_total"] += elapsed
+                stats["last_load_seconds"] = elapsed
+                evicted = self._evict_over_capacity()
+
+            for old in evicted:
+                self._release(old)
+            return entry
+
+    def _evict_over_capacity(self):
+        evicted = []
+        while len(self._models) > self.max_loaded:
+            old_name, old_entry = self._models.popitem(last=False)
+            self._stats(old_name)["evictions"] += 1
+            evicted.append(old_entry)
+        return evicted
+
+    def _release(self, entry: LoadedModel):
+        if self.on_release is not None:
+            self.on_release(entry.name)
+        gc.collect()
+        try:
+            import torch
+            if torch.cuda.is_available():
+                torch.cuda.empty_cache()
+        except ImportError:
+            pass
+
+    def warm_up(self, names):
+        for name in names:
+            self.get(name)
+
+    def unload(self, name: str | None = None) -> list[str]:
+        """
+        Unload one model, or every model when `name` is None. Returns the unloaded names.
+        """
+        with self._lock:
+            if name is None:
+                entries = list(self._models.values())
+                self._models.clear()
+            else:
+                entry = self._models.pop(name, None)
+                entries = [entry] if entry is not None else []
+
+        for entry in entries:
+            self._release(entry)
+        return [entry.name for entry in entries]
+
+    def is_loaded(self, name: str) -> bool:
+        with self._lock:
+            return name in self._models
+
+    def loaded_names(self) -> list[str]:
+        with self._lock:
+            return list(self._models.keys())
+
+    def record_generate(self, name: str, seconds: float):
+        with self._lock:
+            stats = self._stats(name)
+            stats["generations"] += 1
+            stats["generate_seconds_total"] += seconds
+            stats["last_generate_seconds"] = seconds
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {
+                "loaded": list(self._models.keys()),
+                "max_loaded": self.max_loaded,
+                "models": {name: dict(stats) for name, stats in self._metrics.items()},
+            }
@@ -1,18 +1,87 @@
+import threading
+
 import spacy
 
+from Ross_git.src.app.config.app_config import get_section
+
+# Keyword buckets filled from each token's part of speech; ROOT verbs are picked by dependency
+POS_BUCKETS = {"PRON": "pronouns", "NOUN": "common_nouns", "PROPN": "proper_nouns"}
+
+_pipelines = {}
+_pipelines_lock = threading.Lock()
+
+
+def load_pipeline(model_name: str = "en_core_web_sm", disable: tuple[str, ...] = (),
+                  sentences_only: bool = False):
+    """
+    One spaCy pipeline per (model, disabled components, mode), shared by the whole process.
+
+    `sentences_only` skips the model entirely: a blank English pipeline with the rule-based
+    sentencizer, for callers that only need sentence boundaries.
+    """
+    key = ("blank:en", (), True) if sentences_only else (model_name, tuple(sorted(disable)), False)
+    with _pipelines_lock:
+        if key not in _pipelines:
+            if sentences_only:
+                nlp = spacy.blank("en")
+                nlp.add_pipe("sentencizer")
+            else:
+                try:
+                    nlp = spacy.load(model_name, disable=list(disable))
+                except OSError:
+                    from spacy.cli import download
+                    download(model_name)
+                    nlp = spacy.load(model_name, disable=list(disable))
+            _pipelines[key] = nlp
+        return _pipelines[key]
+
+
 class NLPParser:
     """
     An object-oriented NLP parser that splits text into sentences and extracts
     root verbs, pronouns, common nouns, and proper nouns, excluding stopwords.
+
+    The spaCy pipeline is shared process-wide (see load_pipeline). Components the parser does
+    not read, NER and the lemmatizer by default, are disabled. With `sentences_only` the
+    keyword lists stay empty and only sentence boundaries are computed.
     """
 
-    def __init__(self, model_name: str = "en_core_web_sm"):
-        try:
-            self.nlp = spacy.load(model_name)
-        except OSError:
-            from spacy.cli import download
-            download(model_name)
-            self.nlp = spacy.load(model_name)
+    def __init__(self, model_name: str = "en_core_web_sm", disable: tuple[str, ...] = ("ner", "lemmatizer"),
+                 sentences_only: bool = False, batch_size: int = 32, n_process: int = 1):
+        self.sentences_only = sentences_only
+        self.batch_size = batch_size
+        self.n_process = n_process
+        self.nlp = load_pipeline(model_name, disable, sentences_only)
+
+    @classmethod
+    def from_config(cls) -> "NLPParser":
+        nlp_config = get_section("nlp")
+        disable = tuple(name.strip() for name in nlp_config.get("disable", "ner,lemmatizer").split(",") if name.strip())
+        return cls(
+            model_name=nlp_config.get("model", "en_core_web_sm"),
+            disable=disable,
+            sentences_only=nlp_config.get("mode", "full").lower() == "sentences",
+            batch_size=int(nlp_config.get("batch_size", 32)),
+            n_process=int(nlp_config.get("n_process", 1)),
+        )
+
+    def _sentences(self, doc) -> list[dict]:
+        results = []
+        for sent in doc.sents:
+            item = {"sentence": sent.text.strip(), "root_verbs": [], "pronouns": [],
+                    "common_nouns": [], "proper_nouns": []}
+            if not self.sentences_only:
+                # One pass over the tokens fills every bucket
+                for tok in sent:
+                    if tok.is_stop:
+                        continue
+                    bucket = POS_BUCKETS.get(tok.pos_)
+                    if bucket is not None:
+                        item[bucket].append(tok.text)
+                    if tok.dep_ == "ROOT":
+                        item["root_verbs"].append(tok.text)
+            results.append(item)
+        return results
 
     def process(self, text: str) -> list[dict]:
         """
@@ -23,24 +92,20 @@ class NLPParser:
         - common_nouns: list of common nouns (non-stopwords)
         - proper_nouns: list of proper nouns (non-stopwords)
         """
-        doc = self.nlp(text)
-        results = []
+        return self._sentences(self.nlp(text))
 
-        for sent in doc.sents:
-            root_verbs = [tok.text for tok in sent if tok.dep_ == "ROOT" and not tok.is_stop]
-            pronouns = [tok.text for tok in sent if tok.pos_ == "PRON" and not tok.is_stop]
-            common_nouns = [tok.text for tok in sent if tok.pos_ == "NOUN" and not tok.is_stop]
-            proper_nouns = [tok.text for tok in sent if tok.pos_ == "PROPN" and not tok.is_stop]
-
-            results.append({
-                "sentence": sent.text.strip(),
-                "root_verbs": root_verbs,
-                "pronouns": pronouns,
-                "common_nouns": common_nouns,
-                "proper_nouns": proper_nouns
-            })
-
-        return results
+    def process_many(self, texts: list[str], batch_size: int | None = None,
+                     n_process: int | None = None) -> list[list[dict]]:
+        """
+        `process` for several documents at once through nlp.pipe, in input order. With
+        `n_process` > 1 spaCy parses the batches in worker processes.
+        """
+        docs = self.nlp.pipe(
+            texts,
+            batch_size=batch_size or self.batch_size,
+            n_process=n_process or self.n_process,
+        )
+        return [self._sentences(doc) for doc in docs]
 
     def display(self, results: list[dict]) -> None:
         """
@@ -55,4 +120,13 @@ class NLPParser:
             print(f"   Proper Nouns: {', '.join(item['proper_nouns']) or 'None'}")
 
 
+_parser = None
+_parser_lock = threading.Lock()
+
 
+def get_nlp_parser() -> NLPParser:
+    global _parser
+    with _parser_lock:
+        if _parser is None:
+            _parser = NLPParser.from_config()
+        return _parser
@@ -0,0 +1,98 @@
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from Ross_git.src.app.config.app_config import get_section
+from Ross_git.src.app.utils.websearch.search_cache import normalize_query
+
+
+def speech_cache_key(topic: str, **params) -> str:
+    """
+    Key over the normalized topic and every generation parameter that changes the output.
+    """
+    payload = json.dumps({"topic": normalize_query(topic), **params}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SpeechResultCache:
+    """
+    Persistent cache of finished speeches in SQLite, shared by every worker process.
+
+    Entries expire after `ttl_seconds`; beyond `max_entries` the least recently used
+    ones are dropped.
+    """
+
+    def __init__(self, db_path: str | None = None, ttl_seconds: int = 7 * 24 * 3600, max_entries: int = 1000):
+        self.db_path = db_path or os.path.join(tempfile.gettempdir(), "ross_speech_cache.sqlite3")
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max(1, max_entries)
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS speeches ("
+                " key TEXT PRIMARY KEY,"
+                " topic TEXT NOT NULL,"
+                " speech TEXT NOT NULL,"
+                " stored_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL)"
+            )
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def get(self, key: str) -> str | None:
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute("SELECT speech, stored_at FROM speeches WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if now - row[1] >= self.ttl_seconds:
+                conn.execute("DELETE FROM speeches WHERE key = ?", (key,))
+                return None
+            conn.execute("UPDATE speeches SET accessed_at = ? WHERE key = ?", (now, key))
+        return row[0]
+
+    def put(self, key: str, topic: str, speech: str):
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO speeches (key, topic, speech, stored_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, topic, speech, now, now),
+            )
+            self._evict(conn, now)
+
+    def _evict(self, conn, now: float):
+        conn.execute("DELETE FROM speeches WHERE stored_at < ?", (now - self.ttl_seconds,))
+        conn.execute(
+            "DELETE FROM speeches WHERE key NOT IN"
+            " (SELECT key FROM speeches ORDER BY accessed_at DESC LIMIT ?)",
+            (self.max_entries,),
+        )
+
+
+_speech_cache = None
+_speech_cache_lock = threading.Lock()
+
+
+def get_speech_cache() -> SpeechResultCache | None:
+    """
+    Process-wide cache built from the [speech_cache] section, or None when disabled.
+    """
+    global _speech_cache
+    cache_config = get_section("speech_cache")
+    if cache_config.get("enabled", "true").lower() != "true":
+        return None
+    with _speech_cache_lock:
+        if _speech_cache is None:
+            _speech_cache = SpeechResultCache(
+                db_path=cache_config.get("db_path") or None,
+                ttl_seconds=int(cache_config.get("ttl_seconds", 7 * 24 * 3600)),
+                max_entries=int(cache_config.get("max_entries", 1000)),
+            )
+        return _speech_cache
@@ -1,13 +1,21 @@
 import re
+import threading
+import time
 
 import torch
 from langchain.chains import LLMChain
 from langchain.prompts import PromptTemplate
 from langchain_community.llms import HuggingFacePipeline
-from transformers import AutoTokenizer, AutoModelForCausalLM, pipeline, StoppingCriteria, StoppingCriteriaList
+from transformers import pipeline, set_seed, StoppingCriteria, StoppingCriteriaList, TextIteratorStreamer
 
 from Ross_git.logs.log_manager import setup_logger
 from Ross_git.src.app.config.app_config import get_section
+from Ross_git.src.app.utils.NLP.batcher import BatcherClosedError, SpeechBatcher
+from Ross_git.src.app.utils.NLP.continuation import CachedSpeechSession
+from Ross_git.src.app.utils.NLP.inference_backend import configure_threads, load_model
+from Ross_git.src.app.utils.NLP.model_registry import ModelRegistry
+from Ross_git.src.app.utils.NLP.speech_cache import get_speech_cache, speech_cache_key
+from Ross_git.src.app.utils.core.startup import check_config
 
 # Initialize logging using the log manager
 logger = setup_logger()
@@ -16,39 +24,109 @@ logger = setup_logger()
 logger.info("Loading configurations...")
 model_config = get_section("model")
 speech_config = get_section("speech")
+batching_config = get_section("batching")
 
 # Cast types (configparser loads values as strings)
 model_name = model_config.get("name", "TinyLlama/TinyLlama-1.1B-Chat-v0.3")
 max_new_tokens = int(model_config.get("max_new_tokens", 1024))
 temperature = float(model_config.get("temperature", 0.7))
 stop_phrase = model_config.get("stop_phrase", "END OF SPEECH")
+max_loaded_models = int(model_config.get("max_loaded_models", 1))
+inference_backend = model_config.get("backend", "auto")
+intra_op_threads = int(model_config.get("intra_op_threads", 0))
+inter_op_threads = int(model_config.get("inter_op_threads", 0))
+compile_model = model_config.get("compile", "false").lower() == "true"
+warmup_on_startup = model_config.get("warmup_on_startup", "true").lower() == "true"
+warmup_models = [
+    name.strip() for name in model_config.get("warmup_models", model_name).split(",") if name.strip()
+]
 
 word_count = int(speech_config.get("word_count", 900))
 retries = int(speech_config.get("retries", 3))
+continuation_mode = speech_config.get("continuation_mode", "kv_cache").lower()
+seed = speech_config.get("seed", "").strip()
+seed = int(seed) if seed else None
+
+batching_enabled = batching_config.get("enabled", "false").lower() == "true"
+max_batch_size = int(batching_config.get("max_batch_size", 4))
+max_wait_ms = int(batching_config.get("max_wait_ms", 50))
+# Also checked at app start; this covers scripts that import the generator directly
+check_config()
 
 logger.info(f"Model: {model_name}, max_new_tokens: {max_new_tokens}, temperature: {temperature}")
 logger.info(f"Speech target word count: {word_count}, retries: {retries}, stop_phrase: '{stop_phrase}'")
 
+SPEECH_TEMPLATE = f"""
+You are a professional public speaker. Write a clear and compelling speech of around {word_count} words, paragraph per ascii line, on the following topic:
+
+Topic: {{topic}}
+
+Only return the speech that has {word_count} words approximately. When done, write {stop_phrase}
+
+START OF SPEECH:
+"""
+CONTINUATION_TEMPLATE = SPEECH_TEMPLATE + "{last_paragraph}\n"
+FALLBACK_SPEECH = "Try again or use a different model."
+
 
 class EndOfSpeechCriteria(StoppingCriteria):
+    """
+    Stops each sequence of the batch once it ends with the stop phrase.
+
+    The phrase is matched on token IDs. Every case variant, tokenized both on its own and
+    after a space, a newline or a word (SentencePiece encodes these differently), is
+    precomputed here, so each step is one tensor comparison per variant length and no decode.
+    """
+
+    CONTEXTS = ("", " ", "\n", "a ", "a\n", ".\n")
+
     def __init__(self, tokenizer, stop_phrase):
         self.tokenizer = tokenizer
         self.stop_phrase = stop_phrase
         self.stop_ids = tokenizer.encode(stop_phrase, add_special_tokens=False)
 
+        variants = set()
+        texts = {stop_phrase, stop_phrase.upper(), stop_phrase.lower(), stop_phrase.title(), stop_phrase.capitalize()}
+        for text in texts:
+            for context in self.CONTEXTS:
+                context_ids = tokenizer.encode(context, add_special_tokens=False) if context else []
+                ids = tokenizer.encode(context + text, add_special_tokens=False)
+                if ids[:len(context_ids)] == context_ids and len(ids) > len(context_ids):
+                    variants.add(tuple(ids[len(context_ids):]))
+
+        # Group by length so each length is a single (variants x length) comparison
+        self._variants_by_length = {}
+        for ids in variants:
+            self._variants_by_length.setdefault(len(ids), []).append(list(ids))
+        self._device_variants = {}
+
+    def _variants_on(self, device):
+        if device not in self._device_variants:
+            self._device_variants[device] = [
+                (length, torch.tensor(ids, dtype=torch.long, device=device))
+                for length, ids in sorted(self._variants_by_length.items())
+            ]
+        return self._device_variants[device]
+
     def __call__(self, input_ids, scores, **kwargs):
-        generated = self.tokenizer.decode(input_ids[0][-len(self.stop_ids):])
-        return self.stop_phrase.lower() in generated.lower()
+        batch_size, length = input_ids.shape
+        matched = torch.zeros(batch_size, dtype=torch.bool, device=input_ids.device)
+        for variant_length, variants in self._variants_on(input_ids.device):
+            if variant_length > length:
+                continue
+            tail = input_ids[:, -variant_length:]
+            matched |= (tail[:, None, :] == variants[None, :, :]).all(dim=-1).any(dim=-1)
 
+        # generate() keeps finished sequences finished, so only this step's matches are needed.
+        # No per-generation state: one instance is shared by concurrent generations
+        return matched
 
-def load_local_model():
-    logger.info(f"Loading model and tokenizer: {model_name}")
-    tokenizer = AutoTokenizer.from_pretrained(model_name)
-    model = AutoModelForCausalLM.from_pretrained(
-        model_name,
-        device_map="auto",
-        torch_dtype=torch.float16
-    )
+
+def _load_model_bundle(name):
+    logger.info(f"Loading model and tokenizer: {name} (backend: {inference_backend}, compile: {compile_model})")
+    configure_threads(intra_op_threads, inter_op_threads)
+    tokenizer, model, backend = load_model(name, inference_backend, compile_model)
+    logger.info(f"Model {name} loaded with backend {backend}, {torch.get_num_threads()} intra-op threads")
 
     stopping_criteria = StoppingCriteriaList([
         EndOfSpeechCriteria(tokenizer, stop_phrase)
@@ -64,8 +142,100 @@ def load_local_model():
         do_sample=True,
     )
 
-    logger.info("Model pipeline initialized.")
-    return HuggingFacePipeline(pipeline=generate_pipe)
+    logger.info(f"Model pipeline initialized for {name}.")
+    return tokenizer, model, HuggingFacePipeline(pipeline=generate_pipe)
+
+
+_batchers = {}
+_batchers_lock = threading.Lock()
+
+
+def _close_batchers(name=None):
+    with _batchers_lock:
+        batchers = [_batchers.pop(n) for n in list(_batchers) if name is None or n == name]
+    # Outside the lock: close() waits for the batch in flight
+    for batcher in batchers:
+        batcher.close()
+
+
+# Shared by every request in this worker; each model is loaded from disk only once. An evicted
+# model's batcher is closed with it, so the batcher does not keep the weights alive
+model_registry = ModelRegistry(loader=_load_model_bundle, max_loaded=max_loaded_models, on_release=_close_batchers)
+
+
+def get_batcher(name=None):
+    name = name or model_name
+    while True:
+        with _batchers_lock:
+            batcher = _batchers.get(name)
+        if batcher is not None:
+            return batcher
+
+        # Loading may evict another model and close its batcher, which takes _batchers_lock
+        entry = model_registry.get(name)
+        tokenizer = entry.tokenizer
+        with _batchers_lock:
+            if not model_registry.is_loaded(name):
+                # Evicted again before its batcher was registered; an eviction after this
+                # point waits for the lock and closes the batcher registered below
+                continue
+            if name not in _batchers:
+                _batchers[name] = SpeechBatcher(
+                    tokenizer,
+                    entry.model,
+                    stopping_criteria_factory=lambda: StoppingCriteriaList([
+                        EndOfSpeechCriteria(tokenizer, stop_phrase)
+                    ]),
+                    max_batch_size=max_batch_size,
+                    max_wait_ms=max_wait_ms,
+                    max_new_tokens=max_new_tokens,
+                    temperature=temperature,
+                    logger=logger,
+                )
+            return _batchers[name]
+
+
+def batching_metrics():
+    with _batchers_lock:
+        return {name: batcher.metrics() for name, batcher in _batchers.items()}
+
+
+def load_local_model(name=None):
+    return model_registry.get(name or model_name).llm
+
+
+def warm_up_models():
+    if not warmup_on_startup:
+        logger.info("Model warm-up disabled.")
+        return
+    logger.info(f"Warming up models: {warmup_models}")
+    model_registry.warm_up(warmup_models)
+    logger.info(f"Model warm-up finished: {model_registry.metrics()}")
+
+
+def unload_models(name=None):
+    # Closes the matching batchers through the registry's on_release hook
+    unloaded = model_registry.unload(name)
+    logger.info(f"Unloaded models: {unloaded}")
+    return unloaded
+
+
+def run_chain(chain, name=None, **inputs):
+    start = time.perf_counter()
+    if batching_enabled:
+        # Concurrent requests share one forward pass; the result has the same shape as chain.run
+        prompt = chain.prompt.format(**inputs)
+        try:
+            result = get_batcher(name).generate(prompt)
+        except BatcherClosedError:
+            # The model was evicted between looking the batcher up and submitting to it
+            result = get_batcher(name).generate(prompt)
+    else:
+        result = chain.run(**inputs)
+    elapsed = time.perf_counter() - start
+    model_registry.record_generate(name or model_name, elapsed)
+    logger.info(f"Generation took {elapsed:.2f}s")
+    return result
 
 
 def clean_speech_output(text):
@@ -88,23 +258,14 @@ def generate_speech(topic: str):
     logger.info(f"Generating initial speech for topic: '{topic}'")
     llm = load_local_model()
 
-    prompt_template = f"""
-You are a professional public speaker. Write a clear and compelling speech of around {word_count} words, paragraph per ascii line, on the following topic:
-
-Topic: {{topic}}
-
-Only return the speech that has {word_count} words approximately. When done, write {stop_phrase}
-
-START OF SPEECH:
-"""
     chain = LLMChain(llm=llm, prompt=PromptTemplate(
-        template=prompt_template,
+        template=SPEECH_TEMPLATE,
         input_variables=["topic"]
     ))
 
     for attempt in range(1, retries + 1):
         logger.info(f"Speech generation attempt {attempt}/{retries}")
-        result = chain.run(topic=topic)
+        result = run_chain(chain, topic=topic)
         speech_text = clean_speech_output(result)
         if speech_text:
             logger.info("Initial speech generation successful.")
@@ -113,29 +274,19 @@ START OF SPEECH:
             logger.warning("Speech generation failed to extract valid content.")
 
     logger.error("All retries failed. Returning fallback response.")
-    return "Try again or use a different model."
+    return FALLBACK_SPEECH
 
 
 def continue_speech(topic, last_paragraph):
     logger.info("Attempting to continue speech...")
     llm = load_local_model()
 
-    continuation_template = f"""
-You are a professional public speaker. Write a clear and compelling speech of around {word_count} words, paragraph per ascii line, on the following topic:
-
-Topic: {{topic}}
-
-Only return the speech that has {word_count} words approximately. When done, write {stop_phrase}
-
-START OF SPEECH:
-{{last_paragraph}}
-"""
     chain = LLMChain(llm=llm, prompt=PromptTemplate(
-        template=continuation_template,
+        template=CONTINUATION_TEMPLATE,
         input_variables=["topic", "last_paragraph"]
     ))
 
-    result = chain.run(topic=topic, last_paragraph=last_paragraph)
+    result = run_chain(chain, topic=topic, last_paragraph=last_paragraph)
     speech_text = clean_speech_output(result)
     if speech_text:
         logger.info("Continuation successful.")
@@ -144,11 +295,56 @@ START OF SPEECH:
     return speech_text if speech_text else ""
 
 
-def generate_full_speech(topic):
+def generate_full_speech_cached(topic):
+    """
+    Same contract as generate_full_speech, but every continuation round reuses the
+    key/value cache of the previous rounds instead of re-prompting from scratch.
+    """
+    logger.info(f"Generating full speech with cached continuation for topic: '{topic}'")
+    entry = model_registry.get(model_name)
+    stopping_criteria = StoppingCriteriaList([EndOfSpeechCriteria(entry.tokenizer, stop_phrase)])
+
+    for attempt in range(1, retries + 1):
+        session = CachedSpeechSession(
+            entry.tokenizer,
+            entry.model,
+            prompt=SPEECH_TEMPLATE.format(topic=topic),
+            stop_phrase=stop_phrase,
+            stopping_criteria=stopping_criteria,
+            max_new_tokens=max_new_tokens,
+            temperature=temperature,
+        )
+        while count_words(session.speech_text()) < word_count:
+            result = session.extend()
+            if result["exhausted"]:
+                logger.warning("Model context is full, stopping.")
+                break
+            model_registry.record_generate(entry.name, result["seconds"])
+            logger.info(
+                f"Round {len(session.rounds)}: {result['prompt_tokens']} prompt tokens "
+                f"({result['cached_tokens']} cached), {result['generated_tokens']} generated, "
+                f"{result['tokens_per_second']:.1f} tokens/s"
+            )
+            if not result["text"].strip():
+                logger.warning("No extension received, stopping.")
+                break
+            logger.info(f"Current word count: {count_words(session.speech_text())}/{word_count}")
+
+        final_speech = session.speech_text()
+        if final_speech:
+            logger.info(f"Final word count: {count_words(final_speech)}")
+            return final_speech
+        logger.warning(f"Speech generation attempt {attempt}/{retries} produced no content.")
+
+    logger.error("All retries failed. Returning fallback response.")
+    return FALLBACK_SPEECH
+
+
+def generate_full_speech_reprompt(topic):
     logger.info(f"Generating full speech for topic: '{topic}'")
     final_speech = generate_speech(topic)
 
-    if final_speech == "Use a different model":
+    if final_speech == FALLBACK_SPEECH:
         return final_speech
 
     while count_words(final_speech) < word_count:
@@ -172,6 +368,212 @@ def generate_full_speech(topic):
     return final_speech
 
 
+def speech_key(topic, mode=None):
+    """
+    Result cache key: the topic plus every setting that changes what gets generated.
+
+    `mode` names the generation path when it is not [speech] continuation_mode, so speeches
+    from different paths never stand in for each other.
+    """
+    return speech_cache_key(
+        topic,
+        model=model_name,
+        backend=inference_backend,
+        temperature=temperature,
+        word_count=word_count,
+        max_new_tokens=max_new_tokens,
+        template=SPEECH_TEMPLATE,
+        continuation_mode=mode or continuation_mode,
+        seed=seed,
+    )
+
+
+def _seed_generation():
+    # Batched generations share the sampler with other requests and are not reproducible
+    if seed is not None:
+        set_seed(seed)
+
+
+def generate_full_speech(topic, use_cache=True):
+    cache = get_speech_cache() if use_cache else None
+    key = speech_key(topic)
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            logger.info(f"Speech cache hit for topic: '{topic}'")
+            return cached
+
+    _seed_generation()
+    if continuation_mode == "kv_cache":
+        speech = generate_full_speech_cached(topic)
+    else:
+        speech = generate_full_speech_reprompt(topic)
+
+    if cache is not None and speech and speech != FALLBACK_SPEECH:
+        cache.put(key, topic, speech)
+    return speech
+
+
+class CancelCriteria(StoppingCriteria):
+    """
+    Stops generation once `event` is set, e.g. when a streaming client went away.
+    """
+
+    def __init__(self, event: threading.Event):
+        self.event = event
+
+    def __call__(self, input_ids, scores, **kwargs):
+        return self.event.is_set()
+
+
+class StopPhraseFilter:
+    """
+    Passes streamed text through until the stop phrase shows up. The tail that could still
+    turn out to be the start of the stop phrase is held back until it is disambiguated.
+    """
+
+    def __init__(self, phrase: str):
+        self.phrase = phrase.lower()
+        self.buffer = ""
+        self.stopped = False
+
+    def feed(self, text: str) -> str:
+        if self.stopped:
+            return ""
+        self.buffer += text
+        idx = self.buffer.lower().find(self.phrase)
+        if idx >= 0:
+            self.stopped = True
+            out, self.buffer = self.buffer[:idx], ""
+            return out
+        keep = len(self.phrase) - 1
+        if keep <= 0 or len(self.buffer) <= keep:
+            return ""
+        out, self.buffer = self.buffer[:-keep], self.buffer[-keep:]
+        return out
+
+    def flush(self) -> str:
+        out, self.buffer = ("" if self.stopped else self.buffer), ""
+        return out
+
+
+def _stream_round(entry, prompt, cancel_event):
+    """
+    Generate one prompt's worth of text on a worker thread and yield text pieces as they decode.
+    """
+    tokenizer, model = entry.tokenizer, entry.model
+    streamer = TextIteratorStreamer(tokenizer, skip_prompt=True, skip_special_tokens=True)
+    inputs = tokenizer(prompt, return_tensors="pt").to(model.device)
+    generate_kwargs = dict(
+        **inputs,
+        streamer=streamer,
+        max_new_tokens=max_new_tokens,
+        temperature=temperature,
+        do_sample=True,
+        stopping_criteria=StoppingCriteriaList([
+            EndOfSpeechCriteria(tokenizer, stop_phrase),
+            CancelCriteria(cancel_event),
+        ]),
+    )
+
+    errors = []
+
+    def generate():
+        try:
+            model.generate(**generate_kwargs)
+        except BaseException as e:
+            errors.append(e)
+        finally:
+            # generate() only ends the streamer when it returns; without this an OOM or a bad
+            # argument would leave the consumer waiting on the queue forever
+            streamer.end()
+
+    start = time.perf_counter()
+    worker = threading.Thread(target=generate, name="speech-stream", daemon=True)
+    worker.start()
+    try:
+        for text in streamer:
+            yield text
+        worker.join()
+        if errors:
+            raise errors[0]
+    finally:
+        # Ends generation early if the consumer stopped reading before the model finished
+        cancel_event.set()
+        worker.join()
+        model_registry.record_generate(entry.name, time.perf_counter() - start)
+
+
+def stream_full_speech(topic, use_cache=True):
+    """
+    Streaming counterpart of generate_full_speech. Yields events as dicts:
+
+    - {"event": "token", "text": ...} for each decoded piece of the speech
+    - {"event": "progress", "words": n, "target": word_count} after each piece
+    - {"event": "done", "speech": ...} once the speech is complete
+
+    A cached speech is sent as a single token event.
+    """
+    cache = get_speech_cache() if use_cache else None
+    # The stream always re-prompts token by token, whatever continuation_mode says
+    key = speech_key(topic, mode="stream")
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            logger.info(f"Speech cache hit for topic: '{topic}'")
+            yield {"event": "token", "text": cached}
+            yield {"event": "progress", "words": count_words(cached), "target": word_count}
+            yield {"event": "done", "speech": cached}
+            return
+
+    logger.info(f"Streaming full speech for topic: '{topic}'")
+    _seed_generation()
+    entry = model_registry.get(model_name)
+    cancel_event = threading.Event()
+    speech = ""
+    try:
+        last_paragraph = None
+        while count_words(speech) < word_count:
+            if last_paragraph is None:
+                prompt = SPEECH_TEMPLATE.format(topic=topic)
+            else:
+                prompt = CONTINUATION_TEMPLATE.format(topic=topic, last_paragraph=last_paragraph)
+                speech += "\n"
+                yield {"event": "token", "text": "\n"}
+
+            cancel_event.clear()
+            stop_filter = StopPhraseFilter(stop_phrase)
+            round_text = ""
+            for piece in _stream_round(entry, prompt, cancel_event):
+                text = stop_filter.feed(piece)
+                if text:
+                    round_text += text
+                    yield {"event": "token", "text": text}
+                    yield {"event": "progress", "words": count_words(speech + round_text), "target": word_count}
+                if stop_filter.stopped:
+                    cancel_event.set()
+            tail = stop_filter.flush()
+            if tail:
+                round_text += tail
+                yield {"event": "token", "text": tail}
+
+            if not round_text.strip():
+                logger.warning("No extension received, stopping.")
+                break
+            speech += round_text
+            lines = speech.strip().splitlines()
+            last_paragraph = lines[-1].strip() if lines else ""
+    finally:
+        # Also reached when the client disconnects and the generator is closed
+        cancel_event.set()
+
+    speech = speech.strip()
+    logger.info(f"Final streamed word count: {count_words(speech)}")
+    if cache is not None and speech:
+        cache.put(key, topic, speech)
+    yield {"event": "done", "speech": speech}
+
+
 # if __name__ == "__main__":
 #     topic = "The importance of digital literacy in the modern world"
 #     full_output = generate_full_speech(topic)
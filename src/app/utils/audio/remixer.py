@@ -1,49 +1,195 @@
 import os
-from pydub import AudioSegment
+import subprocess
+import wave
+from functools import lru_cache
+
+import mutagen
+import numpy as np
+
+
+def decode_pcm_blocks(path: str, block_frames: int, sample_rate: int, channels: int):
+    """
+    Decode any audio file with ffmpeg and yield float32 blocks of shape (frames, channels)
+    in [-1, 1). Only one block is held in memory at a time.
+    """
+    process = subprocess.Popen(
+        ["ffmpeg", "-loglevel", "error", "-i", path,
+         "-f", "s16le", "-ac", str(channels), "-ar", str(sample_rate), "pipe:1"],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    finished = False
+    try:
+        while True:
+            data = process.stdout.read(block_frames * channels * 2)
+            if not data:
+                finished = True
+                break
+            yield np.frombuffer(data, dtype=np.int16).reshape(-1, channels).astype(np.float32) / 32768.0
+    finally:
+        process.stdout.close()
+        if not finished:
+            process.kill()
+        process.wait()
+        stderr = process.stderr.read().decode(errors="replace")
+        process.stderr.close()
+    if process.returncode != 0:
+        raise RuntimeError(f"ffmpeg could not decode {path}:\n{stderr}")
+
+
+@lru_cache(maxsize=2)
+def load_music(path: str, sample_rate: int, channels: int) -> np.ndarray:
+    """
+    The background track decoded once per process as int16 (frames, channels). It is a short
+    fixed asset, so its size does not grow with the speech.
+    """
+    blocks = [
+        (block * 32768.0).astype(np.int16)
+        for block in decode_pcm_blocks(path, 1 << 16, sample_rate, channels)
+    ]
+    if not blocks:
+        raise RuntimeError(f"Music file {path} has no audio")
+    music = np.concatenate(blocks)
+    music.flags.writeable = False
+    return music
+
 
 class SpeechMusicMixer:
-    def __init__(self, speech_path: str, music_path: str, output_path: str = "mixed_output.mp3", speech_length_ms: int = None):
+    """
+    Lays the speech over looped, attenuated background music with fades, working on NumPy
+    PCM blocks. Memory stays constant however long the speech is: the music is looped by
+    wrapping indices into one decoded copy and the speech is decoded block by block.
+
+    The mix is `LEAD_IN_MS` of music, then the speech over the music, with the music faded
+    in at the start and out at the end.
+    """
+
+    MUSIC_GAIN_DB = -9.13  # Reduce volume to about 35%
+    LEAD_IN_MS = 1000
+    FADE_MS = 1000
+
+    def __init__(self, speech_path: str, music_path: str, output_path: str = "mixed_output.mp3",
+                 speech_length_ms: int = None, sample_rate: int = 44100, channels: int = 2,
+                 block_frames: int = 1 << 16):
         self.speech_path = speech_path
         self.music_path = music_path
         self.output_path = output_path
         self.speech_length_ms = speech_length_ms
-        self.speech = None
-        self.music = None
-        self.mixed = None
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.block_frames = block_frames
+
+    def _frames(self, ms: float) -> int:
+        return int(round(ms * self.sample_rate / 1000))
+
+    def _speech_length_ms(self) -> float:
+        if self.speech_length_ms is not None:
+            return self.speech_length_ms
+        # Read from the file header; no decode needed
+        return mutagen.File(self.speech_path).info.length * 1000
 
-    def load_audio(self):
-        self.speech = AudioSegment.from_file(self.speech_path)
-        self.music = AudioSegment.from_file(self.music_path)
+    def total_frames(self) -> int:
+        return self._frames(self.LEAD_IN_MS) + self._frames(self._speech_length_ms())
 
-    def process_music(self):
-        self.music = self.music - 9.13  # Reduce volume to about 35%
-        target_duration = len(self.speech) + 1000  # +1s for fade-out
-        while len(self.music) < target_duration:
-            self.music += self.music
-        self.music = self.music[:target_duration].fade_in(1000).fade_out(1000)
+    def blocks(self):
+        """
+        Yield the mix as int16 blocks of shape (frames, channels).
+        """
+        music = load_music(self.music_path, self.sample_rate, self.channels)
+        gain = 10 ** (self.MUSIC_GAIN_DB / 20) / 32768.0
+        lead = self._frames(self.LEAD_IN_MS)
+        fade = max(1, self._frames(self.FADE_MS))
+        total = self.total_frames()
 
-    def mix(self):
-        self.mixed = self.music.overlay(self.speech, position=1000)
+        speech_blocks = decode_pcm_blocks(self.speech_path, self.block_frames, self.sample_rate, self.channels)
+        speech = np.zeros((0, self.channels), dtype=np.float32)
+        position = 0
+        try:
+            while position < total:
+                n = min(self.block_frames, total - position)
+                index = np.arange(position, position + n)
+
+                block = np.take(music, index, axis=0, mode="wrap").astype(np.float32)
+                envelope = np.clip(np.minimum(index, total - index) / fade, 0.0, 1.0) * gain
+                block *= envelope[:, None]
+
+                speech_start = max(position, lead)
+                needed = position + n - speech_start
+                if needed > 0:
+                    while speech.shape[0] < needed:
+                        next_block = next(speech_blocks, None)
+                        if next_block is None:
+                            break
+                        speech = np.concatenate([speech, next_block])
+                    take = min(needed, speech.shape[0])
+                    offset = speech_start - position
+                    block[offset:offset + take] += speech[:take]
+                    speech = speech[take:]
+
+                np.clip(block, -1.0, 32767 / 32768, out=block)
+                yield (block * 32768.0).astype(np.int16)
+                position += n
+        finally:
+            speech_blocks.close()
+
+    def pcm_blocks(self):
+        """
+        The mix as raw s16le bytes, e.g. to pipe straight into an encoder's stdin.
+        """
+        for block in self.blocks():
+            yield block.tobytes()
+
+    def write_wav(self, path: str):
+        with wave.open(path, "wb") as f:
+            f.setnchannels(self.channels)
+            f.setsampwidth(2)
+            f.setframerate(self.sample_rate)
+            for data in self.pcm_blocks():
+                f.writeframes(data)
+
+    def write_encoded(self, path: str):
+        process = subprocess.Popen(
+            ["ffmpeg", "-y", "-loglevel", "error",
+             "-f", "s16le", "-ac", str(self.channels), "-ar", str(self.sample_rate), "-i", "pipe:0",
+             path],
+            stdin=subprocess.PIPE,
+        )
+        try:
+            for data in self.pcm_blocks():
+                process.stdin.write(data)
+        finally:
+            process.stdin.close()
+            process.wait()
+        if process.returncode != 0:
+            raise RuntimeError(f"ffmpeg failed to encode {path}")
 
     def export(self):
-        self.mixed.export(self.output_path, format="mp3")
+        os.makedirs(os.path.dirname(os.path.abspath(self.output_path)), exist_ok=True)
+        if self.output_path.lower().endswith(".wav"):
+            # Lossless hand-off to the video encoder, no extra encode/decode round trip
+            self.write_wav(self.output_path)
+        else:
+            self.write_encoded(self.output_path)
         print(f"[INFO] Mixed audio saved to: {self.output_path}")
 
     def run(self):
-        self.load_audio()
-        self.process_music()
-        self.mix()
         self.export()
 
     @staticmethod
-    def mix_speech_with_music(speech_rel_path: str, speech_length_ns: int):
+    def default_music_path() -> str:
+        base_dir = os.path.dirname(os.path.abspath(__file__))
+        return os.path.join(base_dir, "..", "audio", "music", "uplifting_guitar.mp3")
+
+    @staticmethod
+    def mix_speech_with_music(speech_rel_path: str, speech_length_ns: int, output_path: str | None = None) -> str:
         # Get absolute directory of this remixer.py file
         base_dir = os.path.dirname(os.path.abspath(__file__))
 
-        # Resolve speech and music paths relative to remixer.py location
+        # Resolve speech and music paths relative to remixer.py location (absolute paths are kept as-is)
         speech_path = os.path.join(base_dir, "tmp", speech_rel_path)
-        music_path = os.path.join(base_dir, "..", "audio", "music", "uplifting_guitar.mp3")
-        output_path = os.path.join(base_dir, "tmp", "mixed_output.mp3")
+        music_path = SpeechMusicMixer.default_music_path()
+        if output_path is None:
+            output_path = os.path.join(base_dir, "tmp", "mixed_output.mp3")
         speech_length_ms = speech_length_ns // 1_000_000
 
         mixer = SpeechMusicMixer(
@@ -53,3 +199,4 @@ class SpeechMusicMixer:
             speech_length_ms=speech_length_ms
         )
         mixer.run()
+        return output_path
@@ -1,16 +1,122 @@
+import io
 import os
+import re
 import uuid
-from gtts import gTTS
+from concurrent.futures import ThreadPoolExecutor
+
 from mutagen.mp3 import MP3
 
+from Ross_git.src.app.config.app_config import get_section
+from Ross_git.src.app.utils.audio.tts_cache import TTSChunkCache, get_tts_cache
+from Ross_git.src.app.utils.audio.tts_engines import GTTSEngine, get_tts_engine
+
+
+def split_into_chunks(text: str, mode: str = "paragraph", max_chars: int = 1000) -> list[str]:
+    """
+    Split text into synthesis chunks: one per paragraph (line), or one per sentence.
+    Paragraphs longer than max_chars fall back to sentence boundaries.
+    """
+    chunks = []
+    for paragraph in text.splitlines():
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if mode != "sentence" and len(paragraph) <= max_chars:
+            chunks.append(paragraph)
+            continue
+        sentences = [s.strip() for s in re.split(r"(?<=[.!?])\s+", paragraph) if s.strip()]
+        if mode == "sentence":
+            chunks.extend(sentences)
+            continue
+        current = ""
+        for sentence in sentences:
+            if current and len(current) + 1 + len(sentence) > max_chars:
+                chunks.append(current)
+                current = sentence
+            else:
+                current = f"{current} {sentence}".strip()
+        if current:
+            chunks.append(current)
+    return chunks
+
+
+def strip_id3(data: bytes) -> bytes:
+    """
+    Remove ID3v2 (leading) and ID3v1 (trailing) tags so MP3 chunks can be joined frame by frame.
+    """
+    if data[:3] == b"ID3" and len(data) >= 10:
+        size = (data[6] & 0x7F) << 21 | (data[7] & 0x7F) << 14 | (data[8] & 0x7F) << 7 | (data[9] & 0x7F)
+        footer = 10 if data[5] & 0x10 else 0
+        data = data[10 + size + footer:]
+    if len(data) >= 128 and data[-128:-125] == b"TAG":
+        data = data[:-128]
+    return data
+
+
+def mp3_duration_ns(data: bytes) -> int:
+    return int(MP3(io.BytesIO(data)).info.length * 1e9)
+
+
 class TextToSpeechSaver:
-    def __init__(self, tmp_dir: str = "tmp", language: str = "en"):
-        # Resolve tmp_dir relative to this file location
+    """
+    Synthesizes text chunk by chunk on a bounded thread pool and joins the MP3 chunks
+    without re-encoding. With a chunk cache, only chunks whose text changed are synthesized
+    again, e.g. a single edited paragraph.
+    """
+
+    def __init__(self, tmp_dir: str = "tmp", language: str = "en", engine=None, max_workers: int = 4,
+                 chunking: str = "paragraph", max_chunk_chars: int = 1000, cache: TTSChunkCache | None = None):
+        # Resolve tmp_dir relative to this file location (absolute paths, e.g. a job workspace, are kept)
         base_dir = os.path.dirname(os.path.abspath(__file__))
         self.tmp_dir = os.path.join(base_dir, tmp_dir)
         self.language = language
+        self.engine = engine or GTTSEngine()
+        self.max_workers = max(1, max_workers)
+        self.chunking = chunking
+        self.max_chunk_chars = max_chunk_chars
+        self.cache = cache
         os.makedirs(self.tmp_dir, exist_ok=True)
 
+    @classmethod
+    def from_config(cls, tmp_dir: str = "tmp"):
+        tts_config = get_section("tts")
+        return cls(
+            tmp_dir=tmp_dir,
+            language=tts_config.get("language", "en"),
+            engine=get_tts_engine(tts_config),
+            max_workers=int(tts_config.get("workers", 4)),
+            chunking=tts_config.get("chunking", "paragraph").lower(),
+            max_chunk_chars=int(tts_config.get("max_chunk_chars", 1000)),
+            cache=get_tts_cache(),
+        )
+
+    def _synthesize_chunk(self, text: str) -> tuple[bytes, bool]:
+        key = TTSChunkCache.key(text, self.language, self.engine.name)
+        if self.cache is not None:
+            data = self.cache.get(key)
+            if data is not None:
+                return data, True
+        data = strip_id3(self.engine.synthesize(text, self.language))
+        if not data:
+            raise RuntimeError(f"TTS engine '{self.engine.name}' returned no audio")
+        if self.cache is not None:
+            self.cache.put(key, data)
+        return data, False
+
+    def synthesize_chunks(self, text: str) -> list[dict]:
+        """
+        Returns one {"text", "audio", "duration_ns", "cached"} entry per chunk, in order.
+        """
+        chunks = split_into_chunks(text, self.chunking, self.max_chunk_chars)
+        if not chunks:
+            raise ValueError("Nothing to synthesize")
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(chunks)), thread_name_prefix="tts") as pool:
+            results = list(pool.map(self._synthesize_chunk, chunks))
+        return [
+            {"text": chunk, "audio": data, "duration_ns": mp3_duration_ns(data), "cached": cached}
+            for chunk, (data, cached) in zip(chunks, results)
+        ]
+
     def synthesize(self, text: str, unique_id: str | None = None) -> tuple[str | None, int | None]:
         """
         Converts text to speech and saves the audio file.
@@ -23,6 +129,14 @@ class TextToSpeechSaver:
         - tuple[str | None, int | None]: (file name, length in nanoseconds) if successful,
           (None, None) on failure.
         """
+        file_name, duration_ns, _ = self.synthesize_timed(text, unique_id)
+        return file_name, duration_ns
+
+    def synthesize_timed(self, text: str, unique_id: str | None = None) -> tuple[str | None, int | None, list[dict]]:
+        """
+        Like synthesize, and also returns the timing map: one {"text", "start_ns", "end_ns"}
+        per chunk, in playback order. On failure returns (None, None, []).
+        """
         try:
             if unique_id is None:
                 unique_id = str(uuid.uuid4())
@@ -30,20 +144,25 @@ class TextToSpeechSaver:
             file_name = f"{unique_id}.mp3"
             file_path = os.path.join(self.tmp_dir, file_name)
 
-            # Generate speech and save
-            tts = gTTS(text=text, lang=self.language)
-            tts.save(file_path)
-
-            # Extract duration using mutagen
-            audio = MP3(file_path)
-            duration_sec = audio.info.length  # Duration in seconds (float)
-            duration_ns = int(duration_sec * 1e9)  # Convert to nanoseconds
+            chunks = self.synthesize_chunks(text)
+            timings = []
+            position_ns = 0
+            with open(file_path, "wb") as f:
+                for chunk in chunks:
+                    f.write(chunk["audio"])
+                    timings.append({
+                        "text": chunk["text"],
+                        "start_ns": position_ns,
+                        "end_ns": position_ns + chunk["duration_ns"],
+                    })
+                    position_ns += chunk["duration_ns"]
+            duration_ns = position_ns
 
-            print(f"[INFO] Audio saved as '{file_path}' with duration {duration_ns} ns")
-            return file_name, duration_ns
+            cached = sum(1 for chunk in chunks if chunk["cached"])
+            print(f"[INFO] Audio saved as '{file_path}' with duration {duration_ns} ns "
+                  f"({len(chunks)} chunks, {cached} from cache)")
+            return file_name, duration_ns, timings
 
         except Exception as e:
             print(f"[ERROR] Failed to convert text to speech: {str(e)}")
-            return None, None
-
-
+            return None, None, []
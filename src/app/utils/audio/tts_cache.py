@@ -0,0 +1,113 @@
+import hashlib
+import os
+import tempfile
+import threading
+
+from Ross_git.src.app.config.app_config import get_section
+
+
+class TTSChunkCache:
+    """
+    On-disk cache of synthesized chunks, keyed by (engine, language, text).
+
+    Files live under `cache_dir/ab/<sha256>.mp3` and are written atomically. Hits refresh
+    the mtime, which the size-bounded eviction uses as its LRU clock.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = 256 * 1024 * 1024, evict_every: int = 50):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.evict_every = max(1, evict_every)
+        self._puts = 0
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def key(text: str, language: str, engine: str) -> str:
+        return hashlib.sha256(f"{engine}|{language}|{text}".encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.mp3")
+
+    def get(self, key: str) -> bytes | None:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+        except OSError:
+            return None
+        return data
+
+    def put(self, key: str, data: bytes):
+        path = self._path(key)
+        folder = os.path.dirname(path)
+        os.makedirs(folder, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=folder, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+        with self._lock:
+            self._puts += 1
+            due = self._puts % self.evict_every == 0
+        if due:
+            self.evict()
+
+    def evict(self) -> int:
+        """
+        Delete least recently used chunks until the cache fits in max_bytes.
+        Returns the number of bytes freed.
+        """
+        entries = []
+        total = 0
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+
+        freed = 0
+        if total <= self.max_bytes:
+            return freed
+        entries.sort()
+        for _, size, path in entries:
+            if total - freed <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+                freed += size
+            except OSError:
+                continue
+        return freed
+
+
+_tts_cache = None
+_tts_cache_lock = threading.Lock()
+
+
+def get_tts_cache() -> TTSChunkCache | None:
+    """
+    Process-wide cache built from the [tts] section, or None when disabled.
+    """
+    global _tts_cache
+    tts_config = get_section("tts")
+    if tts_config.get("cache_enabled", "true").lower() != "true":
+        return None
+    with _tts_cache_lock:
+        if _tts_cache is None:
+            cache_dir = tts_config.get("cache_dir") or os.path.join(tempfile.gettempdir(), "ross_tts_cache")
+            _tts_cache = TTSChunkCache(
+                cache_dir=cache_dir,
+                max_bytes=int(tts_config.get("cache_max_megabytes", 256)) * 1024 * 1024,
+            )
+        return _tts_cache
@@ -0,0 +1,212 @@
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from Ross_git.src.app.config.app_config import get_section
+
+# Stages of a text-to-video job, in order. Kept here rather than on VideoGenerator so queueing
+# a job does not import the pipeline
+VIDEO_STAGES = ["prepare", "parse", "search", "dedup", "order", "download", "tts", "mix", "render"]
+
+
+class JobQueueFullError(RuntimeError):
+    pass
+
+
+class JobNotFoundError(KeyError):
+    pass
+
+
+class JobCancelledError(RuntimeError):
+    pass
+
+
+class Job:
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+    FINISHED_STATES = (DONE, FAILED, CANCELLED)
+
+    def __init__(self, stages: list[str], params: dict | None = None):
+        self.id = uuid.uuid4().hex
+        self.params = params or {}
+        self.status = Job.QUEUED
+        self.stages = {stage: "pending" for stage in stages}
+        self.current_stage = None
+        self.result_path = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.future = None
+        self._cancel_event = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def cancel_requested(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def request_cancel(self):
+        self._cancel_event.set()
+
+    def enter_stage(self, stage: str):
+        """
+        Progress callback handed to the worker. Marks the previous stage as finished and
+        raises JobCancelledError at the stage boundary once a cancel was requested.
+        """
+        if self.cancel_requested:
+            raise JobCancelledError(f"Job {self.id} cancelled before stage '{stage}'")
+        with self._lock:
+            if self.current_stage is not None:
+                self.stages[self.current_stage] = "done"
+            self.current_stage = stage
+            self.stages[stage] = "running"
+
+    def _finish(self, status: str, error: str | None = None):
+        with self._lock:
+            if self.current_stage is not None:
+                self.stages[self.current_stage] = "done" if status == Job.DONE else status
+            self.status = status
+            self.error = error
+            self.finished_at = time.time()
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in Job.FINISHED_STATES
+
+    def progress(self) -> float:
+        done = sum(1 for state in self.stages.values() if state == "done")
+        return round(done / len(self.stages), 3) if self.stages else 0.0
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                "job_id": self.id,
+                "status": self.status,
+                "current_stage": self.current_stage,
+                "stages": dict(self.stages),
+                "progress": self.progress(),
+                "error": self.error,
+                "created_at": self.created_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+            }
+
+
+class JobManager:
+    """
+    Runs blocking work on a bounded thread pool and tracks every job by ID.
+
+    At most `max_workers` jobs run at once and at most `max_queue_depth` more may wait;
+    anything beyond that is rejected with JobQueueFullError so callers can apply backpressure.
+    """
+
+    def __init__(self, max_workers: int = 1, max_queue_depth: int = 4, job_ttl_seconds: int = 3600):
+        self.max_workers = max(1, max_workers)
+        self.max_queue_depth = max(0, max_queue_depth)
+        self.job_ttl_seconds = job_ttl_seconds
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="job")
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def _active_count(self) -> int:
+        return sum(1 for job in self._jobs.values() if not job.is_finished)
+
+    def _prune(self):
+        cutoff = time.time() - self.job_ttl_seconds
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.is_finished and job.finished_at is not None and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def submit(self, work, stages: list[str], params: dict | None = None) -> Job:
+        """
+        Queue `work(job)` for execution. `work` returns the result path and should call
+        `job.enter_stage(name)` at each stage boundary.
+        """
+        with self._lock:
+            self._prune()
+            if self._active_count() >= self.max_workers + self.max_queue_depth:
+                raise JobQueueFullError(
+                    f"Job queue is full ({self.max_workers} running, {self.max_queue_depth} queued)"
+                )
+            job = Job(stages, params)
+            self._jobs[job.id] = job
+            job.future = self._executor.submit(self._run, job, work)
+        return job
+
+    @staticmethod
+    def _run(job: Job, work):
+        if job.cancel_requested:
+            job._finish(Job.CANCELLED)
+            return
+        job.status = Job.RUNNING
+        job.started_at = time.time()
+        try:
+            job.result_path = work(job)
+            job._finish(Job.DONE)
+        except JobCancelledError:
+            job._finish(Job.CANCELLED)
+        except Exception as e:
+            traceback.print_exc()
+            job._finish(Job.FAILED, str(e))
+
+    def get(self, job_id: str) -> Job:
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            raise JobNotFoundError(job_id)
+        return job
+
+    def cancel(self, job_id: str) -> Job:
+        job = self.get(job_id)
+        if job.is_finished:
+            return job
+        job.request_cancel()
+        # A job that has not started yet can be dropped from the pool right away
+        if job.future is not None and job.future.cancel():
+            job._finish(Job.CANCELLED)
+        return job
+
+    def stats(self) -> dict:
+        with self._lock:
+            statuses = [job.status for job in self._jobs.values()]
+        return {
+            "max_workers": self.max_workers,
+            "max_queue_depth": self.max_queue_depth,
+            "queued": statuses.count(Job.QUEUED),
+            "running": statuses.count(Job.RUNNING),
+            "tracked": len(statuses),
+        }
+
+    def shutdown(self, wait: bool = False):
+        with self._lock:
+            jobs = list(self._jobs.values())
+        for job in jobs:
+            if not job.is_finished:
+                job.request_cancel()
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+
+_job_manager = None
+_job_manager_lock = threading.Lock()
+
+
+def get_job_manager() -> JobManager:
+    global _job_manager
+    with _job_manager_lock:
+        if _job_manager is None:
+            jobs_config = get_section("jobs")
+            _job_manager = JobManager(
+                max_workers=int(jobs_config.get("max_workers", 1)),
+                max_queue_depth=int(jobs_config.get("max_queue_depth", 4)),
+                job_ttl_seconds=int(jobs_config.get("job_ttl_seconds", 3600)),
+            )
+        return _job_manager
@@ -0,0 +1,260 @@
+import importlib
+import logging
+import sys
+import threading
+import time
+
+from Ross_git.src.app.config.app_config import get_section
+
+logger = logging.getLogger("ross.startup")
+
+
+class _TimedLoader:
+    """
+    Wraps a module's loader to time its creation and execution (extension modules do their
+    work in create_module). The original loader is put back on the module once it has run,
+    so later introspection (resources, reloads) sees the real one.
+    """
+
+    def __init__(self, loader, profiler: "ImportProfiler"):
+        self._loader = loader
+        self._profiler = profiler
+        self._started = False
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+    def create_module(self, spec):
+        self._profiler.push(spec.name)
+        self._started = True
+        try:
+            return self._loader.create_module(spec)
+        except BaseException:
+            self._started = False
+            self._profiler.pop()
+            raise
+
+    def exec_module(self, module):
+        if not self._started:
+            self._profiler.push(module.__name__)
+        self._started = False
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._profiler.pop()
+            try:
+                module.__loader__ = self._loader
+                if getattr(module, "__spec__", None) is not None:
+                    module.__spec__.loader = self._loader
+            except (AttributeError, TypeError):
+                # Some modules (e.g. config objects masquerading as modules) refuse new attributes
+                pass
+
+
+class ImportProfiler:
+    """
+    Records how long each module takes to import, like `python -X importtime`: the module's
+    own (self) time and its cumulative time including the imports it triggers. Works per
+    thread, so imports in a warm-up thread and the main thread are timed separately.
+
+    Installed as the first entry of sys.meta_path between `start()` and `stop()`.
+    """
+
+    def __init__(self):
+        self.records = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._finding = threading.local()
+
+    def start(self):
+        if self not in sys.meta_path:
+            sys.meta_path.insert(0, self)
+        return self
+
+    def stop(self):
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def find_spec(self, name, path=None, target=None):
+        if getattr(self._finding, "active", False):
+            return None
+        self._finding.active = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(name, path, target)
+                if spec is not None:
+                    break
+            else:
+                return None
+        finally:
+            self._finding.active = False
+        if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+            spec.loader = _TimedLoader(spec.loader, self)
+        return spec
+
+    def push(self, name: str):
+        self._stack().append([name, time.perf_counter(), 0.0])
+
+    def pop(self):
+        stack = self._stack()
+        name, start, children = stack.pop()
+        cumulative = time.perf_counter() - start
+        if stack:
+            stack[-1][2] += cumulative
+        with self._lock:
+            self.records.append({
+                "module": name,
+                "self_seconds": cumulative - children,
+                "cumulative_seconds": cumulative,
+                "depth": len(stack),
+            })
+
+    def _stack(self) -> list:
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    def take(self) -> list[dict]:
+        with self._lock:
+            records, self.records = self.records, []
+        return records
+
+    @staticmethod
+    def format(records: list[dict], top: int = 20) -> str:
+        """
+        The `top` slowest imports by cumulative time, in `-X importtime` column layout.
+        """
+        total = sum(r["cumulative_seconds"] for r in records if r["depth"] == 0)
+        lines = [f"{len(records)} modules imported in {total:.3f} s; slowest:",
+                 "import time: self [us] | cumulative | imported package"]
+        for r in sorted(records, key=lambda r: r["cumulative_seconds"], reverse=True)[:top]:
+            lines.append(f"import time: {r['self_seconds'] * 1e6:9.0f} | {r['cumulative_seconds'] * 1e6:10.0f} | "
+                         f"{'  ' * r['depth']}{r['module']}")
+        return "\n".join(lines)
+
+
+class Readiness:
+    """
+    Tracks whether the heavy subsystems are loaded. Liveness (/status) only needs the app;
+    readiness (/ready) also needs every warmed-up component to have finished loading.
+
+    Component states: lazy (loaded on first use), pending, loading, ready or failed.
+    """
+
+    def __init__(self):
+        self.started_at = time.time()
+        self._components = {}
+        self._lock = threading.Lock()
+
+    def set(self, component: str, state: str, **details):
+        with self._lock:
+            self._components[component] = {"state": state, **details}
+
+    def is_ready(self) -> bool:
+        with self._lock:
+            return all(c["state"] in ("ready", "lazy") for c in self._components.values())
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            components = {name: dict(c) for name, c in self._components.items()}
+        return {
+            "ready": all(c["state"] in ("ready", "lazy") for c in components.values()),
+            "uptime_seconds": round(time.time() - self.started_at, 3),
+            "components": components,
+        }
+
+
+def _warm_speech():
+    from Ross_git.src.app.utils.NLP.speech_generator import warm_up_models
+    warm_up_models()
+
+
+def _warm_video():
+    importlib.import_module("Ross_git.src.app.utils.core.text2video")
+    from Ross_git.src.app.utils.NLP.parser import get_nlp_parser
+    get_nlp_parser()
+
+
+# Heavy subsystems: the speech model stack (torch, transformers, langchain, weights) and the
+# video pipeline (spaCy, PIL, NumPy, requests)
+WARMUP_COMPONENTS = {
+    "speech": _warm_speech,
+    "video": _warm_video,
+}
+
+
+def warm_up(readiness: Readiness, profiler: ImportProfiler | None = None, top: int = 20):
+    """
+    Loads every WARMUP_COMPONENTS entry in turn, recording progress in `readiness`, then logs
+    the import profile of the warm-up.
+    """
+    for name, loader in WARMUP_COMPONENTS.items():
+        readiness.set(name, "loading")
+        start = time.perf_counter()
+        try:
+            loader()
+        except Exception as e:
+            logger.exception(f"Warm-up of '{name}' failed")
+            readiness.set(name, "failed", error=f"{type(e).__name__}: {e}")
+            continue
+        seconds = round(time.perf_counter() - start, 3)
+        readiness.set(name, "ready", load_seconds=seconds)
+        logger.info(f"Warm-up of '{name}' finished in {seconds} s")
+    if profiler is not None:
+        profiler.stop()
+        logger.info("Warm-up import profile:\n" + ImportProfiler.format(profiler.take(), top))
+
+
+def start_warm_up(profiler: ImportProfiler | None = None) -> threading.Thread | None:
+    """
+    Starts the background warm-up when [startup] warmup is "background"; with "lazy" each
+    subsystem is imported by the first request that needs it.
+    """
+    startup_config = get_section("startup")
+    mode = startup_config.get("warmup", "background").lower()
+    top = int(startup_config.get("import_profile_top", 20))
+    readiness = get_readiness()
+    if mode != "background":
+        for name in WARMUP_COMPONENTS:
+            readiness.set(name, "lazy")
+        if profiler is not None:
+            profiler.stop()
+        logger.info("Warm-up disabled; subsystems load on first use.")
+        return None
+    for name in WARMUP_COMPONENTS:
+        readiness.set(name, "pending")
+    thread = threading.Thread(target=warm_up, args=(readiness, profiler, top), name="warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def check_config():
+    """
+    Raises ValueError for settings that cannot work together, so the app fails at start
+    instead of on the first request that reaches the speech model.
+    """
+    batching = get_section("batching").get("enabled", "false").lower() == "true"
+    continuation_mode = get_section("speech").get("continuation_mode", "kv_cache").lower()
+    if batching and continuation_mode != "reprompt":
+        raise ValueError(
+            f"[batching] enabled = true needs [speech] continuation_mode = reprompt, not {continuation_mode}: "
+            "kv_cache continues every speech on its own key/value cache, which cannot share a batch"
+        )
+
+
+def import_profiling_enabled() -> bool:
+    return get_section("startup").get("import_profile", "true").lower() == "true"
+
+
+_readiness = None
+_readiness_lock = threading.Lock()
+
+
+def get_readiness() -> Readiness:
+    global _readiness
+    with _readiness_lock:
+        if _readiness is None:
+            _readiness = Readiness()
+        return _readiness
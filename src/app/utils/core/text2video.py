@@ -1,265 +1,281 @@
-import requests
-from PIL import Image
-from io import BytesIO
+import contextlib
 import os
-import shutil
-import json
-import jellyfish
+import uuid
 
-from Ross_git.src.app.utils.NLP.parser import NLPParser
+from Ross_git.src.app.config.app_config import get_section
+from Ross_git.src.app.utils.NLP.matcher import SentenceImageMatcher, get_scorer
+from Ross_git.src.app.utils.NLP.parser import get_nlp_parser
 from Ross_git.src.app.utils.audio.remixer import SpeechMusicMixer
 from Ross_git.src.app.utils.audio.tts import TextToSpeechSaver
-from Ross_git.src.app.utils.images.downloader import ImageProcessor, download_images_sequentially
+from Ross_git.src.app.utils.core.job_queue import VIDEO_STAGES, JobCancelledError
+from Ross_git.src.app.utils.core.timeline import image_schedule, sentence_timings
+from Ross_git.src.app.utils.core.tracing import Tracer, get_metrics_registry, profiler_for
+from Ross_git.src.app.utils.core.workspace import Workspace, get_workspace_manager
+from Ross_git.src.app.utils.images.dedup import ImageDeduplicator
+from Ross_git.src.app.utils.images.fetcher import ImageFetcher
 from Ross_git.src.app.utils.video.combiner import VideoCombiner
+from Ross_git.src.app.utils.video.profiles import RenderProfile, get_render_profile
 from Ross_git.src.app.utils.websearch.duck_go import DuckDuckGoImageSearcher
-
-
-BACKGROUND_MUSIC_PATH = "/path/to/background_music.mp3"  # <-- Update this path
-
-
-class ImageProcessor:
-    MIN_WIDTH = 640
-    MIN_HEIGHT = 360
-    TARGET_WIDTH = 1280
-    TARGET_HEIGHT = 720
-
-    def __init__(self, image_url, output_dir="."):
-        self.image_url = image_url
-        # Resolve absolute path based on this script location
-        base_dir = os.path.dirname(os.path.abspath(__file__))
-        self.output_dir = (
-            output_dir if os.path.isabs(output_dir) else os.path.join(base_dir, output_dir)
-        )
-        self.image = None
-        self.resized_image = None
-        self.final_image = None
-
-    def download_image(self):
-        try:
-            response = requests.get(self.image_url, timeout=10)
-            response.raise_for_status()
-            self.image = Image.open(BytesIO(response.content)).convert("RGB")
-            return True
-        except Exception as e:
-            print(f"Failed to download/open image from {self.image_url}: {e}")
-            return False
-
-    def is_size_valid(self):
-        if self.image is None:
-            return False
-        return self.image.width >= self.MIN_WIDTH and self.image.height >= self.MIN_HEIGHT
-
-    def resize_and_crop(self):
-        img_ratio = self.image.width / self.image.height
-        target_ratio = self.TARGET_WIDTH / self.TARGET_HEIGHT
-
-        if img_ratio > target_ratio:
-            scale_factor = self.TARGET_HEIGHT / self.image.height
-        else:
-            scale_factor = self.TARGET_WIDTH / self.image.width
-
-        new_size = (
-            int(self.image.width * scale_factor),
-            int(self.image.height * scale_factor),
-        )
-        self.resized_image = self.image.resize(new_size, Image.BICUBIC)
-
-        left = (self.resized_image.width - self.TARGET_WIDTH) // 2
-        top = (self.resized_image.height - self.TARGET_HEIGHT) // 2
-        right = left + self.TARGET_WIDTH
-        bottom = top + self.TARGET_HEIGHT
-
-        self.final_image = self.resized_image.crop((left, top, right, bottom))
-
-    def save_image(self, filename):
-        os.makedirs(self.output_dir, exist_ok=True)
-        filepath = os.path.join(self.output_dir, filename)
-        self.final_image.save(filepath, format="PNG")
-        print(f"Saved image: {filepath}")
-        return filepath
-
-    def process(self, filename):
-        if not self.download_image():
-            return None
-        if not self.is_size_valid():
-            print(f"Image too small: {self.image.width}x{self.image.height}. Skipping.")
-            return None
-        self.resize_and_crop()
-        return self.save_image(filename)
-
-
-def download_images_sequentially(urls, output_dir="."):
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    abs_output_dir = output_dir if os.path.isabs(output_dir) else os.path.join(base_dir, output_dir)
-    for i, url in enumerate(urls):
-        filename = f"{i:03d}.png"
-        print(f"Processing {url} -> {filename}")
-        processor = ImageProcessor(url, abs_output_dir)
-        saved_path = processor.process(filename)
-        if saved_path is None:
-            print(f"Skipped {url}")
-        else:
-            print(f"Successfully saved {saved_path}")
+from Ross_git.src.app.utils.websearch.providers import get_search_provider
+from Ross_git.src.app.utils.websearch.search_cache import get_search_cache
 
 
 class ImageSearcher:
+    # Spare candidates per needed image, since some downloads fail or are too small
+    SPARE_FACTOR = 2
+
     def __init__(self, max_results=100):
         self.max_results = max_results
-
-    def search(self, query):
-        searcher = DuckDuckGoImageSearcher(prompt=query, max_results=self.max_results)
-        results = searcher.run()
-        print(f"Image search results for '{query}':")
-        print(json.dumps(results, indent=2))
+        self.provider = get_search_provider(get_section("search"))
+        self.cache = get_search_cache()
+
+    def search(self, query, needed=None):
+        wanted = self.max_results if needed is None else min(self.max_results, max(1, needed) * self.SPARE_FACTOR)
+        fetch_size = DuckDuckGoImageSearcher.fetch_size_for(wanted)
+        if self.cache is not None:
+            results = self.cache.get(query, fetch_size, self.provider)
+        else:
+            results = self.provider.search(query, fetch_size)
+        results = results[:wanted]
+        print(f"Image search for '{query}' returned {len(results)} results (fetch size {fetch_size}).")
         return results
 
 
 class TextParser:
     def __init__(self):
-        self.parser = NLPParser()
+        # Process-wide; the spaCy model is loaded once, not per video
+        self.parser = get_nlp_parser()
 
     def parse(self, text):
-        parsed = self.parser.process(text)
+        # Whitespace-only spans (blank lines, trailing spaces) are not sentences anything can illustrate
+        parsed = [item for item in self.parser.process(text) if item["sentence"]]
         print(f"Parsed text into {len(parsed)} sentence objects")
         return parsed
 
 
 class ImageOrderer:
     def __init__(self):
-        pass
+        matching_config = get_section("matching")
+        scorer_name = matching_config.get("scorer", "tfidf").lower()
+        scorer_kwargs = {}
+        if scorer_name == "embedding":
+            scorer_kwargs["model_name"] = matching_config.get("embedding_model", "all-MiniLM-L6-v2")
+        self.matcher = SentenceImageMatcher(get_scorer(scorer_name, **scorer_kwargs))
 
     def order(self, parsed_sentences, images):
-        assigned = [False] * len(images)
+        """
+        Returns copies of the images, matched ones first in sentence order and tagged with
+        their "sentence_index", followed by the unmatched ones as spares.
+        """
+        pairs = self.matcher.match(parsed_sentences, images)
+        assigned = set()
         ordered = []
-
-        for sentence_obj in parsed_sentences:
-            sentence = sentence_obj.get("sentence", "")
-
-            best_idx = None
-            best_score = -1
-
-            for i, img in enumerate(images):
-                if assigned[i]:
-                    continue
-                title = img.get("title", "")
-                score = jellyfish.jaro_similarity(sentence.lower(), title.lower())
-                if score > best_score:
-                    best_score = score
-                    best_idx = i
-
-            if best_idx is not None:
-                assigned[best_idx] = True
-                ordered.append(images[best_idx])
+        for sentence_idx, image_idx in pairs:
+            assigned.add(image_idx)
+            ordered.append(dict(images[image_idx], sentence_index=sentence_idx))
 
         # Append images not matched
-        for i, assigned_flag in enumerate(assigned):
-            if not assigned_flag:
-                ordered.append(images[i])
+        for i, image in enumerate(images):
+            if i not in assigned:
+                ordered.append(dict(image))
 
         return ordered
 
 
 class ImageDownloader:
-    def __init__(self, output_dir):
+    def __init__(self, output_dir, max_images=None):
         # output_dir is absolute path
         self.output_dir = output_dir
+        self.max_images = max_images
+        # Counters of the last download: bytes, accepted, rejected, failed, cache hits
+        self.stats = {}
         if not os.path.exists(self.output_dir):
             os.makedirs(self.output_dir)
 
     def download(self, ordered_images):
-        for idx, image_data in enumerate(ordered_images, start=1):
-            filename = f"{idx:03}.png"
-            image_data["output_filename"] = filename
-            processor = ImageProcessor(image_data["image"], output_dir=self.output_dir)
-            processor.process(filename)
-        print(f"Downloaded {len(ordered_images)} images to '{self.output_dir}'")
+        """
+        Downloads every usable image once, concurrently, keeping the given order in the file names.
+        """
+        candidates = [img for img in ordered_images if img.get("image")]
+        fetcher = ImageFetcher.from_config(self.output_dir)
+        saved = fetcher.fetch(self.extract_urls(candidates), needed=self.max_images)
+        self.stats = dict(fetcher.stats)
+        for idx, path in saved.items():
+            candidates[idx]["output_filename"] = os.path.basename(path)
+        print(f"Downloaded {len(saved)} images to '{self.output_dir}'")
+        return [candidates[idx] for idx in sorted(saved)]
 
     def extract_urls(self, images):
         return [img["image"] for img in images if "image" in img and img["image"]]
 
 
 class TextToSpeech:
-    def __init__(self):
-        self.tts_saver = TextToSpeechSaver()
+    def __init__(self, tmp_dir="tmp"):
+        self.tts_saver = TextToSpeechSaver.from_config(tmp_dir=tmp_dir)
 
     def synthesize(self, text):
-        filename, duration_ns = self.tts_saver.synthesize(text)
+        """
+        Returns (audio path, duration in ns, per-chunk timing map).
+        """
+        filename, duration_ns, timings = self.tts_saver.synthesize_timed(text)
         print(f"Generated speech audio: {filename}, duration: {duration_ns} ns")
-        return filename, duration_ns
+        if filename is None:
+            raise RuntimeError("Text to speech failed")
+        return os.path.join(self.tts_saver.tmp_dir, filename), duration_ns, timings
 
 
 class AudioMixer:
-    def mix(self, speech_file, duration_ns, music_path=BACKGROUND_MUSIC_PATH):
-        mixer = SpeechMusicMixer(speech_path=speech_file, music_path=music_path)
-        mixer.mix_speech_with_music(
+    def __init__(self):
+        # wav hands the mix to the video encoder losslessly; mp3 keeps a compact copy
+        self.mix_format = get_section("audio").get("mix_format", "wav").lower()
+
+    def mix(self, speech_file, duration_ns, output_path=None):
+        if output_path is not None:
+            output_path = f"{os.path.splitext(output_path)[0]}.{self.mix_format}"
+        mixed_path = SpeechMusicMixer.mix_speech_with_music(
             speech_rel_path=speech_file,
             speech_length_ns=duration_ns,
+            output_path=output_path,
         )
         print("Mixed speech audio with background music.")
+        return mixed_path
 
 
 class VideoMaker:
-    def __init__(self):
-        self.combiner = VideoCombiner()
+    def __init__(self, img_dir=None, audio_path=None, output_path=None, schedule=None, profile=None):
+        self.combiner = VideoCombiner(img_dir=img_dir, audio_path=audio_path, output_path=output_path,
+                                      schedule=schedule, profile=profile)
+
+    @property
+    def encode_stats(self):
+        return self.combiner.encode_stats
 
     def generate(self):
         self.combiner.generate_video()
         print("Generated final video.")
+        return self.combiner.output_path
+
+    def generate_single_pass(self, speech_path, speech_duration_ns):
+        self.combiner.generate_video_single_pass(speech_path, speech_duration_ns)
+        print("Generated final video.")
+        return self.combiner.output_path
 
 
 class VideoGenerator:
-    def __init__(
-        self,
-        image_output_dir="output",
-        image_tmp_dir="tmp",
-        max_image_results=100,
-    ):
-        base_dir = os.path.dirname(os.path.abspath(__file__))  # this file's dir
-
-        # Assuming this script is inside Ross_git/src/app/utils/core/
-        self.output_dir = os.path.join(base_dir, image_output_dir)
-        self.tmp_dir = os.path.join(base_dir, image_tmp_dir)
+    STAGES = VIDEO_STAGES
+
+    def __init__(self, max_image_results=100, workspace: Workspace | None = None,
+                 render_profile: RenderProfile | None = None, profiling: bool = False):
+        # When no workspace is given, every run gets its own and releases it when done
+        self.workspace = workspace
+        self.render_profile = render_profile or get_render_profile()
+        # Dump a cProfile/pyinstrument profile of this run ([tracing] profile_jobs enables it for all)
+        self.profiling = profiling
 
         self.image_searcher = ImageSearcher(max_results=max_image_results)
         self.text_parser = TextParser()
+        # Collapses near-duplicate results by thumbnail hash; None when [dedup] is disabled
+        self.deduplicator = ImageDeduplicator.from_config()
         self.image_orderer = ImageOrderer()
-
-        # pass absolute output_dir to ImageDownloader
-        self.image_downloader = ImageDownloader(output_dir=self.output_dir)
-
-        self.tts = TextToSpeech()
         self.audio_mixer = AudioMixer()
-        self.video_maker = VideoMaker()
-
-    def _clean_dirs(self):
-        for folder in [self.tmp_dir, self.output_dir]:
-            if os.path.exists(folder):
-                print(f"Cleaning directory: {folder}")
-                for filename in os.listdir(folder):
-                    file_path = os.path.join(folder, filename)
-                    try:
-                        if os.path.isfile(file_path) or os.path.islink(file_path):
-                            os.unlink(file_path)
-                        elif os.path.isdir(file_path):
-                            shutil.rmtree(file_path)
-                    except Exception as e:
-                        print(f"Failed to delete {file_path}. Reason: {e}")
-
-    def generate_video(self, topic, speech):
-        self._clean_dirs()
-        print("Starting video generation workflow...")
-
-        duck_results = self.image_searcher.search(topic)
+        # single_pass mixes and encodes in one ffmpeg run; mixed writes the audio mix first
+        self.render_mode = get_section("render").get("mode", "single_pass").lower()
+
+    def generate_video(self, topic, speech, progress=None, job_id=None):
+        """
+        Runs the full workflow and returns the path of the rendered MP4.
+
+        `progress(stage)` is called before each entry of STAGES; it may raise to abort the run.
+        Each stage is traced as a span under `job_id` (a new ID when not given).
+        """
+        progress = progress or (lambda stage: None)
+        trace_id = job_id or (self.workspace.job_id if self.workspace else uuid.uuid4().hex)
+        tracer = Tracer(trace_id, registry=get_metrics_registry())
+
+        def stage(name):
+            progress(name)
+            tracer.enter(name)
+
+        stage("prepare")
+        workspace_manager = get_workspace_manager()
+        workspace = self.workspace or workspace_manager.create(job_id=trace_id)
+        print(f"Starting video generation workflow in {workspace.root}...")
+
+        status = "error"
+        try:
+            with profiler_for(trace_id, requested=self.profiling) or contextlib.nullcontext():
+                output_path = self._run(workspace, topic, speech, stage, tracer)
+            status = "ok"
+            print("Video generation completed.")
+            return output_path
+        except JobCancelledError:
+            status = "cancelled"
+            raise
+        finally:
+            tracer.finish(status)
+            if self.workspace is None:
+                workspace_manager.release(workspace, status == "ok")
+
+    def _run(self, workspace, topic, speech, progress, tracer):
+        progress("parse")
         parsed_sentences = self.text_parser.parse(speech)
+        tracer.set("sentences", len(parsed_sentences))
+        if not parsed_sentences:
+            raise ValueError("The speech has no sentences to illustrate")
+
+        # One image per sentence is all the timeline can show; [images] max_images caps it further
+        needed = len(parsed_sentences)
+        max_images = int(get_section("images").get("max_images", 0))
+        if max_images > 0:
+            needed = min(needed, max_images)
+        image_downloader = ImageDownloader(output_dir=workspace.images_dir, max_images=needed)
+
+        progress("search")
+        duck_results = self.image_searcher.search(topic, needed=needed)
+        tracer.set("candidates", len(duck_results))
+        progress("dedup")
+        if self.deduplicator is not None:
+            duck_results = self.deduplicator.dedup(duck_results)
+            for key, amount in self.deduplicator.stats.items():
+                tracer.add(key, amount)
+        tracer.set("unique_candidates", len(duck_results))
+        progress("order")
         ordered_images = self.image_orderer.order(parsed_sentences, duck_results)
 
-        image_urls = self.image_downloader.extract_urls(ordered_images)
-
-        download_images_sequentially(image_urls, output_dir=self.output_dir)
-        self.image_downloader.download(ordered_images)
-
-        speech_file, duration_ns = self.tts.synthesize(speech)
-        self.audio_mixer.mix(speech_file, duration_ns)
-
-        self.video_maker.generate()
-        print("Video generation completed.")
+        progress("download")
+        downloaded = image_downloader.download(ordered_images)
+        for key, amount in image_downloader.stats.items():
+            tracer.add(key, amount)
+
+        progress("tts")
+        speech_file, duration_ns, chunk_timings = TextToSpeech(tmp_dir=workspace.audio_dir).synthesize(speech)
+        tracer.set("audio_seconds", round(duration_ns / 1e9, 3))
+        tracer.set("tts_chunks", len(chunk_timings))
+        progress("mix")
+        single_pass = self.render_mode == "single_pass"
+        mixed_path = None
+        if not single_pass:
+            mixed_path = self.audio_mixer.mix(speech_file, duration_ns, output_path=workspace.mixed_audio_path)
+
+        progress("render")
+        # The speech starts after the music lead-in, in both render modes
+        timings = sentence_timings(
+            [s["sentence"] for s in parsed_sentences], chunk_timings, duration_ns,
+            offset_ns=SpeechMusicMixer.LEAD_IN_MS * 1_000_000,
+        )
+        schedule = image_schedule(timings, downloaded)
+        video_maker = VideoMaker(
+            img_dir=workspace.images_dir,
+            audio_path=mixed_path,
+            output_path=workspace.final_video_path,
+            schedule=schedule or None,
+            profile=self.render_profile,
+        )
+        if single_pass:
+            output_path = video_maker.generate_single_pass(speech_file, duration_ns)
+        else:
+            output_path = video_maker.generate()
+        for key, value in video_maker.encode_stats.items():
+            tracer.set(key, value)
+        tracer.set("render_profile", self.render_profile.name)
+        return output_path
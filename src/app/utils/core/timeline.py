@@ -0,0 +1,97 @@
+import numpy as np
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.split())
+
+
+def sentence_timings(sentences: list[str], chunks: list[dict], total_ns: int | None = None,
+                     offset_ns: int = 0) -> list[dict]:
+    """
+    Place each sentence on the audio timeline.
+
+    `chunks` are the synthesized TTS chunks in order, each with "text", "start_ns" and
+    "end_ns". Inside a chunk, time is spread over its characters, so sentence boundaries are
+    exact when the TTS chunks are sentences and interpolated when they are paragraphs.
+
+    Returns one {"start_ns", "end_ns"} per sentence. The intervals are contiguous and
+    cover the whole audio, from 0 to `total_ns` (the end of the last chunk by default).
+    `offset_ns` shifts the speech later on the timeline, e.g. behind a music lead-in; the
+    first sentence then also covers the lead-in.
+    """
+    if total_ns is None:
+        total_ns = chunks[-1]["end_ns"] if chunks else 0
+    total_ns += offset_ns
+    if not sentences:
+        return []
+
+    # Piecewise-linear map from character offset in the joined chunk text to audio time
+    text = ""
+    offsets, times = [0], [0]
+    for chunk in chunks:
+        if text:
+            text += " "
+        offsets.append(len(text))
+        times.append(chunk["start_ns"] + offset_ns)
+        text += _normalize(chunk["text"])
+        offsets.append(len(text))
+        times.append(chunk["end_ns"] + offset_ns)
+
+    starts = []
+    cursor = 0
+    for sentence in sentences:
+        sentence = _normalize(sentence)
+        position = text.find(sentence, cursor) if sentence else -1
+        if position < 0:
+            # Text differs from what was synthesized; assume it follows the previous sentence
+            position = cursor
+        starts.append(position)
+        cursor = max(cursor, position + len(sentence))
+
+    start_ns = np.interp(starts, offsets, times)
+    start_ns[0] = 0
+    start_ns = np.maximum.accumulate(np.minimum(start_ns, total_ns)).astype(np.int64).tolist()
+    ends = start_ns[1:] + [total_ns]
+    return [{"start_ns": start, "end_ns": end} for start, end in zip(start_ns, ends)]
+
+
+def image_schedule(timings: list[dict], images: list[dict]) -> list[tuple[str, float]]:
+    """
+    Decide which image is on screen for each sentence and for how long.
+
+    `images` are the downloaded images in order, each with "output_filename" and, when the
+    matcher paired it with a sentence, "sentence_index". Sentences whose image is missing
+    take the next unpaired image; once those run out, the previous image stays on screen.
+
+    Returns (file name, seconds) entries for the concat list; consecutive sentences showing
+    the same image are merged into one entry.
+    """
+    by_sentence = {}
+    spares = []
+    for image in images:
+        index = image.get("sentence_index")
+        if index is not None and index < len(timings) and index not in by_sentence:
+            by_sentence[index] = image["output_filename"]
+        else:
+            spares.append(image["output_filename"])
+
+    schedule = []
+    pending_ns = 0
+    for index, timing in enumerate(timings):
+        length_ns = timing["end_ns"] - timing["start_ns"]
+        filename = by_sentence.get(index) or (spares.pop(0) if spares else None)
+        if filename is None:
+            if schedule:
+                previous, seconds = schedule[-1]
+                schedule[-1] = (previous, seconds + length_ns / 1e9)
+            else:
+                # No image yet; the first image that shows up also covers this time
+                pending_ns += length_ns
+            continue
+        seconds = (length_ns + pending_ns) / 1e9
+        pending_ns = 0
+        if schedule and schedule[-1][0] == filename:
+            schedule[-1] = (filename, schedule[-1][1] + seconds)
+        else:
+            schedule.append((filename, seconds))
+    return schedule
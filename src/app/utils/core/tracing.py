@@ -0,0 +1,250 @@
+import cProfile
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+
+from Ross_git.logs.log_manager import setup_logger
+from Ross_git.src.app.config.app_config import get_section
+
+
+class Span:
+    """
+    One pipeline stage: wall and CPU time plus whatever the stage reports.
+
+    `add` accumulates counters (bytes, images) and `set` records values such as the
+    encode speed. CPU time is the job thread's own; work the stage hands to worker pools
+    shows up in wall time only.
+    """
+
+    def __init__(self, trace_id: str, name: str):
+        self.trace_id = trace_id
+        self.name = name
+        self.counters = {}
+        self.values = {}
+        self.status = "ok"
+        self._start_wall = time.perf_counter()
+        self._start_cpu = time.thread_time()
+        self.wall_seconds = None
+        self.cpu_seconds = None
+
+    def add(self, key: str, amount: float = 1):
+        self.counters[key] = self.counters.get(key, 0) + amount
+
+    def set(self, key: str, value):
+        self.values[key] = value
+
+    def end(self, status: str = "ok"):
+        self.wall_seconds = time.perf_counter() - self._start_wall
+        self.cpu_seconds = time.thread_time() - self._start_cpu
+        self.status = status
+
+    def to_dict(self) -> dict:
+        return {
+            "event": "span",
+            "trace_id": self.trace_id,
+            "stage": self.name,
+            "status": self.status,
+            "wall_seconds": round(self.wall_seconds, 4),
+            "cpu_seconds": round(self.cpu_seconds, 4),
+            **self.counters,
+            **self.values,
+        }
+
+
+class MetricsRegistry:
+    """
+    Process-wide aggregates of finished spans, rendered in the Prometheus text format.
+    """
+
+    def __init__(self, prefix: str = "ross"):
+        self.prefix = prefix
+        self._stage = {}
+        self._counters = {}
+        self._gauges = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _metric_name(key: str) -> str:
+        return re.sub(r"[^a-zA-Z0-9_]", "_", key)
+
+    def record(self, span: Span):
+        with self._lock:
+            stage = self._stage.setdefault((span.name, span.status), [0, 0.0, 0.0])
+            stage[0] += 1
+            stage[1] += span.wall_seconds
+            stage[2] += span.cpu_seconds
+            for key, amount in span.counters.items():
+                name = self._metric_name(key)
+                self._counters[(name, span.name)] = self._counters.get((name, span.name), 0) + amount
+            for key, value in span.values.items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    self._gauges[(self._metric_name(key), span.name)] = value
+
+    def render(self, extra_gauges: dict | None = None) -> str:
+        p = self.prefix
+        lines = [
+            f"# HELP {p}_stage_seconds Wall time spent in pipeline stages.",
+            f"# TYPE {p}_stage_seconds summary",
+        ]
+        with self._lock:
+            stages = dict(self._stage)
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+        for (stage, status), (count, wall, _) in sorted(stages.items()):
+            labels = f'stage="{stage}",status="{status}"'
+            lines.append(f"{p}_stage_seconds_sum{{{labels}}} {wall:.6f}")
+            lines.append(f"{p}_stage_seconds_count{{{labels}}} {count}")
+        # Counter families are declared under their _total sample name, as the 0.0.4 format
+        # needs for the samples to belong to the family
+        lines += [f"# HELP {p}_stage_cpu_seconds_total CPU time of the job thread in pipeline stages.",
+                  f"# TYPE {p}_stage_cpu_seconds_total counter"]
+        for (stage, status), (_, _, cpu) in sorted(stages.items()):
+            lines.append(f'{p}_stage_cpu_seconds_total{{stage="{stage}",status="{status}"}} {cpu:.6f}')
+        for name in sorted({name for name, _ in counters}):
+            lines += [f"# HELP {p}_{name}_total Sum of the {name} span counter per pipeline stage.",
+                      f"# TYPE {p}_{name}_total counter"]
+            for (key, stage), amount in sorted(counters.items()):
+                if key == name:
+                    lines.append(f'{p}_{name}_total{{stage="{stage}"}} {amount}')
+        for name in sorted({name for name, _ in gauges}):
+            lines += [f"# HELP {p}_{name} Last {name} value recorded by a pipeline stage.",
+                      f"# TYPE {p}_{name} gauge"]
+            for (key, stage), value in sorted(gauges.items()):
+                if key == name:
+                    lines.append(f'{p}_{name}{{stage="{stage}"}} {value}')
+        for name, value in sorted((extra_gauges or {}).items()):
+            lines += [f"# HELP {p}_{name} Current value of {name}.",
+                      f"# TYPE {p}_{name} gauge"]
+            lines.append(f"{p}_{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+class Tracer:
+    """
+    Turns stage boundaries into spans for one run. `enter(stage)` ends the running span
+    and starts the next, mirroring Job.enter_stage; `finish()` ends the last one.
+
+    Every finished span is logged as one JSON line and added to the metrics registry.
+    """
+
+    def __init__(self, trace_id: str, registry: MetricsRegistry | None = None, logger: logging.Logger | None = None):
+        self.trace_id = trace_id
+        self.registry = registry
+        self.logger = logger or logging.getLogger("ross.trace")
+        self.spans = []
+        self.current = None
+
+    def enter(self, stage: str) -> Span:
+        self._end_current("ok")
+        self.current = Span(self.trace_id, stage)
+        return self.current
+
+    def add(self, key: str, amount: float = 1):
+        if self.current is not None:
+            self.current.add(key, amount)
+
+    def set(self, key: str, value):
+        if self.current is not None:
+            self.current.set(key, value)
+
+    def _end_current(self, status: str):
+        if self.current is None:
+            return
+        span, self.current = self.current, None
+        span.end(status)
+        self.spans.append(span)
+        self.logger.info(json.dumps(span.to_dict()))
+        if self.registry is not None:
+            self.registry.record(span)
+
+    def finish(self, status: str = "ok"):
+        self._end_current(status)
+        total = sum(span.wall_seconds for span in self.spans)
+        self.logger.info(json.dumps({
+            "event": "trace",
+            "trace_id": self.trace_id,
+            "status": status,
+            "wall_seconds": round(total, 4),
+            "stages": {span.name: round(span.wall_seconds, 4) for span in self.spans},
+        }))
+
+
+class JobProfiler:
+    """
+    Opt-in per-job profile: cProfile stats (`.prof`, open with snakeviz or pstats) or a
+    pyinstrument HTML report when that profiler is chosen and installed.
+    """
+
+    def __init__(self, output_dir: str, trace_id: str, profiler: str = "cprofile"):
+        self.output_dir = output_dir
+        self.trace_id = trace_id
+        self.profiler = profiler
+        self._profile = None
+        self.output_path = None
+
+    def __enter__(self):
+        os.makedirs(self.output_dir, exist_ok=True)
+        if self.profiler == "pyinstrument":
+            try:
+                from pyinstrument import Profiler
+                self._profile = Profiler()
+            except ImportError:
+                print("[WARN] pyinstrument is not installed, falling back to cProfile.")
+                self.profiler = "cprofile"
+        if self.profiler != "pyinstrument":
+            # Profiles the job thread only; work handed to pools is not included
+            self._profile = cProfile.Profile()
+            try:
+                self._profile.enable()
+            except ValueError as e:
+                # Only one cProfile may be active at a time on Python 3.12+
+                print(f"[WARN] Could not profile job {self.trace_id}: {e}")
+                self._profile = None
+        else:
+            self._profile.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._profile is None:
+            return False
+        if self.profiler == "pyinstrument":
+            self._profile.stop()
+            self.output_path = os.path.join(self.output_dir, f"{self.trace_id}.html")
+            with open(self.output_path, "w") as f:
+                f.write(self._profile.output_html())
+        else:
+            self._profile.disable()
+            self.output_path = os.path.join(self.output_dir, f"{self.trace_id}.prof")
+            self._profile.dump_stats(self.output_path)
+        logging.getLogger("ross.trace").info(json.dumps({
+            "event": "profile", "trace_id": self.trace_id, "path": self.output_path,
+        }))
+        return False
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            setup_logger()
+            _registry = MetricsRegistry()
+        return _registry
+
+
+def profiler_for(trace_id: str, requested: bool = False) -> JobProfiler | None:
+    """
+    A JobProfiler when profiling is requested for this job or enabled in [tracing], else None.
+    """
+    tracing_config = get_section("tracing")
+    if not requested and tracing_config.get("profile_jobs", "false").lower() != "true":
+        return None
+    output_dir = tracing_config.get("profile_dir") or os.path.join(tempfile.gettempdir(), "ross_profiles")
+    return JobProfiler(output_dir, trace_id, tracing_config.get("profiler", "cprofile").lower())
@@ -0,0 +1,127 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+
+from Ross_git.src.app.config.app_config import get_section
+
+
+class Workspace:
+    """
+    Private directory tree for one video job:
+
+        <root>/images  downloaded and processed frames
+        <root>/audio   speech and mixed audio
+        <root>/output  the rendered video
+    """
+
+    MARKER_FILE = ".workspace.json"
+
+    def __init__(self, root: str, job_id: str):
+        self.root = root
+        self.job_id = job_id
+        self.images_dir = os.path.join(root, "images")
+        self.audio_dir = os.path.join(root, "audio")
+        self.output_dir = os.path.join(root, "output")
+        for folder in (self.images_dir, self.audio_dir, self.output_dir):
+            os.makedirs(folder, exist_ok=True)
+
+    @property
+    def final_video_path(self) -> str:
+        return os.path.join(self.output_dir, "final_output.mp4")
+
+    @property
+    def mixed_audio_path(self) -> str:
+        return os.path.join(self.audio_dir, "mixed_output.mp3")
+
+    def write_marker(self, expires_at: float | None, status: str):
+        with open(os.path.join(self.root, self.MARKER_FILE), "w") as f:
+            json.dump({"job_id": self.job_id, "status": status, "expires_at": expires_at}, f)
+
+    def remove_scratch(self):
+        for folder in (self.images_dir, self.audio_dir):
+            shutil.rmtree(folder, ignore_errors=True)
+
+    def remove(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+
+class WorkspaceManager:
+    """
+    Creates per-job workspaces and applies the retention policy once a job ends.
+
+    Scratch files are deleted as soon as a job finishes. The rendered video of a successful
+    job is kept for `retention_seconds` so it can be downloaded; failed jobs are removed
+    unless `keep_failed` is set, in which case they follow the same retention window.
+    """
+
+    TMPFS_DIR = "/dev/shm"
+
+    def __init__(self, base_dir: str | None = None, use_tmpfs: bool = False,
+                 retention_seconds: int = 3600, keep_failed: bool = False):
+        if base_dir is None:
+            parent = tempfile.gettempdir()
+            if use_tmpfs:
+                if os.path.isdir(self.TMPFS_DIR):
+                    parent = self.TMPFS_DIR
+                else:
+                    print(f"[WARN] tmpfs not available at {self.TMPFS_DIR}, using {parent}")
+            base_dir = os.path.join(parent, "ross_workspaces")
+        self.base_dir = base_dir
+        self.retention_seconds = retention_seconds
+        self.keep_failed = keep_failed
+        self._lock = threading.Lock()
+        os.makedirs(self.base_dir, exist_ok=True)
+
+    def create(self, job_id: str | None = None) -> Workspace:
+        self.purge_expired()
+        job_id = job_id or uuid.uuid4().hex
+        root = tempfile.mkdtemp(prefix=f"{job_id}-", dir=self.base_dir)
+        workspace = Workspace(root, job_id)
+        workspace.write_marker(expires_at=None, status="running")
+        return workspace
+
+    def release(self, workspace: Workspace, success: bool):
+        workspace.remove_scratch()
+        if (not success and not self.keep_failed) or self.retention_seconds <= 0:
+            workspace.remove()
+            return
+        workspace.write_marker(
+            expires_at=time.time() + self.retention_seconds,
+            status="done" if success else "failed",
+        )
+
+    def purge_expired(self):
+        now = time.time()
+        with self._lock:
+            for name in os.listdir(self.base_dir):
+                root = os.path.join(self.base_dir, name)
+                marker = os.path.join(root, Workspace.MARKER_FILE)
+                try:
+                    with open(marker) as f:
+                        expires_at = json.load(f).get("expires_at")
+                except (OSError, ValueError):
+                    continue
+                if expires_at is not None and expires_at < now:
+                    shutil.rmtree(root, ignore_errors=True)
+
+
+_workspace_manager = None
+_workspace_manager_lock = threading.Lock()
+
+
+def get_workspace_manager() -> WorkspaceManager:
+    global _workspace_manager
+    with _workspace_manager_lock:
+        if _workspace_manager is None:
+            workspace_config = get_section("workspace")
+            _workspace_manager = WorkspaceManager(
+                base_dir=workspace_config.get("base_dir") or None,
+                use_tmpfs=workspace_config.get("use_tmpfs", "false").lower() == "true",
+                retention_seconds=int(workspace_config.get("retention_seconds", 3600)),
+                keep_failed=workspace_config.get("keep_failed", "false").lower() == "true",
+            )
+        return _workspace_manager
@@ -0,0 +1,283 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from Ross_git.src.app.config.app_config import get_section
+
+
+class ImageCache:
+    """
+    Content-addressed on-disk cache for processed frames and, optionally, raw image bodies.
+
+    Layout under `cache_dir`, sharded by the first two hex digits of the key:
+
+        frames/ab/<sha256(url|WxH|crop)>.png   processed frame
+        raw/ab/<sha256(url)>.bin               original response body (store_raw only)
+        meta/ab/<key>.json                     validators, status and negative entries
+
+    Every write goes to a temp file in the target directory followed by os.replace, so
+    concurrent workers (threads or processes) only ever see complete files. Reads refresh
+    the file mtime, which the size-bounded eviction uses as its LRU clock.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        max_bytes: int = 1024 * 1024 * 1024,
+        store_raw: bool = False,
+        max_age_seconds: int = 7 * 24 * 3600,
+        negative_ttl_seconds: int = 24 * 3600,
+        evict_every: int = 20,
+    ):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.store_raw = store_raw
+        self.max_age_seconds = max_age_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.evict_every = max(1, evict_every)
+        self._puts = 0
+        self._lock = threading.Lock()
+        for kind in ("frames", "raw", "meta"):
+            os.makedirs(os.path.join(cache_dir, kind), exist_ok=True)
+
+    # ---- keys and paths ----
+
+    @staticmethod
+    def frame_key(url: str, width: int, height: int, crop_mode: str) -> str:
+        return hashlib.sha256(f"{url}|{width}x{height}|{crop_mode}".encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def raw_key(url: str) -> str:
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def _path(self, kind: str, key: str, ext: str) -> str:
+        return os.path.join(self.cache_dir, kind, key[:2], f"{key}{ext}")
+
+    def _atomic_write(self, path: str, data: bytes):
+        folder = os.path.dirname(path)
+        os.makedirs(folder, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=folder, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    @staticmethod
+    def _touch(path: str):
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    # ---- metadata ----
+
+    def _read_meta(self, key: str) -> dict | None:
+        try:
+            with open(self._path("meta", key, ".json")) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_meta(self, key: str, meta: dict):
+        self._atomic_write(self._path("meta", key, ".json"), json.dumps(meta).encode("utf-8"))
+
+    # ---- frames ----
+
+    def lookup(self, url: str, width: int, height: int, crop_mode: str) -> dict:
+        """
+        Returns {"status": "negative" | "fresh" | "stale" | "miss", "path", "meta"}.
+
+        A stale entry still has a frame on disk but should be revalidated with the
+        conditional headers from `revalidation_headers(meta)` before it is reused.
+        """
+        key = self.frame_key(url, width, height, crop_mode)
+        meta = self._read_meta(key)
+        now = time.time()
+
+        if meta is not None and meta.get("status") == "negative":
+            if now - meta.get("stored_at", 0) < self.negative_ttl_seconds:
+                return {"status": "negative", "path": None, "meta": meta}
+            meta = None
+
+        frame_path = self._path("frames", key, ".png")
+        if meta is None or not os.path.exists(frame_path):
+            return {"status": "miss", "path": None, "meta": None}
+
+        self._touch(frame_path)
+        fresh = now - meta.get("validated_at", 0) < self.max_age_seconds
+        return {"status": "fresh" if fresh else "stale", "path": frame_path, "meta": meta}
+
+    @staticmethod
+    def revalidation_headers(meta: dict | None) -> dict:
+        headers = {}
+        if meta:
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+        return headers
+
+    def mark_revalidated(self, url: str, width: int, height: int, crop_mode: str, meta: dict):
+        meta = dict(meta, validated_at=time.time())
+        self._write_meta(self.frame_key(url, width, height, crop_mode), meta)
+
+    def put_frame(self, url: str, width: int, height: int, crop_mode: str, frame_path: str,
+                  etag: str | None = None, last_modified: str | None = None):
+        key = self.frame_key(url, width, height, crop_mode)
+        with open(frame_path, "rb") as f:
+            self._atomic_write(self._path("frames", key, ".png"), f.read())
+        now = time.time()
+        self._write_meta(key, {
+            "url": url,
+            "status": "ok",
+            "etag": etag,
+            "last_modified": last_modified,
+            "stored_at": now,
+            "validated_at": now,
+        })
+        self._after_put()
+
+    def put_negative(self, url: str, width: int, height: int, crop_mode: str, reason: str):
+        key = self.frame_key(url, width, height, crop_mode)
+        self._write_meta(key, {"url": url, "status": "negative", "reason": reason, "stored_at": time.time()})
+        self._after_put()
+
+    @staticmethod
+    def copy_to(cached_path: str, dest_path: str) -> str:
+        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+        if os.path.exists(dest_path):
+            os.unlink(dest_path)
+        try:
+            os.link(cached_path, dest_path)
+        except OSError:
+            # Different filesystem (e.g. a tmpfs workspace) or no hard link support
+            shutil.copyfile(cached_path, dest_path)
+        return dest_path
+
+    # ---- raw bodies ----
+
+    def get_raw(self, url: str) -> bytes | None:
+        if not self.store_raw:
+            return None
+        path = self._path("raw", self.raw_key(url), ".bin")
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        self._touch(path)
+        return data
+
+    def put_raw(self, url: str, content: bytes):
+        if not self.store_raw:
+            return
+        self._atomic_write(self._path("raw", self.raw_key(url), ".bin"), content)
+        self._after_put()
+
+    # ---- eviction ----
+
+    def _after_put(self):
+        with self._lock:
+            self._puts += 1
+            due = self._puts % self.evict_every == 0
+        if due:
+            self.evict()
+
+    @staticmethod
+    def _unlink(path: str) -> int:
+        try:
+            size = os.stat(path).st_size
+            os.unlink(path)
+            return size
+        except OSError:
+            return 0
+
+    def _purge_meta(self) -> int:
+        """
+        Delete metadata that no longer guards anything: expired negative entries and entries
+        whose frame is gone. Returns the number of bytes freed.
+        """
+        freed = 0
+        now = time.time()
+        for root, _, files in os.walk(os.path.join(self.cache_dir, "meta")):
+            for name in files:
+                if not name.endswith(".json"):
+                    continue
+                key = name[:-len(".json")]
+                if os.path.exists(self._path("frames", key, ".png")):
+                    continue
+                meta = self._read_meta(key)
+                if (meta is not None and meta.get("status") == "negative"
+                        and now - meta.get("stored_at", 0) < self.negative_ttl_seconds):
+                    continue
+                freed += self._unlink(os.path.join(root, name))
+        return freed
+
+    def evict(self) -> int:
+        """
+        Purge stale metadata, then delete least recently used frames (with their metadata)
+        and raw bodies until the cache fits in max_bytes. Returns the number of bytes freed.
+        """
+        freed = self._purge_meta()
+        entries = []
+        total = 0
+        for kind in ("frames", "raw"):
+            for root, _, files in os.walk(os.path.join(self.cache_dir, kind)):
+                for name in files:
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, kind, path))
+                    total += stat.st_size
+
+        if total <= self.max_bytes:
+            return freed
+        entries.sort()
+        removed = 0
+        for _, size, kind, path in entries:
+            if total - removed <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            removed += size
+            if kind == "frames":
+                key = os.path.splitext(os.path.basename(path))[0]
+                freed += self._unlink(self._path("meta", key, ".json"))
+        return freed + removed
+
+
+_image_cache = None
+_image_cache_lock = threading.Lock()
+
+
+def get_image_cache() -> ImageCache | None:
+    """
+    Process-wide cache built from the [image_cache] section, or None when disabled.
+    """
+    global _image_cache
+    cache_config = get_section("image_cache")
+    if cache_config.get("enabled", "true").lower() != "true":
+        return None
+    with _image_cache_lock:
+        if _image_cache is None:
+            cache_dir = cache_config.get("dir") or os.path.join(tempfile.gettempdir(), "ross_image_cache")
+            _image_cache = ImageCache(
+                cache_dir=cache_dir,
+                max_bytes=int(cache_config.get("max_megabytes", 1024)) * 1024 * 1024,
+                store_raw=cache_config.get("store_raw", "false").lower() == "true",
+                max_age_seconds=int(cache_config.get("max_age_seconds", 7 * 24 * 3600)),
+                negative_ttl_seconds=int(cache_config.get("negative_ttl_seconds", 24 * 3600)),
+            )
+        return _image_cache
@@ -0,0 +1,184 @@
+import io
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+from PIL import Image
+
+from Ross_git.src.app.config.app_config import get_section
+
+
+def _gray(image: Image.Image, width: int, height: int) -> np.ndarray:
+    # JPEG thumbnails can be decoded straight at a reduced scale
+    image.draft("L", (width * 4, height * 4))
+    small = image.convert("L").resize((width, height), Image.Resampling.BILINEAR)
+    return np.asarray(small, dtype=np.int16)
+
+
+def _to_int(bits: np.ndarray) -> int:
+    return int.from_bytes(np.packbits(bits.ravel()).tobytes(), "big")
+
+
+def average_hash(image: Image.Image, hash_size: int = 8) -> int:
+    """
+    aHash: one bit per pixel of a hash_size x hash_size grayscale thumbnail, set when the
+    pixel is brighter than the mean.
+    """
+    pixels = _gray(image, hash_size, hash_size)
+    return _to_int(pixels > pixels.mean())
+
+
+def difference_hash(image: Image.Image, hash_size: int = 8) -> int:
+    """
+    dHash: one bit per horizontally adjacent pixel pair, set when brightness increases.
+    More robust than aHash to gamma and contrast changes between re-encoded copies.
+    """
+    pixels = _gray(image, hash_size + 1, hash_size)
+    return _to_int(pixels[:, 1:] > pixels[:, :-1])
+
+
+HASHES = {"ahash": average_hash, "dhash": difference_hash}
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+class BKTree:
+    """
+    Burkhard-Keller tree over Hamming distance. A radius search only descends into children
+    whose edge distance is within `radius` of the query's distance to the node, which skips
+    most of the tree for small radii instead of comparing against every stored hash.
+    """
+
+    def __init__(self):
+        self.root = None
+        self.size = 0
+
+    def add(self, value: int, item):
+        node = [value, item, {}]
+        self.size += 1
+        if self.root is None:
+            self.root = node
+            return
+        current = self.root
+        while True:
+            distance = hamming(value, current[0])
+            child = current[2].get(distance)
+            if child is None:
+                current[2][distance] = node
+                return
+            current = child
+
+    def search(self, value: int, radius: int) -> list[tuple[int, object]]:
+        """
+        (distance, item) for every stored hash within `radius` of `value`, closest first.
+        """
+        if self.root is None:
+            return []
+        found = []
+        pending = [self.root]
+        while pending:
+            node_value, item, children = pending.pop()
+            distance = hamming(value, node_value)
+            if distance <= radius:
+                found.append((distance, item))
+            for edge, child in children.items():
+                if distance - radius <= edge <= distance + radius:
+                    pending.append(child)
+        return sorted(found, key=lambda pair: pair[0])
+
+
+class ImageDeduplicator:
+    """
+    Collapses near-duplicate search results (the same picture on several hosts or at several
+    sizes) before any full-size download, by perceptual hashes of their thumbnails.
+
+    Each group of duplicates keeps the position of its best-ranked member and the data of its
+    largest one. Results without a usable thumbnail are kept as they are.
+    """
+
+    def __init__(self, hash_name: str = "dhash", hash_size: int = 8, max_distance: int = 6,
+                 max_workers: int = 8, timeout_seconds: float = 5, session: requests.Session | None = None):
+        if hash_name not in HASHES:
+            raise ValueError(f"Unknown perceptual hash '{hash_name}'")
+        self.hash_fn = HASHES[hash_name]
+        self.hash_size = hash_size
+        self.max_distance = max_distance
+        self.max_workers = max(1, max_workers)
+        self.timeout_seconds = timeout_seconds
+        self.session = session or self._build_session()
+        self._stats_lock = threading.Lock()
+        self.stats = {}
+
+    @staticmethod
+    def _build_session() -> requests.Session:
+        from Ross_git.src.app.utils.images.fetcher import ImageFetcher
+        session = requests.Session()
+        session.headers.update(ImageFetcher.HEADERS)
+        return session
+
+    @classmethod
+    def from_config(cls) -> "ImageDeduplicator | None":
+        dedup_config = get_section("dedup")
+        if dedup_config.get("enabled", "true").lower() != "true":
+            return None
+        return cls(
+            hash_name=dedup_config.get("hash", "dhash").lower(),
+            hash_size=int(dedup_config.get("hash_size", 8)),
+            max_distance=int(dedup_config.get("max_distance", 6)),
+            max_workers=int(dedup_config.get("workers", 8)),
+            timeout_seconds=float(dedup_config.get("timeout_seconds", 5)),
+        )
+
+    def _count(self, key: str, amount: int = 1):
+        with self._stats_lock:
+            self.stats[key] = self.stats.get(key, 0) + amount
+
+    def hash_url(self, url: str) -> int | None:
+        try:
+            response = self.session.get(url, timeout=self.timeout_seconds)
+            response.raise_for_status()
+            self._count("thumbnail_bytes", len(response.content))
+            with Image.open(io.BytesIO(response.content)) as image:
+                return self.hash_fn(image, self.hash_size)
+        except Exception as e:
+            print(f"Could not hash thumbnail {url}: {e}")
+            self._count("thumbnails_failed")
+            return None
+
+    @staticmethod
+    def _area(result: dict) -> int:
+        try:
+            return int(result.get("width") or 0) * int(result.get("height") or 0)
+        except (TypeError, ValueError):
+            return 0
+
+    def dedup(self, results: list[dict]) -> list[dict]:
+        """
+        Returns the results with near-duplicates removed, in their original order.
+        """
+        self.stats = {"thumbnail_bytes": 0, "thumbnails_failed": 0, "duplicates_removed": 0}
+        urls = [result.get("thumbnail") or None for result in results]
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="thumb-hash") as executor:
+            hashes = list(executor.map(lambda url: self.hash_url(url) if url else None, urls))
+
+        tree = BKTree()
+        kept = []
+        for result, value in zip(results, hashes):
+            if value is None:
+                kept.append(result)
+                continue
+            matches = tree.search(value, self.max_distance)
+            if not matches:
+                tree.add(value, len(kept))
+                kept.append(result)
+                continue
+            self.stats["duplicates_removed"] += 1
+            slot = matches[0][1]
+            if self._area(result) > self._area(kept[slot]):
+                kept[slot] = result
+
+        print(f"Deduplicated {len(results)} search results to {len(kept)}.")
+        return kept
@@ -1,4 +1,6 @@
-import requests
+import contextlib
+import math
+import threading
 from PIL import Image
 from io import BytesIO
 import os
@@ -8,6 +10,7 @@ class ImageProcessor:
     MIN_HEIGHT = 360
     TARGET_WIDTH = 1280
     TARGET_HEIGHT = 720
+    CROP_MODE = "center"
 
     def __init__(self, image_url, output_dir="."):
         self.image_url = image_url
@@ -17,17 +20,18 @@ class ImageProcessor:
         self.output_dir = os.path.join(base_dir, output_dir)
 
         self.image = None
-        self.resized_image = None
         self.final_image = None
 
-    def download_image(self):
+    def load_bytes(self, content: bytes):
+        """
+        Opens the image lazily: only the header is read here, pixels are decoded by
+        resize_and_crop at the reduced scale it needs.
+        """
         try:
-            response = requests.get(self.image_url, timeout=10)
-            response.raise_for_status()
-            self.image = Image.open(BytesIO(response.content)).convert("RGB")
+            self.image = Image.open(BytesIO(content))
             return True
         except Exception as e:
-            print(f"Failed to download/open image from {self.image_url}: {e}")
+            print(f"Failed to open image from {self.image_url}: {e}")
             return False
 
     def is_size_valid(self):
@@ -35,52 +39,130 @@ class ImageProcessor:
             return False
         return self.image.width >= self.MIN_WIDTH and self.image.height >= self.MIN_HEIGHT
 
-    def resize_and_crop(self):
-        img_ratio = self.image.width / self.image.height
+    def crop_box(self) -> tuple[float, float, float, float]:
+        """
+        The centered region of the source with the target aspect ratio, in source pixels.
+        """
+        width, height = self.image.size
         target_ratio = self.TARGET_WIDTH / self.TARGET_HEIGHT
-
-        if img_ratio > target_ratio:
-            scale_factor = self.TARGET_HEIGHT / self.image.height
+        if width / height > target_ratio:
+            crop_width, crop_height = height * target_ratio, height
         else:
-            scale_factor = self.TARGET_WIDTH / self.image.width
+            crop_width, crop_height = width, width / target_ratio
+        left = (width - crop_width) / 2
+        top = (height - crop_height) / 2
+        return left, top, left + crop_width, top + crop_height
 
-        new_size = (
-            int(self.image.width * scale_factor),
-            int(self.image.height * scale_factor)
-        )
-        self.resized_image = self.image.resize(new_size, Image.BICUBIC)
+    def _draft_size(self, box) -> tuple[int, int]:
+        # Smallest full-image size whose crop region still covers the target frame
+        width, height = self.image.size
+        scale = max(self.TARGET_WIDTH / (box[2] - box[0]), self.TARGET_HEIGHT / (box[3] - box[1]))
+        return math.ceil(width * scale), math.ceil(height * scale)
 
-        left = (self.resized_image.width - self.TARGET_WIDTH) // 2
-        top = (self.resized_image.height - self.TARGET_HEIGHT) // 2
-        right = left + self.TARGET_WIDTH
-        bottom = top + self.TARGET_HEIGHT
+    def estimated_decode_bytes(self) -> int:
+        """
+        Memory the decode will need: the source at its draft scale plus the final frame.
+        """
+        if self.image is None:
+            return 0
+        width, height = self.image.size
+        if self.image.format == "JPEG":
+            draft_width, draft_height = self._draft_size(self.crop_box())
+            # draft() decodes at 1/2, 1/4 or 1/8 scale, never below the requested size
+            reduction = 1
+            while reduction < 8 and width // (reduction * 2) >= draft_width and height // (reduction * 2) >= draft_height:
+                reduction *= 2
+            width, height = math.ceil(width / reduction), math.ceil(height / reduction)
+        bands = max(3, len(self.image.getbands()))
+        return width * height * bands + self.TARGET_WIDTH * self.TARGET_HEIGHT * 3
 
-        self.final_image = self.resized_image.crop((left, top, right, bottom))
+    def resize_and_crop(self):
+        """
+        Decode near the target size and crop before resampling: JPEGs are decoded by libjpeg
+        at a reduced scale (draft), other formats are shrunk by an integer factor first
+        (reducing_gap), and only the crop region is resampled. The source is released once
+        the frame exists.
+        """
+        image = self.image
+        box = self.crop_box()
+        original_size = image.size
+        if image.format == "JPEG":
+            image.draft("RGB", self._draft_size(box))
+            if image.size != original_size:
+                sx, sy = image.width / original_size[0], image.height / original_size[1]
+                box = (box[0] * sx, box[1] * sy, box[2] * sx, box[3] * sy)
+
+        try:
+            # For JPEGs the draft decode happens here, so a truncated body raises inside the try
+            if image.mode != "RGB":
+                converted = image.convert("RGB")
+                image.close()
+                image = converted
+            self.final_image = image.resize(
+                (self.TARGET_WIDTH, self.TARGET_HEIGHT), Image.BICUBIC, box=box, reducing_gap=2.0
+            )
+        finally:
+            image.close()
+            self.image = None
 
     def save_image(self, filename):
         os.makedirs(self.output_dir, exist_ok=True)
         filepath = os.path.join(self.output_dir, filename)
         self.final_image.save(filepath, format="PNG")
+        self.final_image.close()
+        self.final_image = None
         print(f"Saved image: {filepath}")
         return filepath
 
-    def process(self, filename):
-        if not self.download_image():
-            return None
+    def _finish(self, filename):
         if not self.is_size_valid():
             print(f"Image too small: {self.image.width}x{self.image.height}. Skipping.")
+            self.image.close()
+            self.image = None
+            return None
+        try:
+            self.resize_and_crop()
+        except Exception as e:
+            # Truncated or corrupt bodies only fail here, once the pixels are decoded
+            print(f"Failed to decode image from {self.image_url}: {e}")
             return None
-        self.resize_and_crop()
         return self.save_image(filename)
 
+    def process_bytes(self, content: bytes, filename, budget: "MemoryBudget | None" = None):
+        """
+        Turns an already downloaded image body into a saved frame: checks the minimum size,
+        decodes, resizes and crops it, and saves it as `filename`. Returns the saved path, or
+        None when the image is unusable. With a `budget`, the decode waits until its estimated
+        memory fits.
+        """
+        if not self.load_bytes(content):
+            return None
+        if budget is None:
+            return self._finish(filename)
+        with budget.reserve(self.estimated_decode_bytes()):
+            return self._finish(filename)
 
-def download_images_sequentially(urls, output_dir="output"):
-    for i, url in enumerate(urls):
-        filename = f"{i:03d}.png"
-        print(f"Processing {url} -> {filename}")
-        processor = ImageProcessor(url, output_dir)
-        saved_path = processor.process(filename)
-        if saved_path is None:
-            print(f"Skipped {url}")
-        else:
-            print(f"Successfully saved {saved_path}")
+
+class MemoryBudget:
+    """
+    Bounds the memory of concurrent decodes: each one reserves its estimated size and waits
+    until the reservations of the others leave room. A single decode larger than the whole
+    budget still runs, alone.
+    """
+
+    def __init__(self, limit_bytes: int):
+        self.limit_bytes = limit_bytes
+        self.reserved = 0
+        self._condition = threading.Condition()
+
+    @contextlib.contextmanager
+    def reserve(self, amount: int):
+        with self._condition:
+            self._condition.wait_for(lambda: self.reserved == 0 or self.reserved + amount <= self.limit_bytes)
+            self.reserved += amount
+        try:
+            yield
+        finally:
+            with self._condition:
+                self.reserved -= amount
+                self._condition.notify_all()
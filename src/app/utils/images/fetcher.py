@@ -0,0 +1,304 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from Ross_git.src.app.config.app_config import get_section
+from Ross_git.src.app.utils.images.cache import ImageCache, get_image_cache
+from Ross_git.src.app.utils.images.downloader import ImageProcessor, MemoryBudget
+from Ross_git.src.app.utils.images.probe import ImageProbe, ImageRejected
+
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class ImageFetcher:
+    """
+    Downloads, validates and crops candidate images in one concurrent pass.
+
+    A pooled HTTP session is shared by all workers, each host gets at most `per_host_limit`
+    parallel connections, transient failures are retried with exponential backoff, and the
+    whole stage stops at `deadline_seconds` or as soon as `needed` images were saved.
+    """
+
+    HEADERS = {
+        "User-Agent": (
+            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+            "AppleWebKit/537.36 (KHTML, like Gecko) "
+            "Chrome/113.0.0.0 Safari/537.36"
+        )
+    }
+
+    def __init__(
+        self,
+        output_dir: str,
+        max_workers: int = 8,
+        per_host_limit: int = 4,
+        decode_workers: int | None = None,
+        decode_memory_bytes: int = 512 * 1024 * 1024,
+        retries: int = 2,
+        backoff_seconds: float = 0.5,
+        timeout_seconds: float = 10,
+        deadline_seconds: float = 120,
+        session: requests.Session | None = None,
+        cache: ImageCache | None = None,
+        probe: ImageProbe | None = None,
+    ):
+        self.output_dir = output_dir
+        self.max_workers = max(1, max_workers)
+        self.per_host_limit = max(1, per_host_limit)
+        self.retries = max(0, retries)
+        self.backoff_seconds = backoff_seconds
+        self.timeout_seconds = timeout_seconds
+        self.deadline_seconds = deadline_seconds
+        self.session = session or self._build_session(self.max_workers)
+        self.cache = cache
+        # Checks dimensions from the first KB of each body and caps its size
+        self.probe = probe or ImageProbe(ImageProcessor.MIN_WIDTH, ImageProcessor.MIN_HEIGHT)
+
+        # Decoding and resizing is CPU-bound; keep it to roughly one image per core
+        self._decode_slots = threading.BoundedSemaphore(decode_workers or os.cpu_count() or 2)
+        # ...and to what their decoded pixels fit in, so peak memory does not grow with image size
+        self.decode_budget = MemoryBudget(decode_memory_bytes)
+        self._host_slots = {}
+        self._host_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.stats = {}
+
+    @classmethod
+    def _build_session(cls, pool_size: int) -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers.update(cls.HEADERS)
+        return session
+
+    @classmethod
+    def from_config(cls, output_dir: str) -> "ImageFetcher":
+        images_config = get_section("images")
+        return cls(
+            output_dir=output_dir,
+            max_workers=int(images_config.get("fetch_workers", 8)),
+            decode_memory_bytes=int(images_config.get("decode_memory_mb", 512)) * 1024 * 1024,
+            per_host_limit=int(images_config.get("per_host_limit", 4)),
+            retries=int(images_config.get("retries", 2)),
+            backoff_seconds=float(images_config.get("backoff_seconds", 0.5)),
+            timeout_seconds=float(images_config.get("timeout_seconds", 10)),
+            deadline_seconds=float(images_config.get("deadline_seconds", 120)),
+            cache=get_image_cache(),
+            probe=ImageProbe(
+                min_width=ImageProcessor.MIN_WIDTH,
+                min_height=ImageProcessor.MIN_HEIGHT,
+                max_pixels=int(images_config.get("max_pixels", 50_000_000)),
+                max_bytes=int(images_config.get("max_bytes", 20 * 1024 * 1024)),
+                probe_bytes=int(images_config.get("probe_bytes", 64 * 1024)),
+            ),
+        )
+
+    def _count(self, key: str, amount: int = 1):
+        with self._stats_lock:
+            self.stats[key] = self.stats.get(key, 0) + amount
+
+    def _host_slot(self, url: str) -> threading.BoundedSemaphore:
+        host = urlparse(url).netloc
+        with self._host_lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.BoundedSemaphore(self.per_host_limit)
+            return self._host_slots[host]
+
+    def _get(self, url: str, stop: threading.Event, deadline: float,
+             headers: dict | None = None) -> tuple[requests.Response | None, bytes, bool]:
+        """
+        Returns (response, body, permanent_failure). The response is None when the download
+        failed; permanent failures (4xx, invalid URL) are worth remembering, transient ones are
+        not. The body is streamed through the probe, which raises ImageRejected early for
+        responses that cannot become a frame.
+        """
+        error = None
+        for attempt in range(self.retries + 1):
+            if stop.is_set() or time.monotonic() >= deadline:
+                return None, b"", False
+            try:
+                timeout = min(self.timeout_seconds, max(0.1, deadline - time.monotonic()))
+                # Closing hands the pooled connection back on every path, including the raising ones
+                with self._host_slot(url), self.session.get(url, timeout=timeout, headers=headers,
+                                                            stream=True) as response:
+                    if response.status_code not in RETRY_STATUS_CODES:
+                        response.raise_for_status()
+                        if response.status_code == 304:
+                            return response, b"", False
+                        content, _ = self.probe.read(response)
+                        return response, content, False
+                error = f"HTTP {response.status_code}"
+            except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError) as e:
+                error = str(e)
+            except requests.RequestException as e:
+                print(f"Failed to download image from {url}: {e}")
+                return None, b"", True
+
+            if attempt < self.retries:
+                time.sleep(self.backoff_seconds * (2 ** attempt))
+        print(f"Failed to download image from {url} after {self.retries + 1} attempts: {error}")
+        return None, b"", False
+
+    def _process(self, url: str, content: bytes, filename: str) -> str | None:
+        with self._decode_slots:
+            try:
+                processor = ImageProcessor(url, self.output_dir)
+                return processor.process_bytes(content, filename, budget=self.decode_budget)
+            except Exception as e:
+                print(f"Failed to process image from {url}: {e}")
+                return None
+
+    def _from_cache(self, entry: dict, filename: str) -> str | None:
+        try:
+            return ImageCache.copy_to(entry["path"], os.path.join(self.output_dir, filename))
+        except OSError:
+            # Evicted by another worker between lookup and copy
+            return None
+
+    def _fetch_one(self, index: int, url: str, stop: threading.Event, deadline: float) -> str | None:
+        filename = f"{index:03d}.png"
+        geometry = (ImageProcessor.TARGET_WIDTH, ImageProcessor.TARGET_HEIGHT, ImageProcessor.CROP_MODE)
+        cache = self.cache
+
+        entry = cache.lookup(url, *geometry) if cache else {"status": "miss", "path": None, "meta": None}
+        if entry["status"] == "negative":
+            self._count("images_skipped_negative")
+            return None
+        if entry["status"] == "fresh":
+            saved_path = self._from_cache(entry, filename)
+            if saved_path is not None:
+                self._count("image_cache_hits")
+                return saved_path
+            entry = {"status": "miss", "path": None, "meta": None}
+
+        if cache and entry["status"] == "miss":
+            # A raw body cached for another geometry saves the network round trip
+            raw = cache.get_raw(url)
+            if raw is not None:
+                self._count("image_cache_hits")
+                saved_path = self._process(url, raw, filename)
+                if saved_path is not None:
+                    cache.put_frame(url, *geometry, saved_path)
+                return saved_path
+
+        headers = ImageCache.revalidation_headers(entry["meta"]) if entry["status"] == "stale" else None
+        try:
+            response, content, permanent_failure = self._get(url, stop, deadline, headers)
+        except ImageRejected as e:
+            print(f"Rejected image from {url} early: {e}")
+            self._count("bytes_downloaded", e.bytes_read)
+            self._count("images_rejected")
+            self._count(f"images_rejected_{e.reason}")
+            if cache:
+                cache.put_negative(url, *geometry, e.reason)
+            return None
+        if response is None:
+            self._count("images_failed")
+            if cache and permanent_failure:
+                cache.put_negative(url, *geometry, "download failed")
+            return None
+        if stop.is_set():
+            return None
+
+        if response.status_code == 304:
+            saved_path = self._from_cache(entry, filename)
+            if saved_path is not None:
+                cache.mark_revalidated(url, *geometry, entry["meta"])
+                self._count("image_cache_hits")
+                return saved_path
+            # Evicted in the meantime; fetch the body unconditionally
+            try:
+                response, content, _ = self._get(url, stop, deadline)
+            except ImageRejected:
+                return None
+            if response is None or stop.is_set():
+                return None
+
+        self._count("bytes_downloaded", len(content))
+        saved_path = self._process(url, content, filename)
+        if saved_path is None:
+            self._count("images_rejected")
+        if cache:
+            if saved_path is None:
+                cache.put_negative(url, *geometry, "undecodable or too small")
+            else:
+                cache.put_frame(
+                    url, *geometry, saved_path,
+                    etag=response.headers.get("ETag"),
+                    last_modified=response.headers.get("Last-Modified"),
+                )
+                cache.put_raw(url, content)
+        return saved_path
+
+    def fetch(self, urls: list[str], needed: int | None = None) -> dict[int, str]:
+        """
+        Fetch `urls` concurrently and return {position in urls: saved PNG path} for the
+        accepted images. File names follow the input order, so sorting them keeps the order.
+
+        With `needed`, the result is the first `needed` accepted images in input order, not the
+        first to finish: the fetch stops once every position up to the last of them is settled.
+        """
+        deadline = time.monotonic() + self.deadline_seconds
+        stop = threading.Event()
+        saved = {}
+        settled = set()
+        # Every position below `frontier` is settled; `accepted` of them were saved
+        frontier = 0
+        accepted = 0
+        with self._stats_lock:
+            self.stats = {"bytes_downloaded": 0, "images_rejected": 0, "images_failed": 0, "image_cache_hits": 0}
+
+        futures = {}
+        executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="image-fetch")
+        try:
+            futures = {
+                executor.submit(self._fetch_one, index, url, stop, deadline): index
+                for index, url in enumerate(urls)
+            }
+            try:
+                for future in as_completed(futures, timeout=max(0.0, deadline - time.monotonic())):
+                    index = futures[future]
+                    settled.add(index)
+                    try:
+                        path = future.result()
+                    except Exception as e:
+                        print(f"Failed to fetch image {index}: {e}")
+                        path = None
+                    if path is not None:
+                        saved[index] = path
+                    if needed is None:
+                        continue
+                    while frontier in settled and accepted < needed:
+                        accepted += frontier in saved
+                        frontier += 1
+                    if accepted >= needed:
+                        print(f"Collected the first {needed} images, stopping early.")
+                        break
+            except FuturesTimeoutError:
+                print(f"[WARN] Image download deadline of {self.deadline_seconds}s reached.")
+        finally:
+            stop.set()
+            executor.shutdown(wait=True, cancel_futures=True)
+
+        if needed is not None and accepted >= needed:
+            # Later positions that happened to finish first are surplus
+            saved = {index: path for index, path in saved.items() if index < frontier}
+
+        # Workers that were mid-decode when we stopped may still have written a frame
+        for future, index in futures.items():
+            if index in saved or future.cancelled() or future.exception() is not None:
+                continue
+            path = future.result()
+            if path is not None and os.path.exists(path):
+                os.remove(path)
+
+        self.stats["images_accepted"] = len(saved)
+        print(f"Accepted {len(saved)} of {len(urls)} candidate images.")
+        return saved
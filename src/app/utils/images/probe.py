@@ -0,0 +1,174 @@
+import struct
+
+# JPEG start-of-frame markers carry the dimensions; C4 (DHT), C8 (JPG) and CC (DAC) do not
+_JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+_JPEG_STANDALONE_MARKERS = {0x01, 0xD8} | set(range(0xD0, 0xD8))
+
+
+class ImageRejected(Exception):
+    """
+    The response is not worth downloading in full. `reason` is short and stable, e.g.
+    "too_small", so it can be used as a counter name.
+    """
+
+    def __init__(self, reason: str, message: str):
+        super().__init__(message)
+        self.reason = reason
+        # Bytes received before the transfer was abandoned
+        self.bytes_read = 0
+
+
+class NotAnImageError(ValueError):
+    pass
+
+
+def _jpeg_size(data: bytes) -> tuple[int, int] | None:
+    i = 2
+    while i + 1 < len(data):
+        if data[i] != 0xFF:
+            raise NotAnImageError("Corrupt JPEG marker stream")
+        marker = data[i + 1]
+        if marker == 0xFF:
+            # Fill byte before a marker
+            i += 1
+            continue
+        if marker in _JPEG_STANDALONE_MARKERS:
+            i += 2
+            continue
+        if i + 4 > len(data):
+            return None
+        segment_length = struct.unpack(">H", data[i + 2:i + 4])[0]
+        if marker in _JPEG_SOF_MARKERS:
+            if i + 9 > len(data):
+                return None
+            height, width = struct.unpack(">HH", data[i + 5:i + 9])
+            return width, height
+        if marker == 0xDA:
+            # Start of scan before any frame header
+            raise NotAnImageError("JPEG without a frame header")
+        i += 2 + segment_length
+    return None
+
+
+def _webp_size(data: bytes) -> tuple[int, int] | None:
+    if len(data) < 30:
+        return None
+    chunk = data[12:16]
+    if chunk == b"VP8 ":
+        if data[23:26] != b"\x9d\x01\x2a":
+            raise NotAnImageError("Corrupt lossy WebP frame")
+        width, height = struct.unpack("<HH", data[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b"VP8L":
+        if data[20] != 0x2F:
+            raise NotAnImageError("Corrupt lossless WebP header")
+        b0, b1, b2, b3 = data[21:25]
+        width = 1 + (b0 | (b1 & 0x3F) << 8)
+        height = 1 + (b1 >> 6 | b2 << 2 | (b3 & 0x0F) << 10)
+        return width, height
+    if chunk == b"VP8X":
+        width = 1 + int.from_bytes(data[24:27], "little")
+        height = 1 + int.from_bytes(data[27:30], "little")
+        return width, height
+    raise NotAnImageError(f"Unknown WebP chunk {chunk!r}")
+
+
+def parse_image_header(data: bytes) -> tuple[str, int, int] | None:
+    """
+    (format, width, height) from the first bytes of a JPEG, PNG, GIF or WebP file, or None
+    when more bytes are needed. Raises NotAnImageError for anything else.
+    """
+    if len(data) < 12:
+        return None
+    if data.startswith(b"\x89PNG\r\n\x1a\n"):
+        if len(data) < 24:
+            return None
+        if data[12:16] != b"IHDR":
+            raise NotAnImageError("PNG without IHDR")
+        width, height = struct.unpack(">II", data[16:24])
+        return "png", width, height
+    if data[:6] in (b"GIF87a", b"GIF89a"):
+        width, height = struct.unpack("<HH", data[6:10])
+        return "gif", width, height
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        size = _webp_size(data)
+        return None if size is None else ("webp", *size)
+    if data[:2] == b"\xff\xd8":
+        size = _jpeg_size(data)
+        return None if size is None else ("jpeg", *size)
+    raise NotAnImageError("Unrecognized image signature")
+
+
+class ImageProbe:
+    """
+    Reads a streamed image response, checking the real dimensions from the header as soon as
+    the first chunks arrive. Undersized, oversized and non-image responses are abandoned after
+    a few KB instead of being downloaded and decoded; bodies over `max_bytes` are cut off.
+
+    Formats the header parser does not know (BMP, TIFF, ...) are still read in full when the
+    server labels them image/*, and left to the decoder to judge.
+    """
+
+    def __init__(self, min_width: int = 640, min_height: int = 360, max_pixels: int = 50_000_000,
+                 max_bytes: int = 20 * 1024 * 1024, probe_bytes: int = 64 * 1024, chunk_size: int = 16 * 1024):
+        self.min_width = min_width
+        self.min_height = min_height
+        self.max_pixels = max_pixels
+        self.max_bytes = max_bytes
+        self.probe_bytes = probe_bytes
+        self.chunk_size = chunk_size
+
+    def check(self, header: tuple[str, int, int]):
+        image_format, width, height = header
+        if width < self.min_width or height < self.min_height:
+            raise ImageRejected("too_small", f"{image_format} {width}x{height} is below "
+                                             f"{self.min_width}x{self.min_height}")
+        if width * height > self.max_pixels:
+            raise ImageRejected("too_large", f"{image_format} {width}x{height} exceeds {self.max_pixels} pixels")
+
+    def read(self, response) -> tuple[bytes, tuple[str, int, int] | None]:
+        """
+        Returns (body, (format, width, height) or None for unparsed formats). Raises
+        ImageRejected, closing the response, as soon as the body is known to be unusable.
+        """
+        body = bytearray()
+        try:
+            return self._read(response, body)
+        except ImageRejected as e:
+            e.bytes_read = len(body)
+            response.close()
+            raise
+
+    def _read(self, response, body: bytearray) -> tuple[bytes, tuple[str, int, int] | None]:
+        content_type = response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+        declared_image = content_type.startswith("image/")
+        if content_type.startswith(("text/", "application/json")):
+            raise ImageRejected("not_image", f"Content-Type is {content_type}")
+        content_length = response.headers.get("Content-Length")
+        if content_length and content_length.isdigit() and int(content_length) > self.max_bytes:
+            raise ImageRejected("too_many_bytes", f"Content-Length {content_length} exceeds {self.max_bytes} bytes")
+
+        header = None
+        probing = True
+        for chunk in response.iter_content(chunk_size=self.chunk_size):
+            body += chunk
+            if len(body) > self.max_bytes:
+                raise ImageRejected("too_many_bytes", f"Body exceeds {self.max_bytes} bytes")
+            if not probing:
+                continue
+            try:
+                header = parse_image_header(bytes(body[:self.probe_bytes]))
+            except NotAnImageError as e:
+                if not declared_image:
+                    raise ImageRejected("not_image", str(e))
+                # Labelled as an image in a format we cannot parse; let the decoder decide
+                probing = False
+                continue
+            if header is not None:
+                self.check(header)
+                probing = False
+            elif len(body) >= self.probe_bytes:
+                if not declared_image:
+                    raise ImageRejected("not_image", f"No image header in the first {self.probe_bytes} bytes")
+                probing = False
+        return bytes(body), header
@@ -1,13 +1,35 @@
 import os
 import subprocess
+import time
+
+from Ross_git.src.app.utils.audio.remixer import SpeechMusicMixer
+from Ross_git.src.app.utils.video.profiles import RenderProfile, get_render_profile
 
 class VideoCombiner:
-    def __init__(self):
+    def __init__(self, img_dir: str | None = None, audio_path: str | None = None, output_path: str | None = None,
+                 schedule: list[tuple[str, float]] | None = None, profile: RenderProfile | None = None):
         self.base_dir = os.path.dirname(os.path.abspath(__file__))
 
-        self.img_dir = os.path.abspath(os.path.join(self.base_dir, "../core/output"))
-        self.audio_path = os.path.abspath(os.path.join(self.base_dir, "../audio/tmp/mixed_output.mp3"))
-        self.output_path = os.path.abspath(os.path.join(self.base_dir, "../core/tmp/final_output.mp4"))
+        # Defaults keep the legacy module-relative layout; jobs pass their own workspace paths
+        self.img_dir = img_dir or os.path.abspath(os.path.join(self.base_dir, "../core/output"))
+        self.audio_path = audio_path or os.path.abspath(os.path.join(self.base_dir, "../audio/tmp/mixed_output.mp3"))
+        self.output_path = output_path or os.path.abspath(os.path.join(self.base_dir, "../core/tmp/final_output.mp4"))
+        # (image file name, seconds on screen) in playback order; without it the duration is split evenly
+        self.schedule = schedule
+        self.profile = profile or get_render_profile()
+        # Filled by the last render: encode wall time, media seconds and speed (x realtime)
+        self.encode_stats = {}
+
+    def _run_ffmpeg(self, cmd, media_seconds):
+        start = time.perf_counter()
+        subprocess.run(cmd, cwd=self.img_dir, check=True)
+        seconds = time.perf_counter() - start
+        self.encode_stats = {
+            "encode_seconds": round(seconds, 3),
+            "media_seconds": round(media_seconds, 3),
+            "encode_speed": round(media_seconds / seconds, 3) if seconds > 0 else None,
+            "output_bytes": os.path.getsize(self.output_path),
+        }
 
     def get_audio_duration_seconds(self):
         if not os.path.exists(self.audio_path):
@@ -35,18 +57,20 @@ class VideoCombiner:
         except ValueError:
             raise RuntimeError(f"Could not parse duration from ffprobe output:\n{result.stdout}")
 
-    def generate_ffmpeg_input_file(self, duration_per_image):
+    def generate_ffmpeg_input_file(self, duration_per_image=None, schedule=None):
         input_list_path = os.path.join(self.img_dir, "input.txt")
-        images = sorted(f for f in os.listdir(self.img_dir) if f.endswith(".png"))
-        if not images:
-            raise RuntimeError(f"No .png images found in {self.img_dir}")
+        if schedule is None:
+            images = sorted(f for f in os.listdir(self.img_dir) if f.endswith(".png"))
+            if not images:
+                raise RuntimeError(f"No .png images found in {self.img_dir}")
+            schedule = [(image, duration_per_image) for image in images]
 
         with open(input_list_path, "w") as f:
-            for image in images:
+            for image, seconds in schedule:
                 f.write(f"file '{image}'\n")
-                f.write(f"duration {duration_per_image:.2f}\n")
+                f.write(f"duration {seconds:.3f}\n")
             # Write last image file again to prevent frame drop on last image
-            f.write(f"file '{images[-1]}'\n")
+            f.write(f"file '{schedule[-1][0]}'\n")
 
         return input_list_path
 
@@ -58,12 +82,15 @@ class VideoCombiner:
         duration = self.get_audio_duration_seconds()
         print(f"Audio duration (seconds): {duration}")
 
-        images = sorted(f for f in os.listdir(self.img_dir) if f.endswith(".png"))
-        if len(images) < 2:
-            raise RuntimeError("Need at least 2 images for slideshow.")
+        if self.schedule:
+            input_txt_path = self.generate_ffmpeg_input_file(schedule=self.schedule)
+        else:
+            images = sorted(f for f in os.listdir(self.img_dir) if f.endswith(".png"))
+            if len(images) < 2:
+                raise RuntimeError("Need at least 2 images for slideshow.")
 
-        duration_per_image = duration / len(images)
-        input_txt_path = self.generate_ffmpeg_input_file(duration_per_image)
+            duration_per_image = duration / len(images)
+            input_txt_path = self.generate_ffmpeg_input_file(duration_per_image)
 
         cmd = [
             "ffmpeg",
@@ -72,17 +99,69 @@ class VideoCombiner:
             "-safe", "0",
             "-i", input_txt_path,
             "-i", self.audio_path,
-            "-vf", f"fade=t=in:st=0:d=1,fade=t=out:st={duration-1:.2f}:d=1",
-            "-c:v", "libx264",
-            "-c:a", "aac",
+            "-vf", ",".join(self.profile.video_filters() + [f"fade=t=in:st=0:d=1,fade=t=out:st={duration-1:.2f}:d=1"]),
+            *self.profile.encoder_args(),
             "-pix_fmt", "yuv420p",
             "-shortest",
             self.output_path
         ]
 
+        os.makedirs(os.path.dirname(self.output_path), exist_ok=True)
         print("Running ffmpeg command...")
-        subprocess.run(cmd, cwd=self.img_dir, check=True)
+        self._run_ffmpeg(cmd, duration)
         print(f"✅ Video saved at: {self.output_path}")
 
+    def generate_video_single_pass(self, speech_path: str, speech_duration_ns: int, music_path: str | None = None):
+        """
+        Render in one ffmpeg process: the image sequence, the speech and the looped, attenuated
+        background music are combined in a single filter graph, so the only lossy encode is
+        the final one. The duration comes from the TTS, so no ffprobe run is needed.
+
+        Mirrors SpeechMusicMixer: music fades in and out, speech starts after the lead-in.
+        """
+        music_path = music_path or SpeechMusicMixer.default_music_path()
+        lead_in = SpeechMusicMixer.LEAD_IN_MS / 1000
+        fade = SpeechMusicMixer.FADE_MS / 1000
+        duration = lead_in + speech_duration_ns / 1e9
+        print(f"Audio duration (seconds): {duration}")
 
+        if self.schedule:
+            input_txt_path = self.generate_ffmpeg_input_file(schedule=self.schedule)
+        else:
+            images = sorted(f for f in os.listdir(self.img_dir) if f.endswith(".png"))
+            if not images:
+                raise RuntimeError(f"No .png images found in {self.img_dir}")
+            input_txt_path = self.generate_ffmpeg_input_file(duration / len(images))
+
+        audio_format = "aformat=sample_rates=44100:channel_layouts=stereo"
+        filter_graph = ";".join([
+            "[0:v]" + ",".join(self.profile.video_filters())
+            + f",fade=t=in:st=0:d=1,fade=t=out:st={duration - 1:.3f}:d=1,format=yuv420p[v]",
+            f"[2:a]{audio_format},volume={SpeechMusicMixer.MUSIC_GAIN_DB}dB,atrim=0:{duration:.3f},"
+            f"afade=t=in:st=0:d={fade},afade=t=out:st={duration - fade:.3f}:d={fade}[music]",
+            f"[1:a]{audio_format},adelay={int(lead_in * 1000)}:all=1[speech]",
+            "[music][speech]amix=inputs=2:duration=first:normalize=0[a]",
+        ])
+
+        cmd = [
+            "ffmpeg",
+            "-y",
+            "-f", "concat",
+            "-safe", "0",
+            "-i", input_txt_path,
+            "-i", os.path.abspath(speech_path),
+            # Loops the music at the demuxer, so nothing is buffered in memory
+            "-stream_loop", "-1",
+            "-i", os.path.abspath(music_path),
+            "-filter_complex", filter_graph,
+            "-map", "[v]",
+            "-map", "[a]",
+            *self.profile.encoder_args(),
+            "-t", f"{duration:.3f}",
+            self.output_path
+        ]
 
+        os.makedirs(os.path.dirname(self.output_path), exist_ok=True)
+        print(f"Running single-pass ffmpeg command (profile: {self.profile.name})...")
+        self._run_ffmpeg(cmd, duration)
+        print(f"✅ Video saved at: {self.output_path}")
@@ -0,0 +1,60 @@
+from Ross_git.src.app.config.app_config import get_section
+
+
+class RenderProfile:
+    """
+    Encoder settings for the slideshow. The content is still images, so low frame rates
+    and x264's `stillimage` tune cost almost nothing in quality and save most of the encode.
+    """
+
+    def __init__(self, name: str, width: int = 1280, height: int = 720, fps: float = 10, preset: str = "medium",
+                 tune: str | None = "stillimage", crf: int = 23, threads: int = 0, audio_bitrate: str = "128k"):
+        self.name = name
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.preset = preset
+        self.tune = tune
+        self.crf = crf
+        self.threads = threads
+        self.audio_bitrate = audio_bitrate
+
+    def video_filters(self) -> list[str]:
+        return [f"scale={self.width}:{self.height}:flags=bicubic", f"fps={self.fps}"]
+
+    def encoder_args(self) -> list[str]:
+        args = ["-c:v", "libx264", "-preset", self.preset, "-crf", str(self.crf)]
+        if self.tune:
+            args += ["-tune", self.tune]
+        if self.threads > 0:
+            args += ["-threads", str(self.threads)]
+        return args + ["-c:a", "aac", "-b:a", self.audio_bitrate]
+
+    def to_dict(self) -> dict:
+        return dict(vars(self))
+
+
+# Used when the config has no [render_profile.<name>] section of the same name
+BUILTIN_PROFILES = {
+    "standard": dict(width=1280, height=720, fps=10, preset="medium", tune="stillimage", crf=23),
+    "draft": dict(width=854, height=480, fps=2, preset="ultrafast", tune="stillimage", crf=32, audio_bitrate="96k"),
+    "high": dict(width=1920, height=1080, fps=25, preset="slow", tune="stillimage", crf=20, audio_bitrate="192k"),
+}
+
+
+def get_render_profile(name: str | None = None) -> RenderProfile:
+    """
+    Profile `name` (or [render] profile) from its [render_profile.<name>] section, on top
+    of the built-in values for that name.
+    """
+    name = (name or get_section("render").get("profile", "standard")).lower()
+    values = dict(BUILTIN_PROFILES.get(name, {}))
+    section = get_section(f"render_profile.{name}")
+    if not values and not section:
+        raise ValueError(f"Unknown render profile '{name}'")
+
+    casts = {"width": int, "height": int, "fps": float, "crf": int, "threads": int}
+    for key, value in section.items():
+        values[key] = casts[key](value) if key in casts else (value or None)
+    return RenderProfile(name, **values)
+
@@ -2,6 +2,11 @@ from duckduckgo_search import DDGS
 
 
 class DuckDuckGoImageSearcher:
+    # Many results fail the size filter or the download, so ask for a multiple of what is needed
+    FETCH_OVERSAMPLE = 3
+    MIN_FETCH = 30
+    MAX_FETCH = 300
+
     def __init__(self, prompt: str, max_results: int = 60):
         self.user_prompt = prompt
         self.max_results = max_results
@@ -32,10 +37,14 @@ class DuckDuckGoImageSearcher:
                     continue
         return filtered
 
-    def search_images(self):
+    @classmethod
+    def fetch_size_for(cls, needed: int) -> int:
+        return max(cls.MIN_FETCH, min(cls.MAX_FETCH, needed * cls.FETCH_OVERSAMPLE))
+
+    def search_images(self, fetch_results=MAX_FETCH):
         query = self.user_prompt
         try:
-            raw_results = self.try_query(query, fetch_results=300)
+            raw_results = self.try_query(query, fetch_results=fetch_results)
             if raw_results:
                 filtered_results = self.filter_by_min_size(raw_results)
                 if filtered_results:
@@ -0,0 +1,44 @@
+import json
+import os
+
+from Ross_git.src.app.utils.websearch.duck_go import DuckDuckGoImageSearcher
+from Ross_git.src.app.utils.websearch.search_cache import normalize_query
+
+
+class DuckDuckGoProvider:
+    name = "duckduckgo"
+
+    def search(self, query: str, fetch_size: int) -> list[dict]:
+        searcher = DuckDuckGoImageSearcher(prompt=query, max_results=fetch_size)
+        return searcher.search_images(fetch_results=fetch_size)
+
+
+class FixtureProvider:
+    """
+    Serves canned search results from a JSON file so the pipeline can run without network.
+
+    The file maps normalized queries to result lists; the "*" entry, if present, answers
+    any query that has no entry of its own.
+    """
+
+    name = "fixture"
+
+    def __init__(self, path: str | None = None, results: dict | None = None):
+        if results is None:
+            with open(path) as f:
+                results = json.load(f)
+        self.results = results
+
+    def search(self, query: str, fetch_size: int) -> list[dict]:
+        results = self.results.get(normalize_query(query), self.results.get("*", []))
+        return list(results[:fetch_size])
+
+
+def get_search_provider(search_config: dict):
+    provider = search_config.get("provider", "duckduckgo").lower()
+    if provider == "fixture":
+        path = search_config.get("fixture_path", "")
+        if not os.path.isabs(path):
+            path = os.path.join(os.path.dirname(os.path.abspath(__file__)), path)
+        return FixtureProvider(path)
+    return DuckDuckGoProvider()
@@ -0,0 +1,188 @@
+import json
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+from Ross_git.src.app.config.app_config import get_section
+
+
+def normalize_query(query: str) -> str:
+    """
+    Lowercase, drop punctuation and collapse whitespace so trivially different topics share a key.
+    """
+    query = re.sub(r"[^\w\s]", " ", query.lower())
+    return " ".join(query.split())
+
+
+class MemorySearchStore:
+    def __init__(self):
+        self._rows = {}
+        self._lock = threading.Lock()
+
+    def load(self, key: str) -> dict | None:
+        with self._lock:
+            row = self._rows.get(key)
+            return dict(row) if row else None
+
+    def save(self, key: str, entry: dict):
+        with self._lock:
+            self._rows[key] = dict(entry)
+
+    def delete_older_than(self, cutoff: float):
+        with self._lock:
+            for key in [k for k, row in self._rows.items() if row["stored_at"] < cutoff]:
+                del self._rows[key]
+
+
+class SQLiteSearchStore:
+    """
+    Persistent store shared by every worker process on the host.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS search_results ("
+                " query TEXT PRIMARY KEY,"
+                " fetch_size INTEGER NOT NULL,"
+                " results TEXT NOT NULL,"
+                " stored_at REAL NOT NULL)"
+            )
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def load(self, key: str) -> dict | None:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT fetch_size, results, stored_at FROM search_results WHERE query = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"fetch_size": row[0], "results": json.loads(row[1]), "stored_at": row[2]}
+
+    def save(self, key: str, entry: dict):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO search_results (query, fetch_size, results, stored_at) VALUES (?, ?, ?, ?)",
+                (key, entry["fetch_size"], json.dumps(entry["results"]), entry["stored_at"]),
+            )
+
+    def delete_older_than(self, cutoff: float):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM search_results WHERE stored_at < ?", (cutoff,))
+
+
+class SearchResultCache:
+    """
+    In-memory LRU in front of a persistent store, keyed by normalized query.
+
+    Entries younger than `ttl_seconds` are served as-is. Entries within the following
+    `stale_seconds` are served immediately while a background refresh replaces them
+    (stale-while-revalidate). Anything older is fetched synchronously.
+    """
+
+    def __init__(self, store=None, capacity: int = 128, ttl_seconds: int = 24 * 3600,
+                 stale_seconds: int = 7 * 24 * 3600):
+        self.store = store or MemorySearchStore()
+        self.capacity = max(1, capacity)
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._refreshing = set()
+
+    def _remember(self, key: str, entry: dict):
+        with self._lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.capacity:
+                self._memory.popitem(last=False)
+
+    def _lookup(self, key: str) -> dict | None:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                return entry
+        entry = self.store.load(key)
+        if entry is not None:
+            self._remember(key, entry)
+        return entry
+
+    def _fetch(self, key: str, query: str, fetch_size: int, provider) -> list[dict]:
+        results = provider.search(query, fetch_size)
+        # Empty results usually mean a failed or throttled query; do not pin them in the cache
+        if results:
+            entry = {"fetch_size": fetch_size, "results": results, "stored_at": time.time()}
+            self.store.save(key, entry)
+            self._remember(key, entry)
+        return results
+
+    def _refresh_in_background(self, key: str, query: str, fetch_size: int, provider):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                self._fetch(key, query, fetch_size, provider)
+            except Exception as e:
+                print(f"[WARN] Background search refresh failed for '{query}': {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, name="search-refresh", daemon=True).start()
+
+    def get(self, query: str, fetch_size: int, provider) -> list[dict]:
+        key = normalize_query(query)
+        entry = self._lookup(key)
+
+        # An entry fetched with a smaller page cannot answer a bigger request
+        if entry is not None and entry["fetch_size"] >= fetch_size:
+            age = time.time() - entry["stored_at"]
+            if age < self.ttl_seconds:
+                return entry["results"]
+            if age < self.ttl_seconds + self.stale_seconds:
+                self._refresh_in_background(key, query, max(fetch_size, entry["fetch_size"]), provider)
+                return entry["results"]
+
+        return self._fetch(key, query, fetch_size, provider)
+
+    def purge_expired(self):
+        self.store.delete_older_than(time.time() - self.ttl_seconds - self.stale_seconds)
+
+
+_search_cache = None
+_search_cache_lock = threading.Lock()
+
+
+def get_search_cache() -> SearchResultCache | None:
+    """
+    Process-wide cache built from the [search_cache] section, or None when disabled.
+    """
+    global _search_cache
+    cache_config = get_section("search_cache")
+    if cache_config.get("enabled", "true").lower() != "true":
+        return None
+    with _search_cache_lock:
+        if _search_cache is None:
+            db_path = cache_config.get("db_path") or os.path.join(tempfile.gettempdir(), "ross_search_cache.sqlite3")
+            _search_cache = SearchResultCache(
+                store=SQLiteSearchStore(db_path),
+                capacity=int(cache_config.get("memory_capacity", 128)),
+                ttl_seconds=int(cache_config.get("ttl_seconds", 24 * 3600)),
+                stale_seconds=int(cache_config.get("stale_seconds", 7 * 24 * 3600)),
+            )
+            _search_cache.purge_expired()
+        return _search_cache
@@ -17,7 +17,7 @@ clickableAreaA.addEventListener('click', async () => {
   overlay.classList.add('disabled');
 
   try {
-    const response = await fetch('https://localhost:8000/speech', {
+    const response = await fetch('https://localhost:8000/speech/stream', {
       method: 'POST',
       headers: {
         'Content-Type': 'application/json'
@@ -29,10 +29,17 @@ clickableAreaA.addEventListener('click', async () => {
       throw new Error(`HTTP error! Status: ${response.status}`);
     }
 
-    const responseData = await response.json();
-
-    // Place response text in the textarea
-    textArea.value = responseData.speech || 'No text field in response.';
+    // Tokens are written into the textarea as they arrive; the spinner goes at the first one
+    textArea.value = '';
+    await readSpeechStream(response, (event, data) => {
+      if (event === 'token') {
+        spinner.style.display = 'none';
+        textArea.value += data.text;
+        textArea.scrollTop = textArea.scrollHeight;
+      } else if (event === 'done') {
+        textArea.value = data.speech || 'No text field in response.';
+      }
+    });
 
   } catch (error) {
     alert('Failed to generate speech: ' + error.message);
@@ -44,6 +51,39 @@ clickableAreaA.addEventListener('click', async () => {
 });
 
 
+// Parse a text/event-stream response body and call onEvent(event, data) for each event
+async function readSpeechStream(response, onEvent) {
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) {
+      break;
+    }
+    buffer += decoder.decode(value, { stream: true });
+
+    let boundary;
+    while ((boundary = buffer.indexOf('\n\n')) >= 0) {
+      const rawEvent = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+
+      let event = 'message';
+      let data = '';
+      for (const line of rawEvent.split('\n')) {
+        if (line.startsWith('event: ')) {
+          event = line.slice(7);
+        } else if (line.startsWith('data: ')) {
+          data += line.slice(6);
+        }
+      }
+      onEvent(event, data ? JSON.parse(data) : {});
+    }
+  }
+}
+
+
 //========================== AREA B
 const clickableAreaB = document.getElementById('clickableAreaB');
 
@@ -73,12 +113,13 @@ clickableAreaB.addEventListener('click', async () => {
       throw new Error(`HTTP error! Status: ${response.status}`);
     }
 
-    const responseData = await response.json();
+    const job = await response.json();
+    const finishedJob = await waitForJob(job.job_id);
 
-    if (responseData.message === "done") {
-      showVideoModal('app/utils/core/tmp/final_output.mp4');
+    if (finishedJob.status === 'done') {
+      showVideoModal(`https://localhost:8000/text2video/${finishedJob.job_id}/video`);
     } else {
-      alert('Unexpected response from server.');
+      alert(`Video generation ${finishedJob.status}: ${finishedJob.error || 'no details'}`);
     }
 
   } catch (error) {
@@ -89,6 +130,21 @@ clickableAreaB.addEventListener('click', async () => {
   }
 });
 
+// Poll the job status endpoint until the video job finishes
+async function waitForJob(jobId, intervalMs = 2000) {
+  while (true) {
+    const response = await fetch(`https://localhost:8000/text2video/${jobId}`);
+    if (!response.ok) {
+      throw new Error(`HTTP error! Status: ${response.status}`);
+    }
+    const job = await response.json();
+    if (['done', 'failed', 'cancelled'].includes(job.status)) {
+      return job;
+    }
+    await new Promise(resolve => setTimeout(resolve, intervalMs));
+  }
+}
+
 // Function to show the modal with video
 function showVideoModal(videoPath) {
   const modalOverlay = document.createElement('div');
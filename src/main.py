@@ -1,12 +1,49 @@
+import sys
+import time
+from contextlib import asynccontextmanager
+
+_started = time.perf_counter()
+
+# Same module path as the controllers use, so the readiness they report is the one warmed up here
+from Ross_git.src.app.utils.core.startup import (
+    ImportProfiler, check_config, import_profiling_enabled, logger as startup_logger, start_warm_up,
+)
+
+_import_profiler = ImportProfiler().start() if import_profiling_enabled() else None
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.routing import ApiRouter
 from app.config.settings import settings
 
 
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    from Ross_git.logs.log_manager import setup_logger
+    from Ross_git.src.app.utils.core.job_queue import get_job_manager
+
+    setup_logger()
+    check_config()
+    startup_logger.info(f"App imported and created in {time.perf_counter() - _started:.3f} s")
+    if _import_profiler is not None:
+        startup_logger.info("App import profile:\n" + ImportProfiler.format(_import_profiler.take()))
+
+    # Load the speech model and the video pipeline in the background so the API can answer
+    # /status (liveness) right away; /ready reports when they are loaded
+    start_warm_up(_import_profiler)
+    yield
+    get_job_manager().shutdown()
+    # Only unload if something loaded the model stack; importing it here would load it. The
+    # warm-up thread may still be mid-import, in which case there is nothing to unload yet
+    speech_generator = sys.modules.get("Ross_git.src.app.utils.NLP.speech_generator")
+    unload_models = getattr(speech_generator, "unload_models", None)
+    if unload_models is not None:
+        unload_models()
+
+
 # see https://youtrack.jetbrains.com/issue/PY-76760/support-type-matching-ParamSpeced-Protocols-FASTAPI-CorsMiddleware-type-issue
 def create_app() -> FastAPI:
-    fastapi_app = FastAPI()
+    fastapi_app = FastAPI(lifespan=lifespan)
     fastapi_app.add_middleware(
         CORSMiddleware,
         allow_origins=["*"],
@@ -29,4 +66,4 @@ if __name__ == "__main__":
         reload=settings.RELOAD,
         ssl_keyfile=settings.SSL_KEYFILE,
         ssl_certfile=settings.SSL_CERTFILE,
-    )
\ No newline at end of file
+    )